@@ -1,39 +1,221 @@
 import pandas as pd
 import numpy as np
-import seaborn as sn
-import matplotlib.pyplot as plt
-import plotly.express as px
 import warnings
-from flask import jsonify
+from flask import g, has_app_context, jsonify
+
+from utils.aggregation import AggregationError, aggregation_engine
+from utils.column_stats import column_stats_index
+from utils.dataset_cache import dataset_cache
+from utils.dtypes import compact_dataset, compaction_report
+from utils.fingerprint import version_token
+from utils.query import QueryError, build_predicates, matching_positions, parse_fields
+from utils.sidecar import is_fresh, load_with_sidecar, read_manifest, read_sidecar_rows, sidecar_available
+from utils.sort_index import sort_index_cache
+from utils.timing import phase
 
 warnings.filterwarnings("ignore")
 import os
 
+def _readCSVData(dataSetPath):
+    return compact_dataset(dataSetPath, pd.read_csv(dataSetPath))
+
+
+def _readExcelData(dataSetPath):
+    return compact_dataset(dataSetPath, pd.read_excel(dataSetPath))
+
+
+def _loadCSVData(dataSetPath):
+    return load_with_sidecar(dataSetPath, _readCSVData)
+
+
+def _loadExcelData(dataSetPath):
+    return load_with_sidecar(dataSetPath, _readExcelData)
+
+
 def getCSVData(dataSetPath):
-    return pd.read_csv(dataSetPath)
+    """Returns the CSV dataset from the in-process cache, parsing it only when the file changed."""
+    return dataset_cache.get(dataSetPath, _loadCSVData)
 
 
 def getExcelData(dataSetPath):
-    return pd.read_excel(dataSetPath)
+    """Returns the Excel dataset from the in-process cache, parsing it only when the file changed."""
+    return dataset_cache.get(dataSetPath, _loadExcelData)
 
 
-def getData(dataSetPath):
+def readSourceData(dataSetPath):
     """
-    Dynamically loads data from a CSV or Excel file based on the file extension in dataSetPath.
-    Returns a pandas DataFrame.
+    Parses a CSV or Excel file directly, bypassing the cache and the columnar sidecar.
+    Returns a pandas DataFrame with compacted dtypes (see utils.dtypes).
     """
-    if not isinstance(dataSetPath, str):
-        raise ValueError("DataSetPath must be a string representing the file path.")
+    _, ext = os.path.splitext(dataSetPath.lower())
+    if ext in ['.csv']:
+        return _readCSVData(dataSetPath)
+    elif ext in ['.xls', '.xlsx']:
+        return _readExcelData(dataSetPath)
+    else:
+        raise ValueError(f"Unsupported file extension: {ext}")
+
 
+def _loaderFor(dataSetPath):
     _, ext = os.path.splitext(dataSetPath.lower())
     if ext in ['.csv']:
-        return getCSVData(dataSetPath)
+        return _loadCSVData
     elif ext in ['.xls', '.xlsx']:
-        return getExcelData(dataSetPath)
+        return _loadExcelData
     else:
         raise ValueError(f"Unsupported file extension: {ext}")
 
 
+def _requestSnapshots():
+    """The {path: DatasetEntry} versions pinned by the current request, or None outside a request"""
+    if not has_app_context():
+        return None
+    if 'dataset_snapshots' not in g:
+        g.dataset_snapshots = {}
+    return g.dataset_snapshots
+
+
+def getDatasetEntry(dataSetPath):
+    """
+    Returns the cached DatasetEntry of a CSV or Excel file: the parsed DataFrame
+    together with the version it was loaded from, which keys derived indexes.
+
+    Within a request the first entry returned for a file is pinned, so every
+    step of the request sees the same version even if a reload is swapped in
+    meanwhile.
+    """
+    if not isinstance(dataSetPath, str):
+        raise ValueError("DataSetPath must be a string representing the file path.")
+
+    snapshots = _requestSnapshots()
+    key = os.path.abspath(dataSetPath)
+    if snapshots is not None and key in snapshots:
+        return snapshots[key]
+    with phase('load'):
+        entry = dataset_cache.get_entry(dataSetPath, _loaderFor(dataSetPath))
+    if snapshots is not None:
+        snapshots[key] = entry
+    return entry
+
+
+def pinnedDatasets():
+    """The {path: DatasetEntry} map pinned by the current request, to share with its worker threads"""
+    return _requestSnapshots()
+
+
+def usePinnedDatasets(snapshots):
+    """
+    Share the pinned versions of a request with a thread working for it: a
+    copied request context starts with an empty g, so it would pin its own.
+    """
+    g.dataset_snapshots = snapshots
+
+
+def _pinnedOrCachedEntry(dataSetPath):
+    # The entry this request already uses, else a fresh cached one (None if not resident)
+    snapshots = _requestSnapshots()
+    if snapshots is not None:
+        entry = snapshots.get(os.path.abspath(dataSetPath))
+        if entry is not None:
+            return entry
+    if dataset_cache.is_serving_stale(dataSetPath):
+        return getDatasetEntry(dataSetPath)
+    return dataset_cache.peek(dataSetPath)
+
+
+def refreshDataset(dataSetPath):
+    """
+    Reloads a cached dataset whose file changed, in the background. Requests
+    keep using the previous version until the new one has been swapped in.
+    Returns the Future of the reload, or None if there is nothing to reload.
+    """
+    return dataset_cache.refresh(dataSetPath, _loaderFor(dataSetPath))
+
+
+def getData(dataSetPath):
+    """
+    Dynamically loads data from a CSV or Excel file based on the file extension in dataSetPath.
+    Returns a pandas DataFrame.
+
+    Parsed files are cached in-process and re-read only when their mtime or size
+    changes, so the returned DataFrame is shared and must not be modified in place.
+    A fresh columnar sidecar (see utils.sidecar) is memory-mapped instead of
+    parsing the source file again.
+    """
+    return getDatasetEntry(dataSetPath).frame
+
+
+def getDatasetMetadata(dataSetPath):
+    """
+    Returns row count, column names and version of a dataset without
+    materializing it when possible: a cached DataFrame is used if resident,
+    otherwise the sidecar manifest, and only as a last resort a full load.
+    The version is the one of the data those rows are read from, i.e. of the
+    entry pinned by the request when there is one (see DatasetEntry.version).
+    """
+    entry = _pinnedOrCachedEntry(dataSetPath)
+    if entry is None:
+        with phase('load'):
+            manifest = read_manifest(dataSetPath) if sidecar_available() else None
+        if manifest is not None and is_fresh(dataSetPath, manifest):
+            return {
+                "rows": manifest['rows'],
+                "columns": manifest['columns'],
+                "version": version_token(manifest['source_mtime_ns'], manifest['source_size']),
+            }
+        entry = getDatasetEntry(dataSetPath)
+    return {
+        "rows": len(entry.frame),
+        "columns": [str(column) for column in entry.frame.columns],
+        "version": entry.version,
+    }
+
+
+def getDatasetMemory(dataSetPath):
+    """
+    Returns the memory footprint of a dataset before and after dtype compaction,
+    in total and per column, from the report recorded when the file was parsed
+    or from the sidecar manifest when the data was attached from a sidecar.
+    """
+    report = compaction_report(dataSetPath)
+    if report is None and sidecar_available():
+        manifest = read_manifest(dataSetPath)
+        if manifest is not None and is_fresh(dataSetPath, manifest):
+            report = manifest.get('dtypes')
+    if report is not None:
+        return {"compacted": True, **report}
+
+    # Compaction disabled: the loaded frame is all there is
+    data = getData(dataSetPath)
+    columns = {
+        str(column): {
+            "dtype_before": str(data[column].dtype),
+            "dtype_after": str(data[column].dtype),
+            "bytes_before": int(data[column].memory_usage(index=False, deep=True)),
+            "bytes_after": int(data[column].memory_usage(index=False, deep=True)),
+        }
+        for column in data.columns
+    }
+    total = sum(column["bytes_after"] for column in columns.values())
+    return {"compacted": False, "columns": columns, "bytes_before": total, "bytes_after": total}
+
+
+def getDataRows(dataSetPath, start, stop):
+    """
+    Returns rows [start, stop) of a dataset, touching only those rows when the
+    dataset is not already cached: they are sliced out of the memory-mapped
+    sidecar instead of loading the whole file.
+    """
+    entry = _pinnedOrCachedEntry(dataSetPath)
+    if entry is not None:
+        return entry.frame.iloc[start:stop]
+    with phase('load'):
+        rows = read_sidecar_rows(dataSetPath, start, stop)
+    if rows is not None:
+        return rows
+    return getData(dataSetPath).iloc[start:stop]
+
+
 class ServiceFunctions:
     @staticmethod
     def getHeadDataInfo(dataSetPath, numberOfRecords):
@@ -99,16 +281,20 @@ class ServiceFunctions:
         Returns:
             numpy.ndarray: Array of unique values from the specified column
             None: If an error occurs
+            
+        Answered from the precomputed column statistics index; the returned
+        array is shared and must not be modified.
         """
         try:
-            data = getData(dataSetPath)
+            entry = getDatasetEntry(dataSetPath)
             
             # Validate that the column exists
-            if columnName not in data.columns:
-                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(data.columns)}")
+            stats = column_stats_index.column(entry, columnName)
+            if stats is None:
+                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(entry.frame.columns)}")
                 return None
                 
-            return data[columnName].unique()
+            return stats.distinct
         except Exception as e:
             print(f"Error getting unique values from column '{columnName}': {e}")
             return None
@@ -126,20 +312,52 @@ class ServiceFunctions:
         Returns:
             pandas.Series: Series with value counts for the specified column
             None: If an error occurs
+            
+        Answered from the precomputed column statistics index; the returned
+        Series is shared and must not be modified.
         """
         try:
-            data = getData(dataSetPath)
+            entry = getDatasetEntry(dataSetPath)
             
             # Validate that the column exists
-            if columnName not in data.columns:
-                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(data.columns)}")
+            stats = column_stats_index.column(entry, columnName)
+            if stats is None:
+                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(entry.frame.columns)}")
                 return None
                 
-            return data[columnName].value_counts()
+            return stats.value_counts
         except Exception as e:
             print(f"Error getting column value count for '{columnName}': {e}")
             return None
 
+    # data set column statistics
+    @staticmethod
+    def getColumnStatistics(dataSetPath, columnName):
+        """
+        Get precomputed statistics for a specific column in the dataset
+        
+        Args:
+            dataSetPath (str): Path to the dataset file
+            columnName (str): Name of the column to describe
+            
+        Returns:
+            dict: distinct_count, null_count, min and max of the column
+            None: If an error occurs
+        """
+        try:
+            entry = getDatasetEntry(dataSetPath)
+            
+            # Validate that the column exists
+            stats = column_stats_index.column(entry, columnName)
+            if stats is None:
+                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(entry.frame.columns)}")
+                return None
+                
+            return stats.to_dict()
+        except Exception as e:
+            print(f"Error getting statistics for column '{columnName}': {e}")
+            return None
+
     # combining columns
     @staticmethod
     def combineDataSetColumns(dataSetPath, column1, column2, separator=" | "):
@@ -187,14 +405,19 @@ class ServiceFunctions:
             None: If an error occurs
         """
         try:
-            data = getData(dataSetPath)
+            entry = getDatasetEntry(dataSetPath)
             
             # Validate that the column exists
-            if columnName not in data.columns:
-                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(data.columns)}")
+            if columnName not in entry.frame.columns:
+                print(f"Error: Column '{columnName}' not found in dataset. Available columns: {list(entry.frame.columns)}")
                 return None
                 
-            return data.groupby(columnName)[columnName].count()
+            result = aggregation_engine.aggregate(entry, [columnName], [f"{columnName}:count"])
+            return pd.Series(
+                result[f"{columnName}_count"].to_numpy(),
+                index=pd.Index(result[columnName], name=columnName),
+                name=columnName
+            )
         except Exception as e:
             print(f"Error grouping data by column '{columnName}': {e}")
             return None
@@ -210,11 +433,12 @@ class ServiceFunctions:
             column2 (str): Name of the second column to group by
             
         Returns:
-            pandas.Series: Count of occurrences for each group combination
+            pandas.Series: Count of occurrences indexed by (column1, column2)
             None: If an error occurs
         """
         try:
-            data = getData(dataSetPath)
+            entry = getDatasetEntry(dataSetPath)
+            data = entry.frame
             
             # Validate that both columns exist
             if column1 not in data.columns:
@@ -224,16 +448,44 @@ class ServiceFunctions:
                 print(f"Error: Column '{column2}' not found in dataset. Available columns: {list(data.columns)}")
                 return None
                 
-            return data.groupby([column1, column2])[column1].value_counts()
+            result = aggregation_engine.aggregate(entry, [column1, column2], ["count"])
+            return pd.Series(
+                result["count"].to_numpy(),
+                index=pd.MultiIndex.from_arrays([result[column1], result[column2]], names=[column1, column2]),
+                name="count"
+            )
         except Exception as e:
             print(f"Error grouping data by columns '{column1}' and '{column2}': {e}")
             return None
 
-    # ordering data based on alphabetical order and column specific
+    # aggregating data over one or more group keys
     @staticmethod
-    def orderingData(dataSetPath, columns, ascending=True):
+    def aggregateData(dataSetPath, groupBy, aggregations=None):
         """
-        Sort data by specified columns
+        Group data by one or more columns and aggregate
+        
+        Args:
+            dataSetPath (str): Path to the dataset file
+            groupBy (list or str): Column name(s) to group by
+            aggregations (list): "count" for rows per group, or column:function with
+                function one of count, sum, mean, min, max (default: ["count"])
+            
+        Returns:
+            pandas.DataFrame: One row per group with the key columns and one column per aggregation
+            
+        Raises:
+            AggregationError: If a column or aggregation is invalid
+        """
+        if isinstance(groupBy, str):
+            groupBy = [groupBy]
+        entry = getDatasetEntry(dataSetPath)
+        return aggregation_engine.aggregate(entry, groupBy, aggregations)
+
+    # row order for sorting, shared by orderingData and the query engine
+    @staticmethod
+    def getSortOrder(dataSetPath, columns, ascending=True):
+        """
+        Get the row positions that put the dataset in sorted order
         
         Args:
             dataSetPath (str): Path to the dataset file
@@ -241,11 +493,12 @@ class ServiceFunctions:
             ascending (bool): Sort order - True for ascending, False for descending
             
         Returns:
-            pandas.DataFrame: Sorted DataFrame
+            numpy.ndarray: Row positions in sorted order (cached and read-only)
             None: If an error occurs
         """
         try:
-            data = getData(dataSetPath)
+            entry = getDatasetEntry(dataSetPath)
+            data = entry.frame
             
             # Convert single column to list if needed
             if isinstance(columns, str):
@@ -256,8 +509,82 @@ class ServiceFunctions:
                 if column not in data.columns:
                     print(f"Error: Column '{column}' not found in dataset. Available columns: {list(data.columns)}")
                     return None
-                    
-            return data.sort_values(by=columns, ascending=ascending)
+            
+            def computeOrder(frame):
+                ordered = frame[columns].reset_index(drop=True).sort_values(by=columns, ascending=ascending, kind='stable')
+                return ordered.index.to_numpy()
+            
+            # Popular sort keys are sorted once per dataset version and reused
+            return sort_index_cache.get(entry, columns, ascending, computeOrder)
         except Exception as e:
             print(f"Error ordering data by columns {columns}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    # ordering data based on alphabetical order and column specific
+    @staticmethod
+    def orderingData(dataSetPath, columns, ascending=True):
+        """
+        Sort data by specified columns
+        
+        Args:
+            dataSetPath (str): Path to the dataset file
+            columns (list or str): Column name(s) to sort by
+            ascending (bool): Sort order - True for ascending, False for descending
+            
+        Returns:
+            pandas.DataFrame: Sorted DataFrame
+            None: If an error occurs
+        """
+        try:
+            order = ServiceFunctions.getSortOrder(dataSetPath, columns, ascending)
+            if order is None:
+                return None
+            return getData(dataSetPath).take(order)
+        except Exception as e:
+            print(f"Error ordering data by columns {columns}: {e}")
+            return None
+
+    # filtering, projecting and sorting data in one pass
+    @staticmethod
+    def queryData(dataSetPath, fields=None, filters=None, sort=None, ascending=True, limit=None, offset=0):
+        """
+        Select rows and columns of the dataset
+        
+        Args:
+            dataSetPath (str): Path to the dataset file
+            fields (list): Column names to return, all columns when empty
+            filters (list): Filters written as column:operator:value (eq, ne, gt, gte, lt, lte, in)
+            sort (list): Column name(s) to sort by
+            ascending (bool): Sort order - True for ascending, False for descending
+            limit (int): Maximum number of rows to return, all matching rows when None
+            offset (int): Number of matching rows to skip
+            
+        Returns:
+            tuple: (pandas.DataFrame with the projected page of rows, total number of matching rows)
+            
+        Raises:
+            QueryError: If a column, operator or value is invalid
+        """
+        entry = getDatasetEntry(dataSetPath)
+        data = entry.frame
+        columns = parse_fields(data, fields)
+        predicates = build_predicates(data, filters or [])
+        rows = matching_positions(entry, predicates)
+        
+        if sort:
+            order = ServiceFunctions.getSortOrder(dataSetPath, sort, ascending)
+            if order is None:
+                raise QueryError(f"Cannot sort by {sort}. Available columns: {list(data.columns)}")
+            if rows is not None:
+                selected = np.zeros(len(data), dtype=bool)
+                selected[rows] = True
+                order = order[selected[order]]
+            rows = order
+        
+        total = len(data) if rows is None else len(rows)
+        stop = None if limit is None else offset + limit
+        page = np.arange(total)[offset:stop] if rows is None else rows[offset:stop]
+        
+        # Only the projected columns of the returned rows are materialized
+        column_positions = [data.columns.get_loc(column) for column in columns]
+        return data.iloc[page, column_positions], total
\ No newline at end of file
@@ -0,0 +1,94 @@
+import os
+
+from flask import Blueprint, jsonify, request, send_file
+from utils.profiling import TOKEN_HEADER, is_authorized, profile_store, profile_summary, request_token
+
+# Create Blueprint for admin routes
+admin_bp = Blueprint('admin', __name__)
+
+def _forbidden():
+    return jsonify({"error": f"A valid {TOKEN_HEADER} header is required"}), 403
+
+@admin_bp.route('/api/admin/profiles')
+def listProfiles():
+    """
+    List the stored request profiles
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: X-Profile-Token
+        in: header
+        type: string
+        required: true
+        description: The PROFILING_TOKEN secret
+    responses:
+      200:
+        description: Stored profiles, newest first, with their download paths
+        schema:
+          type: object
+          properties:
+            profiles:
+              type: array
+              items:
+                type: object
+            count:
+              type: integer
+      403:
+        description: Missing or invalid token
+    """
+    if not is_authorized(request_token()):
+        return _forbidden()
+    try:
+        profiles = [profile_summary(meta) for meta in profile_store.list()]
+        return jsonify({"profiles": profiles, "count": len(profiles)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/api/admin/profiles/<profile_id>')
+def downloadProfile(profile_id):
+    """
+    Download a stored request profile
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: profile_id
+        in: path
+        type: string
+        required: true
+        description: Profile id (X-Profile-Id of the profiled response)
+      - name: format
+        in: query
+        type: string
+        enum: [speedscope, collapsed, pstats]
+        required: false
+        description: "Output format (default: speedscope for sampled profiles, pstats for cProfile ones)"
+      - name: X-Profile-Token
+        in: header
+        type: string
+        required: true
+        description: The PROFILING_TOKEN secret
+    responses:
+      200:
+        description: The profile file
+      403:
+        description: Missing or invalid token
+      404:
+        description: Unknown profile or format
+    """
+    if not is_authorized(request_token()):
+        return _forbidden()
+    try:
+        meta = profile_store.meta(profile_id)
+        if meta is None:
+            return jsonify({"error": f"Profile not found: {profile_id}"}), 404
+        default = 'speedscope' if 'speedscope' in meta['formats'] else meta['formats'][0]
+        name = request.args.get('format', default)
+        found = profile_store.file(profile_id, name)
+        if found is None:
+            return jsonify({"error": f"Format {name} not available, choose from {meta['formats']}"}), 404
+        path, mimetype = found
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, request
 from ServiceFunctions import ServiceFunctions, getData
 from configs.dataset_config import dataset_config
+from utils.conditional import conditional
+from utils.response_cache import cached_response
+from utils.serialization import frame_to_records
+from utils.streaming import stream_records_response, wants_ndjson, wants_stream
 
 # Create Blueprint for athlete routes
 athlete_bp = Blueprint('athlete', __name__)
@@ -47,6 +51,8 @@ def getAthletesDataFromTail(numberOfRecords):
         return None
 
 @athlete_bp.route('/athletesInfoHead')
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def athletesInformationHead():
     """
     Get first 10 athlete records
@@ -63,6 +69,8 @@ def athletesInformationHead():
     return render_template("athletesInfo.html", table_data=data)
 
 @athlete_bp.route('/athletesInfoTail')
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def athletesInformationTail():
     """
     Get last 10 athlete records
@@ -80,6 +88,8 @@ def athletesInformationTail():
 
 # JSON API endpoints
 @athlete_bp.route('/api/athletes/head/<int:numberOfRecords>', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def athletesDataHead(numberOfRecords):
     """
     Get the first N athlete records as JSON
@@ -148,7 +158,7 @@ def athletesDataHead(numberOfRecords):
         data = getAthletesDataFromHead(numberOfRecords)
         if data is not None:
             # Convert DataFrame to JSON-serializable format
-            records = data.to_dict('records')
+            records = frame_to_records(data)
             return jsonify({
                 "data": records,
                 "count": len(records),
@@ -160,6 +170,8 @@ def athletesDataHead(numberOfRecords):
         return jsonify({"error": str(e)}), 500
 
 @athlete_bp.route('/api/athletes/tail/<int:numberOfRecords>', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def athletesDataTail(numberOfRecords):
     """
     Get the last N athlete records as JSON
@@ -228,7 +240,7 @@ def athletesDataTail(numberOfRecords):
         data = getAthletesDataFromTail(numberOfRecords)
         if data is not None:
             # Convert DataFrame to JSON-serializable format
-            records = data.to_dict('records')
+            records = frame_to_records(data)
             return jsonify({
                 "data": records,
                 "count": len(records),
@@ -241,12 +253,29 @@ def athletesDataTail(numberOfRecords):
 
 
 @athlete_bp.route('/api/athletes/all', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath, streamed=True)
 def athletesDataAll():
     """
     Get all athlete records as JSON
     ---
     tags:
       - Athletes API
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [json, ndjson]
+        default: json
+        description: "Response format, NDJSON can also be requested with Accept: application/x-ndjson"
+      - name: stream
+        in: query
+        type: boolean
+        default: true
+        description: Stream the response in chunks instead of serializing it in one piece
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: All athlete records in JSON format
@@ -265,12 +294,16 @@ def athletesDataAll():
     try:
         data = getData(athletesDataSetPath)
         if data is not None:
+            message = "Successfully retrieved all athlete records"
+            ndjson = wants_ndjson(request)
+            if ndjson or wants_stream(request):
+                return stream_records_response(data, message, ndjson=ndjson)
             # Convert DataFrame to JSON-serializable format
-            records = data.to_dict('records')
+            records = frame_to_records(data)
             return jsonify({
                 "data": records,
                 "count": len(records),
-                "message": "Successfully retrieved all athlete records"
+                "message": message
             })
         else:
             return jsonify({"error": "Failed to load athlete data"}), 500
@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, copy_current_request_context, jsonify, request
+from werkzeug.datastructures import MultiDict
+from ServiceFunctions import getDatasetEntry, pinnedDatasets, usePinnedDatasets
+from configs.server_config import server_config
+from .dataset_views import (
+    aggregatePayload,
+    columnCountsPayload,
+    columnStatsPayload,
+    columnsPayload,
+    headPayload,
+    paginatedPayload,
+    queryPayload,
+    samplePayload,
+    shapePayload,
+    tailPayload,
+    uniqueValuesPayload,
+)
+from .datasets_routes import datasetNotFound, resolveDatasetPath
+
+# Create Blueprint for batch routes
+batch_bp = Blueprint('batch', __name__)
+
+DEFAULT_DATASET = 'athletes'
+
+# op: (payload function, takes a column, takes parameters)
+OPERATIONS = {
+    'shape': (shapePayload, False, False),
+    'columns': (columnsPayload, False, False),
+    'unique-values': (uniqueValuesPayload, True, False),
+    'column-counts': (columnCountsPayload, True, False),
+    'column-stats': (columnStatsPayload, True, False),
+    'head': (headPayload, False, True),
+    'tail': (tailPayload, False, True),
+    'sample': (samplePayload, False, True),
+    'page': (paginatedPayload, False, True),
+    'query': (queryPayload, False, True),
+    'aggregate': (aggregatePayload, False, True),
+}
+# Parameters given once per value, like repeated filter= query parameters;
+# other lists are joined with commas as in sort=a,b
+REPEATED_PARAMETERS = {'filter'}
+RESERVED_KEYS = {'id', 'op', 'dataset', 'column'}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    # Created on first use so importing the module starts no threads
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=server_config.batch_workers, thread_name_prefix='batch')
+        return _executor
+
+
+def operationArgs(operation):
+    """The parameters of an operation as the MultiDict its payload reads, like request.args"""
+    args = MultiDict()
+    for key, value in operation.items():
+        if key in RESERVED_KEYS or value is None:
+            continue
+        if isinstance(value, list):
+            if key in REPEATED_PARAMETERS:
+                for item in value:
+                    args.add(key, str(item))
+            else:
+                args.add(key, ','.join(str(item) for item in value))
+        else:
+            args.add(key, str(value))
+    return args
+
+
+def badRequest(message):
+    return jsonify({"error": message, "operations": sorted(OPERATIONS)}), 400
+
+
+def runOperation(snapshots, dataSetPath, operation):
+    """Run one operation; its failure is reported in its own result"""
+    usePinnedDatasets(snapshots)
+    payload, takesColumn, takesParameters = OPERATIONS[operation['op']]
+    args = [dataSetPath]
+    if takesColumn:
+        args.append(str(operation['column']))
+    if takesParameters:
+        args.append(operationArgs(operation))
+    try:
+        return payload(*args)
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+def pinDataset(snapshots, dataSetPath):
+    """Load a dataset once for the whole batch and pin its version; returns the load error, if any"""
+    usePinnedDatasets(snapshots)
+    try:
+        getDatasetEntry(dataSetPath)
+    except Exception as e:
+        print(f"Error loading dataset for batch {dataSetPath}: {e}")
+        return str(e)
+    return None
+
+
+@batch_bp.route('/api/batch', methods=['POST'])
+def runBatch():
+    """
+    Run several dataset operations in one request
+    ---
+    tags:
+      - Batch
+    consumes:
+      - application/json
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - operations
+          properties:
+            dataset:
+              type: string
+              description: "Dataset of the operations that name none (default: athletes)"
+              example: athletes
+            operations:
+              type: array
+              description: "Operations with their parameters: shape, columns, unique-values, column-counts and column-stats (column), head and tail (n), sample (size), page (page, per_page, sort, order, cursor), query (fields, filter, sort, order, limit, offset), aggregate (by, agg, limit)"
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  op:
+                    type: string
+                  dataset:
+                    type: string
+                  column:
+                    type: string
+              example:
+                - {"op": "shape"}
+                - {"id": "noc", "op": "column-counts", "column": "NOC"}
+                - {"op": "page", "page": 2, "per_page": 20, "sort": "Name"}
+    responses:
+      200:
+        description: "One result per operation, in request order, each with its own status; all of them computed from the same version of every dataset"
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                  op:
+                    type: string
+                  dataset:
+                    type: string
+                  status:
+                    type: integer
+                  result:
+                    type: object
+            count:
+              type: integer
+            versions:
+              type: object
+            seconds:
+              type: number
+      400:
+        description: Malformed batch, unknown operation or missing column
+      404:
+        description: Unknown dataset
+    """
+    started = time.perf_counter()
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('operations'), list) or not body['operations']:
+        return badRequest("Expected a JSON object with a non-empty 'operations' list")
+    operations = body['operations']
+    if len(operations) > server_config.batch_max_operations:
+        return badRequest(f"At most {server_config.batch_max_operations} operations per batch")
+
+    # Validate everything before running anything
+    defaultDataset = body.get('dataset', DEFAULT_DATASET)
+    planned = []
+    for position, operation in enumerate(operations):
+        if not isinstance(operation, dict) or not isinstance(operation.get('op'), str) or operation['op'] not in OPERATIONS:
+            return badRequest(f"Operation {position}: unknown or missing 'op'")
+        if OPERATIONS[operation['op']][1] and not operation.get('column'):
+            return badRequest(f"Operation {position}: '{operation['op']}' needs a 'column'")
+        datasetName = str(operation.get('dataset', defaultDataset))
+        dataSetPath = resolveDatasetPath(datasetName)
+        if dataSetPath is None:
+            return datasetNotFound(datasetName)
+        planned.append((operation.get('id', position), datasetName, dataSetPath, operation))
+
+    try:
+        # Every dataset is pinned once, so all operations see the same version
+        # even if a reload is swapped in while the batch runs
+        snapshots = pinnedDatasets()
+        paths = {dataSetPath: datasetName for _, datasetName, dataSetPath, _ in planned}
+        pool = _pool()
+        pins = {path: pool.submit(copy_current_request_context(pinDataset), snapshots, path) for path in paths}
+        # A dataset that failed to load is not loaded again by each of its operations
+        failures = {path: future.result() for path, future in pins.items() if future.result() is not None}
+
+        futures = [
+            None if dataSetPath in failures
+            else pool.submit(copy_current_request_context(runOperation), snapshots, dataSetPath, operation)
+            for _, _, dataSetPath, operation in planned
+        ]
+        results = []
+        for (operationId, datasetName, dataSetPath, operation), future in zip(planned, futures):
+            if future is None:
+                result, status = {"error": f"Failed to load dataset '{datasetName}': {failures[dataSetPath]}"}, 500
+            else:
+                result, status = future.result()
+            results.append({
+                "id": operationId,
+                "op": operation['op'],
+                "dataset": datasetName,
+                "status": status,
+                "result": result,
+            })
+
+        versions = {}
+        for path, datasetName in paths.items():
+            entry = snapshots.get(os.path.abspath(path))
+            versions[datasetName] = entry.version if entry is not None else None
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "versions": versions,
+            "seconds": round(time.perf_counter() - started, 4),
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,245 @@
+from concurrent.futures import TimeoutError as RenderTimeout
+
+from flask import Blueprint, Response, jsonify, request
+from configs.chart_config import chart_config
+from ServiceFunctions import getDatasetEntry
+from utils.aggregation import aggregation_engine
+from utils.charts import (
+    CHART_FORMATS,
+    ChartError,
+    bar_chart,
+    chart_etag,
+    chart_renderer,
+    grouped_bar_chart,
+    histogram_chart,
+)
+from utils.column_stats import column_stats_index
+from .dataset_views import columnNotFound
+from .datasets_routes import datasetNotFound, resolveDatasetPath
+
+# Create Blueprint for server-rendered chart routes
+chart_bp = Blueprint('charts', __name__)
+
+
+def boundedInt(name, default, low, high):
+    """Integer query parameter clamped to [low, high]"""
+    return max(low, min(request.args.get(name, default, type=int), high))
+
+
+def chartResponse(dataSetPath, kind, columns, params, draw):
+    """
+    Serve the chart of dataSetPath drawn by draw(entry) -> Figure, from the chart
+    cache when possible. The ETag identifies dataset version, chart and parameters,
+    so a matching If-None-Match is answered with 304 before anything is rendered.
+    """
+    try:
+        fmt = request.args.get('format', 'png').lower()
+        if fmt not in CHART_FORMATS:
+            return jsonify({"error": f"Invalid format '{fmt}', expected one of {list(CHART_FORMATS)}"}), 400
+
+        entry = getDatasetEntry(dataSetPath)
+        for column in columns:
+            if column not in entry.frame.columns:
+                return columnNotFound(column)
+
+        etag = chart_etag(entry, kind, params, fmt)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        try:
+            body = chart_renderer.render(entry, kind, params, fmt, lambda: draw(entry),
+                                         timeout=chart_config.render_timeout)
+        except ChartError as e:
+            return jsonify({"error": str(e)}), 400
+        except RenderTimeout:
+            return jsonify({"error": "Chart rendering timed out, retry shortly"}), 503
+
+        response = Response(body, mimetype=CHART_FORMATS[fmt])
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@chart_bp.route('/api/datasets/<string:datasetName>/charts/column-counts/<string:columnName>')
+def columnCountsChart(datasetName, columnName):
+    """
+    Bar chart of the value counts of a dataset column
+    ---
+    tags:
+      - Charts
+    produces:
+      - image/png
+      - image/svg+xml
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of the column
+        example: "NOC"
+      - name: top
+        in: query
+        type: integer
+        default: 30
+        description: Number of most frequent values to draw (1-100)
+      - name: format
+        in: query
+        type: string
+        enum: [png, svg]
+        default: png
+        description: Image format
+    responses:
+      200:
+        description: Rendered chart
+      304:
+        description: Chart unchanged since the ETag sent in If-None-Match
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    top = boundedInt('top', 30, 1, 100)
+
+    def draw(entry):
+        counts = column_stats_index.column(entry, columnName).value_counts
+        return bar_chart(counts.iloc[:top], columnName)
+
+    return chartResponse(dataSetPath, 'column-counts', [columnName], (columnName, top), draw)
+
+
+@chart_bp.route('/api/datasets/<string:datasetName>/charts/histogram/<string:columnName>')
+def histogramChart(datasetName, columnName):
+    """
+    Histogram of a numeric dataset column
+    ---
+    tags:
+      - Charts
+    produces:
+      - image/png
+      - image/svg+xml
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of a numeric column
+        example: "GPA"
+      - name: bins
+        in: query
+        type: integer
+        default: 20
+        description: Number of bins (1-200)
+      - name: format
+        in: query
+        type: string
+        enum: [png, svg]
+        default: png
+        description: Image format
+    responses:
+      200:
+        description: Rendered chart
+      304:
+        description: Chart unchanged since the ETag sent in If-None-Match
+      400:
+        description: Column is not numeric
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    bins = boundedInt('bins', 20, 1, 200)
+
+    def draw(entry):
+        return histogram_chart(entry.frame[columnName], columnName, bins)
+
+    return chartResponse(dataSetPath, 'histogram', [columnName], (columnName, bins), draw)
+
+
+@chart_bp.route('/api/datasets/<string:datasetName>/charts/grouped/<string:column1>/<string:column2>')
+def groupedChart(datasetName, column1, column2):
+    """
+    Grouped bar chart of record counts by two dataset columns
+    ---
+    tags:
+      - Charts
+    produces:
+      - image/png
+      - image/svg+xml
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: column1
+        in: path
+        type: string
+        required: true
+        description: Column drawn along the x axis
+        example: "Discipline"
+      - name: column2
+        in: path
+        type: string
+        required: true
+        description: Column drawn as bars within each group
+        example: "NOC"
+      - name: top
+        in: query
+        type: integer
+        default: 15
+        description: Number of most frequent column1 values to draw (1-50)
+      - name: series
+        in: query
+        type: integer
+        default: 5
+        description: Number of most frequent column2 values to draw (1-12)
+      - name: format
+        in: query
+        type: string
+        enum: [png, svg]
+        default: png
+        description: Image format
+    responses:
+      200:
+        description: Rendered chart
+      304:
+        description: Chart unchanged since the ETag sent in If-None-Match
+      400:
+        description: column1 and column2 are the same column
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    if column1 == column2:
+        return jsonify({"error": "column1 and column2 must be different columns"}), 400
+    top = boundedInt('top', 15, 1, 50)
+    series = boundedInt('series', 5, 1, 12)
+
+    def draw(entry):
+        counts = aggregation_engine.aggregate(entry, [column1, column2], ['count'])
+        table = counts.pivot(index=column1, columns=column2, values='count').fillna(0)
+        rows = table.sum(axis=1).sort_values(ascending=False, kind='stable').index[:top]
+        columns = table.sum(axis=0).sort_values(ascending=False, kind='stable').index[:series]
+        return grouped_bar_chart(table.loc[rows, columns], column1, column2)
+
+    return chartResponse(dataSetPath, 'grouped', [column1, column2], (column1, column2, top, series), draw)
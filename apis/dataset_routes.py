@@ -1,17 +1,33 @@
-from flask import Blueprint, jsonify, request
-from ServiceFunctions import ServiceFunctions, getData, getExcelData
+from flask import Blueprint, jsonify
 from configs.dataset_config import dataset_config
+from .dataset_views import (
+    columnCountsResponse,
+    columnStatsResponse,
+    columnsResponse,
+    paginatedResponse,
+    sampleResponse,
+    shapeResponse,
+    uniqueValuesResponse,
+)
+from utils.aggregation import aggregation_engine
+from utils.charts import chart_renderer
+from utils.column_stats import column_stats_index
+from utils.conditional import conditional
+from utils.response_cache import cached_response
+from utils.dataset_cache import dataset_cache
+from utils.response_cache import response_cache
+from utils.sort_index import sort_index_cache
+from utils.watcher import dataset_watcher
 
 # Create Blueprint for dataset routes
 dataset_bp = Blueprint('dataset', __name__)
 
-# Initialize service functions
-functions = ServiceFunctions()
-
 # Dataset path - now using centralized configuration
 athletesDataSetPath = dataset_config.athletes_dataset_path
 
 @dataset_bp.route('/api/dataset/shape')
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def getDatasetShape():
     """
     Get dataset shape information
@@ -29,13 +45,11 @@ def getDatasetShape():
               items:
                 type: integer
     """
-    try:
-        shape = functions.getDataSetShape(athletesDataSetPath)
-        return jsonify({"shape": shape})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return shapeResponse(athletesDataSetPath)
 
 @dataset_bp.route('/api/dataset/unique-values/<string:columnName>', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def getUniqueValues(columnName):
     """
     Get unique values from NOC column
@@ -60,13 +74,11 @@ def getUniqueValues(columnName):
               items:
                 type: string
     """
-    try:
-        unique_values = functions.getUniqueColumnValues(athletesDataSetPath, columnName)
-        return jsonify({"unique_values": unique_values.tolist()})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return uniqueValuesResponse(athletesDataSetPath, columnName)
 
 @dataset_bp.route('/api/dataset/column-counts/<string:columnName>', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def getColumnCounts(columnName):
     """
     Get value counts for any column
@@ -107,14 +119,58 @@ def getColumnCounts(columnName):
               type: string
               example: "Failed to process request"
     """
-    try:
-        counts = functions.getColumnValueCount(athletesDataSetPath, columnName)
-        return jsonify({"value_counts": counts.to_dict()})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return columnCountsResponse(athletesDataSetPath, columnName)
+
+@dataset_bp.route('/api/dataset/column-stats/<string:columnName>', methods=['GET'])
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
+def getColumnStats(columnName):
+    """
+    Get precomputed statistics for any column
+    ---
+    tags:
+      - Dataset Info
+    parameters:
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of the column to describe
+        example: "NOC"
+    responses:
+      200:
+        description: Column statistics
+        schema:
+          type: object
+          properties:
+            column:
+              type: string
+            statistics:
+              type: object
+              properties:
+                distinct_count:
+                  type: integer
+                null_count:
+                  type: integer
+                min:
+                  type: string
+                max:
+                  type: string
+      404:
+        description: Column not found
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Column 'InvalidColumn' not found in dataset"
+    """
+    return columnStatsResponse(athletesDataSetPath, columnName)
 
 # Additional JSON endpoints for dataset exploration
 @dataset_bp.route('/api/dataset/columns')
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def getDatasetColumns():
     """
     Get dataset column information
@@ -133,19 +189,11 @@ def getDatasetColumns():
                 type: string
             dtypes:
               type: object
+            memory:
+              type: object
+              description: Bytes before and after dtype compaction, in total and per column
     """
-    try:
-        data = getData(athletesDataSetPath)
-        if data is not None:
-            return jsonify({
-                "columns": data.columns.tolist(),
-                "dtypes": data.dtypes.astype(str).to_dict(),
-                "message": "Successfully retrieved column information"
-            })
-        else:
-            return jsonify({"error": "Failed to load dataset"}), 500
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return columnsResponse(athletesDataSetPath)
 
 @dataset_bp.route('/api/dataset/sample')
 def getDatasetSample():
@@ -175,23 +223,11 @@ def getDatasetSample():
             message:
               type: string
     """
-    try:
-        size = request.args.get('size', 5, type=int)
-        data = getData(athletesDataSetPath)
-        if data is not None:
-            sample_data = data.sample(n=min(size, len(data)))
-            records = sample_data.to_dict('records')
-            return jsonify({
-                "data": records,
-                "count": len(records),
-                "message": f"Successfully retrieved {len(records)} sample records"
-            })
-        else:
-            return jsonify({"error": "Failed to load dataset"}), 500
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return sampleResponse(athletesDataSetPath)
 
 @dataset_bp.route('/api/dataset/paginated')
+@conditional(athletesDataSetPath)
+@cached_response(athletesDataSetPath)
 def getDatasetPaginated():
     """
     Get paginated dataset records
@@ -209,6 +245,23 @@ def getDatasetPaginated():
         type: integer
         default: 10
         description: Records per page
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from pagination.next_cursor, takes precedence over page; pass the same sort and order
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: Comma-separated columns to sort by
+        example: "Name"
+      - name: order
+        in: query
+        type: string
+        enum: [asc, desc]
+        default: asc
+        description: Sort order
     responses:
       200:
         description: Paginated dataset records
@@ -230,42 +283,19 @@ def getDatasetPaginated():
                   type: integer
                 pages:
                   type: integer
+                next_cursor:
+                  type: string
             message:
               type: string
+      400:
+        description: Bad request - Invalid cursor, stale unsorted cursor, or one issued for another sort or order
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
     """
-    try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        
-        data = getData(athletesDataSetPath)
-        if data is not None:
-            total_records = len(data)
-            total_pages = (total_records + per_page - 1) // per_page
-            
-            # Ensure page is within valid range
-            page = max(1, min(page, total_pages))
-            
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            
-            page_data = data.iloc[start_idx:end_idx]
-            records = page_data.to_dict('records')
-            
-            return jsonify({
-                "data": records,
-                "count": len(records),
-                "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total": total_records,
-                    "pages": total_pages
-                },
-                "message": f"Successfully retrieved page {page} of {total_pages}"
-            })
-        else:
-            return jsonify({"error": "Failed to load dataset"}), 500
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return paginatedResponse(athletesDataSetPath)
 
 @dataset_bp.route('/api/dataset/config')
 def getDatasetConfig():
@@ -299,3 +329,35 @@ def getDatasetConfig():
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@dataset_bp.route('/api/dataset/cache')
+def getDatasetCacheStats():
+    """
+    Get dataset cache statistics
+    ---
+    tags:
+      - Dataset Info
+    responses:
+      200:
+        description: Hit/miss counters, reload timings and cached datasets
+        schema:
+          type: object
+          properties:
+            cache:
+              type: object
+            message:
+              type: string
+    """
+    try:
+        return jsonify({
+            "cache": dataset_cache.stats(),
+            "column_stats_index": column_stats_index.stats(),
+            "sort_index": sort_index_cache.stats(),
+            "aggregation": aggregation_engine.stats(),
+            "charts": chart_renderer.stats(),
+            "responses": response_cache.stats(),
+            "watcher": dataset_watcher.stats(),
+            "message": "Dataset cache statistics retrieved successfully"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
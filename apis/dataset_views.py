@@ -0,0 +1,298 @@
+# Shared dataset view logic
+# Every dataset endpoint, whether hardwired to one file or addressed by name,
+# goes through these functions so loading, caching and serialization stay in one place.
+# Each *Payload function builds the (body, status) of one operation from its
+# arguments; the *Response functions serve it for the current request, and the
+# batch endpoint runs the same payloads for many operations at once.
+
+from flask import jsonify, request
+from ServiceFunctions import ServiceFunctions, getData, getDataRows, getDatasetEntry, getDatasetMemory, getDatasetMetadata
+from utils.aggregation import AggregationError
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor, encode_keyset_cursor, keyset_position
+from utils.query import QueryError
+from utils.serialization import frame_to_records
+
+# Initialize service functions
+functions = ServiceFunctions()
+
+
+DEFAULT_QUERY_LIMIT = 100
+
+
+def splitList(value):
+    """Split a comma-separated query parameter, dropping empty items"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def columnMissing(columnName):
+    return {"error": f"Column '{columnName}' not found in dataset"}, 404
+
+
+def columnNotFound(columnName):
+    body, status = columnMissing(columnName)
+    return jsonify(body), status
+
+
+def respond(payload, *args):
+    """Serve the (body, status) of a payload function as JSON; unexpected errors become 500s"""
+    try:
+        body, status = payload(*args)
+        return jsonify(body), status
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def shapePayload(dataSetPath):
+    """Dataset dimensions"""
+    shape = functions.getDataSetShape(dataSetPath)
+    return {"shape": shape}, 200
+
+
+def uniqueValuesPayload(dataSetPath, columnName):
+    """Distinct values of a column"""
+    unique_values = functions.getUniqueColumnValues(dataSetPath, columnName)
+    if unique_values is None:
+        return columnMissing(columnName)
+    return {"unique_values": unique_values.tolist()}, 200
+
+
+def columnCountsPayload(dataSetPath, columnName):
+    """Value counts of a column"""
+    counts = functions.getColumnValueCount(dataSetPath, columnName)
+    if counts is None:
+        return columnMissing(columnName)
+    return {"value_counts": counts.to_dict()}, 200
+
+
+def columnStatsPayload(dataSetPath, columnName):
+    """Precomputed statistics of a column"""
+    statistics = functions.getColumnStatistics(dataSetPath, columnName)
+    if statistics is None:
+        return columnMissing(columnName)
+    return {"column": columnName, "statistics": statistics}, 200
+
+
+def columnsPayload(dataSetPath):
+    """Column names, dtypes and the memory saved by dtype compaction"""
+    data = getData(dataSetPath)
+    if data is None:
+        return {"error": "Failed to load dataset"}, 500
+    return {
+        "columns": data.columns.tolist(),
+        "dtypes": data.dtypes.astype(str).to_dict(),
+        "memory": getDatasetMemory(dataSetPath),
+        "message": "Successfully retrieved column information"
+    }, 200
+
+
+def headPayload(dataSetPath, args):
+    """First n records (default 10)"""
+    numberOfRecords = max(0, args.get('n', 10, type=int))
+    records = frame_to_records(getDataRows(dataSetPath, 0, numberOfRecords))
+    return {
+        "data": records,
+        "count": len(records),
+        "message": f"Successfully retrieved first {numberOfRecords} records"
+    }, 200
+
+
+def tailPayload(dataSetPath, args):
+    """Last n records (default 10)"""
+    numberOfRecords = max(0, args.get('n', 10, type=int))
+    total_records = getDatasetMetadata(dataSetPath)["rows"]
+    records = frame_to_records(getDataRows(dataSetPath, max(total_records - numberOfRecords, 0), total_records))
+    return {
+        "data": records,
+        "count": len(records),
+        "message": f"Successfully retrieved last {numberOfRecords} records"
+    }, 200
+
+
+def samplePayload(dataSetPath, args):
+    """Random sample of records, sized by the size parameter"""
+    size = args.get('size', 5, type=int)
+    data = getData(dataSetPath)
+    if data is None:
+        return {"error": "Failed to load dataset"}, 500
+    sample_data = data.sample(n=min(size, len(data)))
+    records = frame_to_records(sample_data)
+    return {
+        "data": records,
+        "count": len(records),
+        "message": f"Successfully retrieved {len(records)} sample records"
+    }, 200
+
+
+def paginatedPayload(dataSetPath, args):
+    """One page of records, addressed by page/per_page or by cursor"""
+    page = args.get('page', 1, type=int)
+    per_page = max(1, args.get('per_page', 10, type=int))
+    cursor = args.get('cursor')
+    sort = splitList(args.get('sort'))
+    order_param = args.get('order', 'asc').lower()
+    if order_param not in ('asc', 'desc'):
+        return {"error": f"Invalid order '{order_param}', expected asc or desc"}, 400
+
+    if sort:
+        # Sorted pages are a slice of the cached sort permutation of the pinned version
+        entry = getDatasetEntry(dataSetPath)
+        order = functions.getSortOrder(dataSetPath, sort, ascending=(order_param == 'asc'))
+        if order is None:
+            return {"error": f"Cannot sort by {sort}"}, 400
+        total_records = len(order)
+        version = entry.version
+    else:
+        # Totals come from cached metadata so a page never needs the full dataset
+        metadata = getDatasetMetadata(dataSetPath)
+        total_records = metadata["rows"]
+        version = metadata["version"]
+    total_pages = (total_records + per_page - 1) // per_page
+
+    if cursor:
+        try:
+            position = decode_cursor(cursor, version, sort, order_param)
+            if sort:
+                # Keyset cursor: resume right after the last row sent
+                start_idx = keyset_position(entry.frame, order, sort, order_param == 'asc', position)
+            else:
+                start_idx = position.offset
+        except InvalidCursorError as e:
+            return {"error": str(e)}, 400
+        page = start_idx // per_page + 1
+    else:
+        # Ensure page is within valid range
+        page = max(1, min(page, total_pages))
+        start_idx = (page - 1) * per_page
+    end_idx = start_idx + per_page
+
+    if sort:
+        rows = order[start_idx:end_idx]
+        page_data = entry.frame.iloc[rows]
+        next_cursor = encode_keyset_cursor(entry.frame, rows[-1], sort, order_param) if end_idx < total_records else None
+    else:
+        page_data = getDataRows(dataSetPath, start_idx, end_idx)
+        next_cursor = encode_cursor(end_idx, version) if end_idx < total_records else None
+    records = frame_to_records(page_data)
+
+    return {
+        "data": records,
+        "count": len(records),
+        "pagination": {
+            "page": page,
+            "per_page": per_page,
+            "total": total_records,
+            "pages": total_pages,
+            "next_cursor": next_cursor
+        },
+        "message": f"Successfully retrieved page {page} of {total_pages}"
+    }, 200
+
+
+def queryPayload(dataSetPath, args):
+    """Filtered, projected and sorted records, driven by the query parameters"""
+    fields = splitList(args.get('fields'))
+    filters = args.getlist('filter')
+    sort = splitList(args.get('sort'))
+    order = args.get('order', 'asc').lower()
+    limit = args.get('limit', DEFAULT_QUERY_LIMIT, type=int)
+    offset = max(0, args.get('offset', 0, type=int))
+    if order not in ('asc', 'desc'):
+        return {"error": f"Invalid order '{order}', expected asc or desc"}, 400
+    if limit is not None and limit < 0:
+        return {"error": "limit must not be negative"}, 400
+
+    try:
+        result, total = functions.queryData(
+            dataSetPath,
+            fields=fields,
+            filters=filters,
+            sort=sort,
+            ascending=(order == 'asc'),
+            limit=limit,
+            offset=offset
+        )
+    except QueryError as e:
+        return {"error": str(e)}, 400
+
+    records = frame_to_records(result)
+    return {
+        "data": records,
+        "count": len(records),
+        "total": total,
+        "query": {
+            "fields": list(result.columns),
+            "filters": filters,
+            "sort": sort,
+            "order": order,
+            "limit": limit,
+            "offset": offset
+        },
+        "message": f"Successfully retrieved {len(records)} of {total} matching records"
+    }, 200
+
+
+def aggregatePayload(dataSetPath, args):
+    """Group-by aggregation driven by the by and agg parameters"""
+    groupBy = splitList(args.get('by'))
+    aggregations = splitList(args.get('agg')) or ['count']
+    limit = args.get('limit', type=int)
+    if not groupBy:
+        return {"error": "At least one group column is required in 'by'"}, 400
+    if limit is not None and limit < 0:
+        return {"error": "limit must not be negative"}, 400
+
+    try:
+        result = functions.aggregateData(dataSetPath, groupBy, aggregations)
+    except AggregationError as e:
+        return {"error": str(e)}, 400
+
+    total = len(result)
+    if limit is not None:
+        result = result.iloc[:limit]
+    records = frame_to_records(result)
+    return {
+        "data": records,
+        "count": len(records),
+        "groups": total,
+        "aggregation": {
+            "by": groupBy,
+            "agg": aggregations
+        },
+        "message": f"Successfully aggregated {total} groups"
+    }, 200
+
+
+def shapeResponse(dataSetPath):
+    return respond(shapePayload, dataSetPath)
+
+
+def uniqueValuesResponse(dataSetPath, columnName):
+    return respond(uniqueValuesPayload, dataSetPath, columnName)
+
+
+def columnCountsResponse(dataSetPath, columnName):
+    return respond(columnCountsPayload, dataSetPath, columnName)
+
+
+def columnStatsResponse(dataSetPath, columnName):
+    return respond(columnStatsPayload, dataSetPath, columnName)
+
+
+def columnsResponse(dataSetPath):
+    return respond(columnsPayload, dataSetPath)
+
+
+def sampleResponse(dataSetPath):
+    return respond(samplePayload, dataSetPath, request.args)
+
+
+def paginatedResponse(dataSetPath):
+    return respond(paginatedPayload, dataSetPath, request.args)
+
+
+def queryResponse(dataSetPath):
+    return respond(queryPayload, dataSetPath, request.args)
+
+
+def aggregateResponse(dataSetPath):
+    return respond(aggregatePayload, dataSetPath, request.args)
@@ -0,0 +1,537 @@
+import os
+
+from flask import Blueprint, jsonify
+from configs.dataset_config import dataset_config
+from utils.conditional import conditional
+from utils.response_cache import cached_response
+from .dataset_views import (
+    aggregateResponse,
+    columnCountsResponse,
+    columnStatsResponse,
+    columnsResponse,
+    paginatedResponse,
+    queryResponse,
+    sampleResponse,
+    shapeResponse,
+    uniqueValuesResponse,
+)
+
+# Create Blueprint for routes addressing any configured dataset by name
+datasets_bp = Blueprint('datasets', __name__)
+
+
+def resolveDatasetPath(datasetName):
+    """Map a dataset name from the URL to its file path, or None if it is not configured"""
+    try:
+        return dataset_config.get_dataset_path(datasetName)
+    except ValueError:
+        return None
+
+
+def datasetPathFromView(datasetName, **kwargs):
+    """Dataset file of a /api/datasets/<datasetName>/... view, for the HTTP validators"""
+    return resolveDatasetPath(datasetName)
+
+
+def datasetNotFound(datasetName):
+    return jsonify({
+        "error": f"Unknown dataset: {datasetName}",
+        "available_datasets": list(dataset_config.get_all_dataset_paths().keys())
+    }), 404
+
+
+@datasets_bp.route('/api/datasets')
+def listDatasets():
+    """
+    List all configured datasets
+    ---
+    tags:
+      - Datasets
+    responses:
+      200:
+        description: Configured datasets and whether their files are available
+        schema:
+          type: object
+          properties:
+            datasets:
+              type: array
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                  file:
+                    type: string
+                  available:
+                    type: boolean
+            message:
+              type: string
+    """
+    try:
+        datasets = [
+            {
+                "name": name,
+                "file": os.path.basename(path),
+                "available": os.path.exists(path)
+            }
+            for name, path in dataset_config.get_all_dataset_paths().items()
+        ]
+        return jsonify({
+            "datasets": datasets,
+            "message": "Successfully retrieved configured datasets"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/shape')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetShape(datasetName):
+    """
+    Get the shape of a dataset
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+    responses:
+      200:
+        description: Dataset shape
+        schema:
+          type: object
+          properties:
+            shape:
+              type: array
+              items:
+                type: integer
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return shapeResponse(dataSetPath)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/columns')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetColumns(datasetName):
+    """
+    Get the columns and dtypes of a dataset
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+    responses:
+      200:
+        description: Dataset column information
+        schema:
+          type: object
+          properties:
+            columns:
+              type: array
+              items:
+                type: string
+            dtypes:
+              type: object
+            memory:
+              type: object
+              description: Bytes before and after dtype compaction, in total and per column
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return columnsResponse(dataSetPath)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/sample')
+def getNamedDatasetSample(datasetName):
+    """
+    Get a random sample of dataset records
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: size
+        in: query
+        type: integer
+        default: 5
+        description: Number of records to return
+    responses:
+      200:
+        description: Sample dataset records
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+            count:
+              type: integer
+            message:
+              type: string
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return sampleResponse(dataSetPath)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/paginated')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetPaginated(datasetName):
+    """
+    Get paginated dataset records
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Page number (1-based)
+      - name: per_page
+        in: query
+        type: integer
+        default: 10
+        description: Records per page
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from pagination.next_cursor, takes precedence over page; pass the same sort and order
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: Comma-separated columns to sort by
+        example: "Name"
+      - name: order
+        in: query
+        type: string
+        enum: [asc, desc]
+        default: asc
+        description: Sort order
+    responses:
+      200:
+        description: Paginated dataset records
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+            pagination:
+              type: object
+            message:
+              type: string
+      400:
+        description: Invalid cursor, stale unsorted cursor, or one issued for another sort or order
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return paginatedResponse(dataSetPath)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/unique-values/<string:columnName>')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetUniqueValues(datasetName, columnName):
+    """
+    Get the unique values of a dataset column
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of the column
+        example: "NOC"
+    responses:
+      200:
+        description: Unique column values
+        schema:
+          type: object
+          properties:
+            unique_values:
+              type: array
+              items:
+                type: string
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return uniqueValuesResponse(dataSetPath, columnName)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/column-counts/<string:columnName>')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetColumnCounts(datasetName, columnName):
+    """
+    Get the value counts of a dataset column
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of the column
+        example: "NOC"
+    responses:
+      200:
+        description: Column value counts
+        schema:
+          type: object
+          properties:
+            value_counts:
+              type: object
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return columnCountsResponse(dataSetPath, columnName)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/column-stats/<string:columnName>')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def getNamedDatasetColumnStats(datasetName, columnName):
+    """
+    Get precomputed statistics of a dataset column
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: columnName
+        in: path
+        type: string
+        required: true
+        description: Name of the column
+        example: "NOC"
+    responses:
+      200:
+        description: Column statistics
+        schema:
+          type: object
+          properties:
+            column:
+              type: string
+            statistics:
+              type: object
+      404:
+        description: Unknown dataset or column
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return columnStatsResponse(dataSetPath, columnName)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/query')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def queryNamedDataset(datasetName):
+    """
+    Filter, project and sort dataset records on the server
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated columns to return, all columns when omitted
+        example: "Name,NOC"
+      - name: filter
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: "Repeatable filter written as column:operator:value, operators eq, ne, gt, gte, lt, lte and in (values separated by |)"
+        example: "NOC:in:Norway|Spain"
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: Comma-separated columns to sort by
+        example: "Name"
+      - name: order
+        in: query
+        type: string
+        enum: [asc, desc]
+        default: asc
+        description: Sort order
+      - name: limit
+        in: query
+        type: integer
+        default: 100
+        description: Maximum number of records to return
+      - name: offset
+        in: query
+        type: integer
+        default: 0
+        description: Number of matching records to skip
+    responses:
+      200:
+        description: Matching records
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+            count:
+              type: integer
+            total:
+              type: integer
+              description: Number of records matching the filters
+            query:
+              type: object
+            message:
+              type: string
+      400:
+        description: Invalid column, operator or value
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return queryResponse(dataSetPath)
+
+
+@datasets_bp.route('/api/datasets/<string:datasetName>/aggregate')
+@conditional(datasetPathFromView)
+@cached_response(datasetPathFromView)
+def aggregateNamedDataset(datasetName):
+    """
+    Group dataset records by one or more columns and aggregate them
+    ---
+    tags:
+      - Datasets
+    parameters:
+      - name: datasetName
+        in: path
+        type: string
+        required: true
+        enum: [athletes, student, coaches, entries_gender, medals, teams]
+        description: Name of the dataset
+      - name: by
+        in: query
+        type: string
+        required: true
+        description: Comma-separated columns to group by
+        example: "NOC,Discipline"
+      - name: agg
+        in: query
+        type: string
+        required: false
+        default: count
+        description: "Comma-separated aggregations, count for rows per group or column:function with function count, sum, mean, min or max"
+        example: "count,GPA:mean"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of groups to return
+    responses:
+      200:
+        description: One record per group, ordered by the group columns
+        schema:
+          type: object
+          properties:
+            data:
+              type: array
+              items:
+                type: object
+            count:
+              type: integer
+            groups:
+              type: integer
+              description: Total number of groups
+            aggregation:
+              type: object
+            message:
+              type: string
+      400:
+        description: Invalid column or aggregation
+      404:
+        description: Unknown dataset
+    """
+    dataSetPath = resolveDatasetPath(datasetName)
+    if dataSetPath is None:
+        return datasetNotFound(datasetName)
+    return aggregateResponse(dataSetPath)
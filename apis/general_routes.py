@@ -1,5 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
 from ServiceFunctions import ServiceFunctions
+from configs.server_config import server_config
+from utils import metrics
+from utils.startup import startup_report
+from utils.warmup import warmup_state
 
 # Create Blueprint for general routes
 general_bp = Blueprint('general', __name__)
@@ -95,3 +99,78 @@ def hello():
         },
         "documentation": "/apidocs/"
     })
+
+@general_bp.route('/api/ready')
+def ready():
+    """
+    Readiness probe
+    ---
+    tags:
+      - General
+    responses:
+      200:
+        description: Worker is ready (warmup finished or disabled)
+        schema:
+          type: object
+          properties:
+            ready:
+              type: boolean
+            warmup:
+              type: object
+      503:
+        description: Warmup still running or failed
+    """
+    report = warmup_state.report()
+    status_code = 200 if warmup_state.ready else 503
+    return jsonify({"ready": warmup_state.ready, "warmup": report}), status_code
+
+@general_bp.route('/api/startup')
+def startup():
+    """
+    Startup-time report of this worker
+    ---
+    tags:
+      - General
+    responses:
+      200:
+        description: Time spent in startup phases, loaded modules and peak memory
+        schema:
+          type: object
+          properties:
+            startup:
+              type: object
+            message:
+              type: string
+    """
+    try:
+        return jsonify({
+            "startup": startup_report(),
+            "message": "Startup report retrieved successfully"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@general_bp.route('/metrics')
+def prometheusMetrics():
+    """
+    Prometheus metrics
+    ---
+    tags:
+      - General
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: "Request, latency, response size, cache and dataset load metrics in the Prometheus text format (aggregated over all workers when PROMETHEUS_MULTIPROC_DIR is set)"
+        schema:
+          type: string
+      503:
+        description: prometheus_client is not installed or METRICS_ENABLED is off
+    """
+    if not metrics.metrics_available() or not server_config.metrics_enabled:
+        return jsonify({"error": "Metrics are not available"}), 503
+    try:
+        body, content_type = metrics.exposition()
+        return Response(body, content_type=content_type)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -4,13 +4,21 @@ from .general_routes import general_bp
 from .student_routes import student_bp
 from .athlete_routes import athlete_bp
 from .dataset_routes import dataset_bp
+from .datasets_routes import datasets_bp
+from .chart_routes import chart_bp
+from .batch_routes import batch_bp
+from .admin_routes import admin_bp
 
 # List of all blueprints to register
 blueprints = [
     general_bp,
     student_bp,
     athlete_bp,
-    dataset_bp
+    dataset_bp,
+    datasets_bp,
+    chart_bp,
+    batch_bp,
+    admin_bp
 ]
 
 def register_blueprints(app):
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, request
 from ServiceFunctions import ServiceFunctions, getCSVData
 from configs.dataset_config import dataset_config
+from utils.conditional import conditional
+from utils.response_cache import cached_response
+from utils.serialization import frame_to_records
+from utils.streaming import stream_records_response, wants_ndjson, wants_stream
 
 # Create Blueprint for student routes
 student_bp = Blueprint('student', __name__)
@@ -28,6 +32,8 @@ def getStudentDataRaw():
         return None
 
 @student_bp.route('/studentsInfo')
+@conditional(studentDataSetPath)
+@cached_response(studentDataSetPath)
 def studentInformation():
     """
     Get student performance data
@@ -45,6 +51,8 @@ def studentInformation():
 
 # JSON API endpoints
 @student_bp.route('/api/students/head')
+@conditional(studentDataSetPath)
+@cached_response(studentDataSetPath)
 def studentsDataHead():
     """
     Get first 10 student records as JSON
@@ -70,7 +78,7 @@ def studentsDataHead():
         data = getStudentDataRaw()
         if data is not None:
             # Convert DataFrame to JSON-serializable format
-            records = data.to_dict('records')
+            records = frame_to_records(data)
             return jsonify({
                 "data": records,
                 "count": len(records),
@@ -82,12 +90,29 @@ def studentsDataHead():
         return jsonify({"error": str(e)}), 500
 
 @student_bp.route('/api/students/all')
+@conditional(studentDataSetPath)
+@cached_response(studentDataSetPath, streamed=True)
 def studentsDataAll():
     """
     Get all student records as JSON
     ---
     tags:
       - Students API
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [json, ndjson]
+        default: json
+        description: "Response format, NDJSON can also be requested with Accept: application/x-ndjson"
+      - name: stream
+        in: query
+        type: boolean
+        default: true
+        description: Stream the response in chunks instead of serializing it in one piece
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
         description: All student records in JSON format
@@ -106,12 +131,16 @@ def studentsDataAll():
     try:
         data = getCSVData(studentDataSetPath)
         if data is not None:
+            message = "Successfully retrieved all student records"
+            ndjson = wants_ndjson(request)
+            if ndjson or wants_stream(request):
+                return stream_records_response(data, message, ndjson=ndjson)
             # Convert DataFrame to JSON-serializable format
-            records = data.to_dict('records')
+            records = frame_to_records(data)
             return jsonify({
                 "data": records,
                 "count": len(records),
-                "message": "Successfully retrieved all student records"
+                "message": message
             })
         else:
             return jsonify({"error": "Failed to load student data"}), 500
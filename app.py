@@ -1,3 +1,5 @@
+import sys
+
 from flask import Flask
 from flasgger import Swagger
 
@@ -7,22 +9,90 @@ from configs.swagger_config import swagger_config, swagger_template
 # Import routes
 from apis.routes import register_blueprints
 
-def create_app():
-    """Application factory pattern"""
+# Import DataFrame-aware JSON serialization
+from utils.serialization import DataFrameJSONProvider
+
+# Import HTTP caching policies, response compression, request timing, metrics and profiling
+from utils import compression, conditional, metrics, profiling, timing
+
+# Import startup-time reporting and warmup
+from configs.server_config import server_config
+from utils.startup import record_phase
+from utils.warmup import start_warmup
+
+# Import background reload of changed data files
+from configs.cache_config import cache_config
+from utils.watcher import start_watcher
+
+def create_app(warmup=None, watch=None):
+    """
+    Application factory pattern
+    
+    Args:
+        warmup (bool): Preload datasets and hot responses in the background before
+            /api/ready reports ready (default: the WARMUP_ENABLED setting)
+        watch (bool): Reload changed data files in the background and swap them in
+            (default: the DATASET_WATCH_ENABLED setting)
+    """
     app = Flask(__name__)
     
+    # Serialize DataFrames column-wise, using orjson when it is installed
+    app.json = DataFrameJSONProvider(app)
+    
     # Initialize Swagger
     swagger = Swagger(app, config=swagger_config, template=swagger_template)
     
     # Register all API blueprints
     register_blueprints(app)
     
+    # Time load/compute/serialize/compress per request (Server-Timing header and
+    # JSON request log); registered first so its after_request hook runs last
+    timing.init_app(app)
+    
+    # Count requests, latency, response sizes and in-flight requests for /metrics
+    metrics.init_app(app)
+    
+    # Compress JSON/HTML responses (after_request hooks run in reverse order,
+    # so compression sees the final Cache-Control header)
+    compression.init_app(app)
+    
+    # Add the configured Cache-Control policy to every response
+    conditional.init_app(app)
+    
+    # Profile requests that present the profiling token (or a random sample);
+    # registered last so its hooks sit closest to the view
+    profiling.init_app(app)
+    
+    # Warm datasets, indexes and hot responses before taking traffic
+    if server_config.warmup_enabled if warmup is None else warmup:
+        start_warmup(app)
+    
+    # Follow the data directory and hot-swap changed datasets
+    if cache_config.watch_enabled if watch is None else watch:
+        start_watcher()
+    
     return app
 
-# Create the Flask app
-app = create_app()
+# Print the import-time breakdown instead of serving, before an app (and its
+# warmup or watcher threads) is created
+if __name__ == '__main__' and '--import-report' in sys.argv:
+    from utils.startup import main as import_report
+    sys.exit(import_report([arg for arg in sys.argv[1:] if arg != '--import-report']))
+
+def __getattr__(name):
+    # The Flask app of gunicorn app:app, flask run and asgi.py is created on first
+    # access, so importing create_app alone starts no warmup or watcher
+    global app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with record_phase('create_app'):
+        app = create_app()
+    return app
 
 if __name__ == '__main__':
-   
+    # Create the Flask app
+    with record_phase('create_app'):
+        app = create_app()
+
     # Run the app
     app.run(debug=True, host='0.0.0.0', port=5001)
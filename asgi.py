@@ -0,0 +1,20 @@
+# Production entry point: the Flask app behind an ASGI server
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5001 --workers 4
+#
+# The event loop only accepts connections and moves bytes; Flask views, which
+# parse datasets and serialize responses, run on a bounded pool of
+# ASGI_THREADS threads, so a slow reload occupies one thread instead of the
+# whole worker. Dataset loads themselves go through the dataset cache's own
+# bounded pool (DATASET_LOAD_WORKERS) and concurrent requests for the same cold
+# dataset share a single load.
+#
+# With more than one worker, export PROMETHEUS_MULTIPROC_DIR (an empty
+# directory) before starting uvicorn, otherwise /metrics only reports the
+# worker that answered the scrape; see the Metrics section of the README.
+from a2wsgi import WSGIMiddleware
+
+from app import app
+from configs.server_config import server_config
+
+application = WSGIMiddleware(app, workers=server_config.request_workers)
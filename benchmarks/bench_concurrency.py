@@ -0,0 +1,178 @@
+"""
+Benchmark: throughput of a real server under concurrent clients.
+
+Starts the app in a subprocess (uvicorn on asgi:application by default, or the
+threaded Werkzeug development server with --server werkzeug) and then:
+
+1. Cold start: fires one request per client at a dataset that is not loaded
+   yet, and reads /api/dataset/cache to show how many loads actually ran
+   (concurrent misses are coalesced into one).
+2. Throughput: for each concurrency level, clients issue requests over
+   keep-alive connections for a fixed duration; reports requests/second and
+   p50/p95/p99 latency.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--server uvicorn|werkzeug] [--concurrency 1 8 64] [--duration 5]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = [
+    '/api/dataset/shape',
+    '/api/datasets/athletes/column-counts/NOC',
+    '/api/datasets/athletes/paginated?page=3&per_page=50',
+    '/api/datasets/student/query?filter=Age:eq:16&limit=20',
+    '/api/datasets/student/aggregate?by=Gender,Sports&agg=count,GPA:mean',
+]
+COLD_PATH = '/api/datasets/teams/shape'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, env=None):
+    env = dict(os.environ, PYTHONUNBUFFERED='1', **(env or {}))
+    if kind == 'uvicorn':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:application',
+                   '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-c',
+                   f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+def _get(connection, path, body=None):
+    # A JSON body turns the request into a POST (e.g. /api/batch)
+    if body is None:
+        connection.request('GET', path, headers={'Accept-Encoding': 'identity'})
+    else:
+        connection.request('POST', path, body=json.dumps(body),
+                           headers={'Accept-Encoding': 'identity', 'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def cold_start(port, clients):
+    barrier = threading.Barrier(clients)
+    statuses = []
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        barrier.wait()
+        statuses.append(_get(connection, COLD_PATH))
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('GET', '/api/dataset/cache')
+    cache = json.loads(connection.getresponse().read())['cache']
+    connection.close()
+    print(f"Cold start: {clients} concurrent requests for {COLD_PATH} in {elapsed:.3f}s, "
+          f"statuses {sorted(set(statuses))}, loads {cache['misses']}, coalesced {cache.get('coalesced', 0)}")
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(port, clients, duration, paths, body=None):
+    """Run clients over keep-alive connections for duration seconds; returns latencies and errors"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local = []
+        index = offset
+        while time.perf_counter() < stop_at:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                status = _get(connection, path, body)
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            local.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def throughput(port, clients, duration, paths):
+    latencies, errors = measure(port, clients, duration, paths)
+    if not latencies:
+        print(f"  {clients:>3} clients: no successful requests ({len(errors)} errors)")
+        return
+    print(f"  {clients:>3} clients: {len(latencies) / duration:9.1f} req/s   "
+          f"p50 {_percentile(latencies, 0.50) * 1000:7.2f} ms   "
+          f"p95 {_percentile(latencies, 0.95) * 1000:7.2f} ms   "
+          f"p99 {_percentile(latencies, 0.99) * 1000:7.2f} ms   "
+          f"errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of a real server under concurrent clients")
+    parser.add_argument('--server', choices=['uvicorn', 'werkzeug'], default='uvicorn')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds per concurrency level")
+    args = parser.parse_args()
+
+    port = _free_port()
+    process = start_server(args.server, port)
+    try:
+        cold_start(port, max(args.concurrency))
+        print(f"Throughput ({args.server}, {args.duration:g}s per level):")
+        for clients in args.concurrency:
+            throughput(port, clients, args.duration, DEFAULT_PATHS)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+"""
+Benchmark: latency, throughput and memory of every API route.
+
+Every GET route registered by apis.routes.register_blueprints is requested with
+sample arguments (URL_ARGUMENTS, ENDPOINT_ARGUMENTS), and the POST routes with
+a sample JSON body (ENDPOINT_BODIES), in two modes:
+
+- client: in-process through the Flask test client, in a fresh subprocess per
+  data set. "cold" drops the dataset cache and every derived cache before each
+  request (sidecars on disk stay, as for a restarted worker); "warm" repeats
+  the request against filled caches. Each route reports p50/p95/p99 latency,
+  requests/second, the process's peak RSS so far and, from a separate pass
+  under tracemalloc, the peak bytes allocated and the net allocated blocks
+  per request.
+- server: against uvicorn (asgi:application) in a subprocess. "cold" is the
+  first request of each route after the server started, then every
+  --concurrency level runs for --duration seconds.
+
+Both run on the bundled data/ files (scale 1) and on synthetic copies with the
+rows of every dataset repeated --scale times. Results are written as JSON;
+with --baseline they are compared with an earlier run, and regressions beyond
+--threshold percent make the exit status 1.
+
+Usage:
+    python -m benchmarks.bench_endpoints [--mode client server] [--scale 1 10]
+        [--iterations 30] [--concurrency 1 8] [--duration 1]
+        [--output results.json] [--baseline baseline.json] [--threshold 20]
+"""
+import argparse
+import gc
+import http.client
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from statistics import median
+
+from benchmarks.bench_concurrency import ROOT, _free_port, _get, _percentile, measure, start_server
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Sample values of URL arguments, shared by every route using them
+URL_ARGUMENTS = {
+    'datasetName': 'athletes',
+    'columnName': 'NOC',
+    'column1': 'Discipline',
+    'column2': 'NOC',
+    'numberOfRecords': 10,
+}
+# Per-endpoint arguments; names that are not URL arguments become query parameters
+ENDPOINT_ARGUMENTS = {
+    'dataset.getDatasetPaginated': {'page': 3, 'per_page': 50, 'sort': 'NOC'},
+    'datasets.getNamedDatasetPaginated': {'page': 3, 'per_page': 50},
+    'datasets.queryNamedDataset': {'filter': 'NOC:in:Japan|France', 'limit': 100},
+    'datasets.aggregateNamedDataset': {'by': 'NOC,Discipline', 'agg': 'count'},
+    'charts.histogramChart': {'datasetName': 'student', 'columnName': 'GPA'},
+}
+# JSON bodies of the POST routes; other POST routes are skipped
+ENDPOINT_BODIES = {
+    'batch.runBatch': {
+        'dataset': 'athletes',
+        'operations': [
+            {'op': 'shape'},
+            {'op': 'column-counts', 'column': 'NOC'},
+            {'op': 'page', 'page': 3, 'per_page': 50, 'sort': 'NOC'},
+            {'op': 'query', 'filter': ['NOC:in:Japan|France'], 'limit': 100},
+            {'op': 'aggregate', 'by': 'NOC,Discipline', 'agg': 'count'},
+            {'op': 'column-stats', 'column': 'GPA', 'dataset': 'student'},
+        ],
+    },
+}
+# Excel sheets cannot hold more rows than this
+EXCEL_MAX_ROWS = 1048575
+
+
+def route_cases():
+    """One {endpoint, rule, url} per GET route of the registered blueprints, plus a body for POST routes"""
+    from flask import url_for
+
+    from apis.routes import blueprints
+    from app import create_app
+
+    app = create_app(warmup=False, watch=False)
+    names = {blueprint.name for blueprint in blueprints}
+    cases = []
+    with app.test_request_context():
+        for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+            if rule.endpoint.split('.')[0] not in names:
+                continue
+            body = ENDPOINT_BODIES.get(rule.endpoint) if 'POST' in rule.methods else None
+            if 'GET' not in rule.methods and body is None:
+                continue
+            values = {name: URL_ARGUMENTS[name] for name in rule.arguments if name in URL_ARGUMENTS}
+            values.update(ENDPOINT_ARGUMENTS.get(rule.endpoint, {}))
+            missing = rule.arguments - set(values)
+            if missing:
+                print(f"Skipping {rule.rule}: no sample value for {sorted(missing)}")
+                continue
+            case = {'endpoint': rule.endpoint, 'rule': rule.rule, 'url': url_for(rule.endpoint, **values)}
+            if body is not None:
+                case['body'] = body
+            cases.append(case)
+    return cases
+
+
+def scaled_data_dir(scale):
+    """Directory with every dataset's rows repeated scale times (the bundled files for scale 1)"""
+    import pandas as pd
+
+    from configs.dataset_config import dataset_config
+
+    if scale == 1:
+        return dataset_config.base_data_dir
+    directory = os.path.join(tempfile.gettempdir(), 'flask-api-bench', f'x{scale}')
+    os.makedirs(directory, exist_ok=True)
+    for path in dataset_config.get_all_dataset_paths().values():
+        if not os.path.exists(path):
+            continue
+        target = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+            continue
+        is_csv = path.lower().endswith('.csv')
+        frame = pd.read_csv(path) if is_csv else pd.read_excel(path)
+        scaled = pd.concat([frame] * scale, ignore_index=True)
+        if not is_csv and len(scaled) > EXCEL_MAX_ROWS:
+            raise ValueError(f"{os.path.basename(path)} x{scale} exceeds the {EXCEL_MAX_ROWS} rows of an Excel sheet")
+        print(f"Writing {target} ({len(scaled)} rows)")
+        temp_path = os.path.join(directory, f".tmp-{os.getpid()}-{os.path.basename(path)}")
+        if is_csv:
+            scaled.to_csv(temp_path, index=False)
+        else:
+            scaled.to_excel(temp_path, index=False)
+        os.replace(temp_path, target)
+    return directory
+
+
+def summarize(latencies):
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def reset_caches():
+    """Forget every loaded dataset and everything derived from it"""
+    from utils.aggregation import aggregation_engine
+    from utils.charts import chart_renderer
+    from utils.column_stats import column_stats_index
+    from utils.dataset_cache import dataset_cache
+    from utils.response_cache import response_cache
+    from utils.sort_index import sort_index_cache
+
+    for cache in (dataset_cache, column_stats_index, sort_index_cache, aggregation_engine,
+                  chart_renderer, response_cache):
+        cache.invalidate()
+
+
+def _request(client, case):
+    started = time.perf_counter()
+    if case.get('body') is None:
+        response = client.get(case['url'])
+    else:
+        response = client.post(case['url'], json=case['body'])
+    response.get_data()
+    elapsed = time.perf_counter() - started
+    response.close()
+    return elapsed, response.status_code
+
+
+def _allocations(client, case, iterations):
+    gc.collect()
+    tracemalloc.start()
+    peaks, blocks = [], []
+    try:
+        for _ in range(iterations):
+            before_blocks = sys.getallocatedblocks()
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            _request(client, case)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            blocks.append(sys.getallocatedblocks() - before_blocks)
+    finally:
+        tracemalloc.stop()
+    return {'peak_kb': round(median(peaks) / 1024, 1), 'net_blocks': int(median(blocks))}
+
+
+def run_client(cases, iterations, cold_repeats, alloc_iterations):
+    """Cold and warm timings of every case through the test client of this process"""
+    from app import create_app
+
+    app = create_app(warmup=False, watch=False)
+    # Routes that fail would log a traceback per request
+    app.logger.disabled = True
+    client = app.test_client()
+    results = []
+    for case in cases:
+        cold = []
+        for _ in range(cold_repeats):
+            reset_caches()
+            gc.collect()
+            cold.append(_request(client, case)[0])
+
+        warm = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            elapsed, status = _request(client, case)
+            warm.append(elapsed)
+        total = time.perf_counter() - started
+
+        results.append({
+            **case,
+            'status': status,
+            'cold': summarize(cold),
+            'warm': {**summarize(warm), 'throughput_rps': round(iterations / total, 1)},
+            'allocations': _allocations(client, case, alloc_iterations),
+            'peak_rss_mb': _peak_rss_mb(),
+        })
+    return results
+
+
+def _server_peak_rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r', encoding='utf-8') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def run_server(cases, data_dir, concurrency, duration):
+    """First-request latency and throughput per concurrency level of every case against uvicorn"""
+    port = _free_port()
+    process = start_server('uvicorn', port, env={'DATA_DIR': data_dir})
+    results = []
+    try:
+        for case in cases:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            started = time.perf_counter()
+            status = _get(connection, case['url'], case.get('body'))
+            first = time.perf_counter() - started
+            connection.close()
+
+            levels = {}
+            for clients in concurrency:
+                latencies, errors = measure(port, clients, duration, [case['url']], case.get('body'))
+                levels[str(clients)] = {
+                    **summarize(latencies),
+                    'throughput_rps': round(len(latencies) / duration, 1),
+                    'errors': len(errors),
+                }
+            results.append({
+                **case,
+                'status': status,
+                'cold': {'first_ms': round(first * 1000, 3)},
+                'concurrency': levels,
+                'peak_rss_mb': _server_peak_rss_mb(process.pid),
+            })
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return results
+
+
+def _client_subprocess(data_dir, args):
+    # A fresh interpreter per data set, so DATA_DIR and the peak RSS start clean
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+        output = handle.name
+    command = [sys.executable, '-m', 'benchmarks.bench_endpoints', '--worker', output,
+               '--iterations', str(args.iterations), '--cold-repeats', str(args.cold_repeats),
+               '--alloc-iterations', str(args.alloc_iterations)]
+    try:
+        # The service layer prints DataFrames while it works; keep them off the report
+        subprocess.run(command, cwd=ROOT, env=dict(os.environ, DATA_DIR=data_dir),
+                       stdout=subprocess.DEVNULL, check=True)
+        with open(output, 'r', encoding='utf-8') as handle:
+            return json.load(handle)
+    finally:
+        os.unlink(output)
+
+
+def print_run(run):
+    print(f"\n{run['mode']} x{run['scale']} ({run['data_dir']})")
+    for case in run['cases']:
+        if run['mode'] == 'client':
+            warm, cold = case['warm'], case['cold']
+            print(f"  {case['status']} {case['url'][:60]:<60} cold {cold['p50_ms']:9.2f} ms   "
+                  f"warm p50 {warm['p50_ms']:7.2f} p95 {warm['p95_ms']:7.2f} p99 {warm['p99_ms']:7.2f} ms   "
+                  f"{warm['throughput_rps']:8.1f} req/s   {case['allocations']['peak_kb']:8.1f} KB alloc")
+        else:
+            levels = '   '.join(
+                f"c{clients} {level.get('throughput_rps', 0):7.1f} req/s p95 {level.get('p95_ms', 0):7.2f} ms"
+                for clients, level in case['concurrency'].items()
+            )
+            print(f"  {case['status']} {case['url'][:60]:<60} first {case['cold']['first_ms']:9.2f} ms   {levels}")
+
+
+def _metrics(results):
+    """{(mode, scale, endpoint, metric): (value, lower_is_better)} of a result file"""
+    metrics = {}
+    for run in results['runs']:
+        for case in run['cases']:
+            key = (run['mode'], run['scale'], case['endpoint'])
+            if run['mode'] == 'client':
+                metrics[key + ('cold p50_ms',)] = (case['cold'].get('p50_ms'), True)
+                for name in ('p50_ms', 'p95_ms', 'p99_ms'):
+                    metrics[key + (f'warm {name}',)] = (case['warm'].get(name), True)
+                metrics[key + ('warm throughput_rps',)] = (case['warm'].get('throughput_rps'), False)
+                metrics[key + ('alloc peak_kb',)] = (case['allocations'].get('peak_kb'), True)
+            else:
+                for clients, level in case['concurrency'].items():
+                    metrics[key + (f'c{clients} p95_ms',)] = (level.get('p95_ms'), True)
+                    metrics[key + (f'c{clients} throughput_rps',)] = (level.get('throughput_rps'), False)
+    return metrics
+
+
+def compare(results, baseline, threshold, min_ms=0.1):
+    """Print metrics that moved by more than threshold percent; returns the number of regressions"""
+    current, previous = _metrics(results), _metrics(baseline)
+    regressions, improvements = [], []
+    for key, (value, lower_is_better) in current.items():
+        base = previous.get(key, (None,))[0]
+        if value is None or not base:
+            continue
+        # Sub-0.1 ms latencies are timer noise
+        if key[-1].endswith('_ms') and abs(value - base) < min_ms:
+            continue
+        change = (value - base) / base * 100
+        worse = change > threshold if lower_is_better else -change > threshold
+        better = -change > threshold if lower_is_better else change > threshold
+        if worse or better:
+            (regressions if worse else improvements).append((key, base, value, change))
+
+    for title, rows in (('Regressions', regressions), ('Improvements', improvements)):
+        print(f"\n{title} beyond {threshold:g}% against the baseline: {len(rows)}")
+        for (mode, scale, endpoint, metric), base, value, change in sorted(rows, key=lambda row: -abs(row[3])):
+            print(f"  {mode} x{scale} {endpoint:<40} {metric:<20} {base:10.2f} -> {value:10.2f} ({change:+.1f}%)")
+    return len(regressions)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, throughput and memory of every API route")
+    parser.add_argument('--mode', nargs='+', choices=['client', 'server'], default=['client', 'server'])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10],
+                        help="Row multipliers of the data sets; 1 is the bundled data/ directory")
+    parser.add_argument('--iterations', type=int, default=30, help="Warm requests per route (client mode)")
+    parser.add_argument('--cold-repeats', type=int, default=3, help="Cold requests per route (client mode)")
+    parser.add_argument('--alloc-iterations', type=int, default=5, help="Requests per route under tracemalloc")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8], help="Clients (server mode)")
+    parser.add_argument('--duration', type=float, default=1.0, help="Seconds per concurrency level and route")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/endpoints-<time>.json)")
+    parser.add_argument('--baseline', help="Earlier result file to compare against")
+    parser.add_argument('--threshold', type=float, default=20.0, help="Percent change reported as regression")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        results = run_client(route_cases(), args.iterations, args.cold_repeats, args.alloc_iterations)
+        with open(args.worker, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle)
+        return 0
+
+    cases = route_cases()
+    results = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'arguments': {name: value for name, value in vars(args).items() if name != 'worker'},
+        },
+        'runs': [],
+    }
+    for scale in args.scale:
+        data_dir = scaled_data_dir(scale)
+        for mode in args.mode:
+            if mode == 'client':
+                run_cases = _client_subprocess(data_dir, args)
+            else:
+                run_cases = run_server(cases, data_dir, args.concurrency, args.duration)
+            run = {'mode': mode, 'scale': scale, 'data_dir': data_dir, 'cases': run_cases}
+            results['runs'].append(run)
+            print_run(run)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"endpoints-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: DataFrame -> JSON response body.
+
+Compares the previous path (to_dict('records') + Flask's stdlib JSON provider)
+with the column-wise DataFrameJSONProvider on the bundled Athletes.xlsx and
+StudentPerformance.csv datasets.
+
+Usage:
+    python -m benchmarks.bench_serialization [--repeat N]
+"""
+import argparse
+import json
+import math
+import timeit
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from configs.dataset_config import dataset_config
+from ServiceFunctions import readSourceData
+from utils.serialization import DataFrameJSONProvider, frame_to_records, json_backend
+
+
+def _bench(label, func, repeat, number):
+    timings = timeit.repeat(func, repeat=repeat, number=number)
+    best = min(timings) / number
+    print(f"  {label:<38} best {best * 1000:9.2f} ms")
+    return best
+
+
+def _without_nan(value):
+    # NaN is written as NaN by the stdlib and as null by the DataFrame provider
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _without_nan(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_without_nan(item) for item in value]
+    return value
+
+
+def run(repeat=5, number=3):
+    app = Flask(__name__)
+    stdlib_provider = DefaultJSONProvider(app)
+    frame_provider = DataFrameJSONProvider(app)
+
+    print(f"JSON backend: {json_backend()}")
+    for name in ('athletes', 'student'):
+        frame = readSourceData(dataset_config.get_dataset_path(name))
+        print(f"\n{name}: {len(frame)} rows x {len(frame.columns)} columns")
+
+        baseline = _bench(
+            "to_dict('records') + stdlib provider",
+            lambda: stdlib_provider.dumps({"data": frame.to_dict('records'), "count": len(frame)}),
+            repeat, number,
+        )
+        optimized = _bench(
+            "frame_to_records + DataFrame provider",
+            lambda: frame_provider.dumps({"data": frame_to_records(frame), "count": len(frame)}),
+            repeat, number,
+        )
+        print(f"  speedup: {baseline / optimized:.2f}x")
+
+        # Both paths must describe the same records
+        expected = _without_nan(json.loads(json.dumps(frame.to_dict('records'), default=str)))
+        actual = _without_nan(json.loads(frame_provider.dumps(frame_to_records(frame))))
+        print(f"  identical output: {expected == actual}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=3)
+    args = parser.parse_args()
+    run(repeat=args.repeat, number=args.number)
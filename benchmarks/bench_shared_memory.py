@@ -0,0 +1,84 @@
+"""
+Benchmark: dataset memory across worker processes.
+
+Starts N fresh worker processes that each load every configured dataset, and
+reports how much memory the datasets add per worker and in total. Shared pages
+are charged proportionally (PSS), so with memory-mapped sidecars the total
+stays roughly flat as workers are added, while parsing per worker grows
+linearly.
+
+Usage (Linux only, reads /proc/self/smaps_rollup):
+    python -m benchmarks.bench_shared_memory [--workers 1 2 4 8] [--parse]
+"""
+import argparse
+import multiprocessing
+import os
+
+
+def _memory_kb():
+    values = {}
+    with open('/proc/self/smaps_rollup', 'r', encoding='utf-8') as handle:
+        for line in handle:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1].lower()] = int(parts[1])
+    return values
+
+
+def _worker(ready, go, results):
+    from configs.dataset_config import dataset_config
+    from ServiceFunctions import getData
+
+    before = _memory_kb()
+    for path in dataset_config.get_all_dataset_paths().values():
+        if os.path.exists(path):
+            getData(path)
+    ready.wait()
+    # Measure only once every worker has attached, so PSS reflects the sharing
+    go.wait()
+    after = _memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    ready.wait()
+
+
+def run(worker_counts, parse=False):
+    os.environ['SIDECAR_ENABLED'] = 'false' if parse else 'true'
+    if not parse:
+        from configs.dataset_config import dataset_config
+        from ServiceFunctions import readSourceData
+        from utils.sidecar import build_all_sidecars
+        build_all_sidecars(dataset_config, readSourceData)
+
+    context = multiprocessing.get_context('spawn')
+    mode = 'parse per worker' if parse else 'memory-mapped sidecars'
+    print(f"Dataset memory per worker ({mode})")
+    for count in worker_counts:
+        ready = context.Barrier(count + 1)
+        go = context.Barrier(count + 1)
+        results = context.Queue()
+        processes = [context.Process(target=_worker, args=(ready, go, results)) for _ in range(count)]
+        for process in processes:
+            process.start()
+        ready.wait()
+        go.wait()
+        samples = [results.get() for _ in range(count)]
+        ready.wait()
+        for process in processes:
+            process.join()
+        total_pss = sum(sample['pss'] for sample in samples)
+        avg_rss = sum(sample['rss'] for sample in samples) / count
+        print(f"  {count:>3} workers: total PSS {total_pss / 1024:8.1f} MB, "
+              f"avg RSS {avg_rss / 1024:8.1f} MB per worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--parse', action='store_true',
+                        help="Disable sidecars, so every worker parses its own copy")
+    args = parser.parse_args()
+    run(args.workers, parse=args.parse)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+class CacheConfig:
+    """Centralized configuration for the dataset cache and its on-disk sidecars"""
+
+    def __init__(self):
+        self._enabled = _env_flag('DATASET_CACHE_ENABLED', True)
+        self._max_megabytes = _env_int('DATASET_CACHE_MAX_MB', 512)
+        self._load_workers = _env_int('DATASET_LOAD_WORKERS', 2)
+        self._sidecar_enabled = _env_flag('SIDECAR_ENABLED', True)
+        self._sidecar_dir = os.environ.get('SIDECAR_DIR') or None
+        self._sidecar_shared_memory = _env_flag('SIDECAR_SHARED_MEMORY', False)
+        self._sort_cache_entries = _env_int('SORT_CACHE_MAX_ENTRIES', 64)
+        self._aggregation_cache_entries = _env_int('AGGREGATION_CACHE_MAX_ENTRIES', 128)
+        self._response_cache_megabytes = _env_int('RESPONSE_CACHE_MAX_MB', 64)
+        self._response_cache_encodings = os.environ.get('RESPONSE_CACHE_ENCODINGS', 'br,zstd,gzip')
+        self._response_cache_level = _env_int('RESPONSE_CACHE_COMPRESSION_LEVEL', None)
+        self._watch_enabled = _env_flag('DATASET_WATCH_ENABLED', False)
+        self._watch_interval_ms = _env_int('DATASET_WATCH_INTERVAL_MS', 1000)
+        self._watch_debounce_ms = _env_int('DATASET_WATCH_DEBOUNCE_MS', 500)
+        self._reload_retry_ms = _env_int('DATASET_RELOAD_RETRY_MS', 30000)
+
+    @property
+    def enabled(self):
+        """Whether parsed datasets are kept in memory between requests"""
+        return self._enabled
+
+    @property
+    def max_bytes(self):
+        """Upper bound for the memory held by cached DataFrames (0 disables the bound)"""
+        return max(self._max_megabytes, 0) * 1024 * 1024
+
+    @property
+    def load_workers(self):
+        """Number of threads parsing datasets; loads beyond it wait in line"""
+        return max(self._load_workers, 1)
+
+    @property
+    def sort_cache_entries(self):
+        """Number of sort permutations kept by the sort index cache"""
+        return max(self._sort_cache_entries, 0)
+
+    @property
+    def aggregation_cache_entries(self):
+        """Number of group-by results memoized by the aggregation engine"""
+        return max(self._aggregation_cache_entries, 0)
+
+    @property
+    def response_cache_max_bytes(self):
+        """Upper bound for the encoded responses kept by the response cache (0 disables it)"""
+        return max(self._response_cache_megabytes, 0) * 1024 * 1024
+
+    @property
+    def response_cache_encodings(self):
+        """Encodings cached responses are kept compressed in, once requested (those not installed are skipped)"""
+        return [encoding.strip() for encoding in self._response_cache_encodings.split(',') if encoding.strip()]
+
+    @property
+    def response_cache_level(self):
+        """Compression level of the cached compressed variants (None uses each codec's default)"""
+        return self._response_cache_level
+
+    @property
+    def watch_enabled(self):
+        """Whether changed data files are reloaded in the background and swapped in"""
+        return self._watch_enabled
+
+    @property
+    def watch_interval(self):
+        """Seconds between checks of the data directory when polling (without watchdog)"""
+        return max(self._watch_interval_ms, 50) / 1000.0
+
+    @property
+    def watch_debounce(self):
+        """Seconds a changed file must stay quiet before it is reloaded, so half-written files are skipped"""
+        return max(self._watch_debounce_ms, 0) / 1000.0
+
+    @property
+    def reload_retry(self):
+        """Seconds before a background reload that failed is tried again on the same file version"""
+        return max(self._reload_retry_ms, 0) / 1000.0
+
+    @property
+    def sidecar_enabled(self):
+        """Whether parsed datasets are persisted as columnar Arrow sidecar files"""
+        return self._sidecar_enabled
+
+    @property
+    def sidecar_shared_memory(self):
+        """Whether sidecars are kept in shared memory (/dev/shm) instead of next to the data"""
+        return self._sidecar_shared_memory and os.path.isdir(SHARED_MEMORY_DIR)
+
+    def sidecar_dir_for(self, dataSetPath):
+        """
+        Directory holding the sidecar of a dataset: SIDECAR_DIR, a folder in
+        /dev/shm with SIDECAR_SHARED_MEMORY, or a .sidecar folder next to it
+        """
+        if self._sidecar_dir:
+            return self._sidecar_dir
+        data_dir = os.path.dirname(os.path.abspath(dataSetPath))
+        if self.sidecar_shared_memory:
+            # One folder per data directory, so several deployments can share a host
+            digest = hashlib.sha1(data_dir.encode('utf-8')).hexdigest()[:12]
+            return os.path.join(SHARED_MEMORY_DIR, 'flask-api-sidecars', digest)
+        return os.path.join(data_dir, '.sidecar')
+
+# Create a global instance for use throughout the application
+cache_config = CacheConfig()
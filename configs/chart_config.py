@@ -0,0 +1,28 @@
+from configs.cache_config import _env_int
+
+
+class ChartConfig:
+    """Centralized configuration for server-rendered charts"""
+
+    def __init__(self):
+        self._workers = _env_int('CHART_WORKERS', 2)
+        self._cache_max_megabytes = _env_int('CHART_CACHE_MAX_MB', 32)
+        self._render_timeout = _env_int('CHART_RENDER_TIMEOUT', 30)
+
+    @property
+    def workers(self):
+        """Number of threads rendering charts off the request thread"""
+        return max(self._workers, 1)
+
+    @property
+    def cache_max_bytes(self):
+        """Upper bound for the memory held by rendered charts (0 disables caching)"""
+        return max(self._cache_max_megabytes, 0) * 1024 * 1024
+
+    @property
+    def render_timeout(self):
+        """Seconds a request waits for its chart before giving up"""
+        return max(self._render_timeout, 1)
+
+# Create a global instance for use throughout the application
+chart_config = ChartConfig()
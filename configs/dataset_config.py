@@ -1,7 +1,10 @@
+import json
 import os
 import pathlib
 from pathlib import Path
 
+from configs.cache_config import _env_flag, _env_int
+
 class DatasetConfig:
     """Centralized configuration for dataset paths"""
     
@@ -13,6 +16,28 @@ class DatasetConfig:
         self._entries_gender_file = "EntriesGender.xlsx"
         self._medals_file = "Medals.xlsx"
         self._teams_file = "Teams.xlsx"
+        self._dtype_compaction_enabled = _env_flag('DTYPE_COMPACTION_ENABLED', True)
+        self._category_max_percent = _env_int('DTYPE_CATEGORY_MAX_PERCENT', 50)
+        self._schema_overrides = self._load_schema_overrides()
+    
+    @staticmethod
+    def _load_schema_overrides():
+        """DATASET_SCHEMA_OVERRIDES is a JSON object: {dataset name: {column: dtype or "keep"}}"""
+        value = os.environ.get('DATASET_SCHEMA_OVERRIDES')
+        if not value:
+            return {}
+        try:
+            overrides = json.loads(value)
+        except ValueError:
+            print(f"Error: DATASET_SCHEMA_OVERRIDES is not valid JSON: {value}")
+            return {}
+        if not isinstance(overrides, dict) or not all(isinstance(columns, dict) for columns in overrides.values()):
+            print("Error: DATASET_SCHEMA_OVERRIDES must map dataset names to objects of column dtypes")
+            return {}
+        return {
+            str(name): {str(column): str(dtype) for column, dtype in columns.items()}
+            for name, columns in overrides.items()
+        }
     
     def _get_base_data_directory(self):
         """
@@ -80,6 +105,45 @@ class DatasetConfig:
         """Get the full path to the teams dataset"""
         return os.path.join(self._base_data_dir, self._teams_file)
     
+    def get_all_dataset_paths(self):
+        """
+        Get the full path of every configured dataset
+        
+        Returns:
+            dict: Mapping of dataset name to full path of the dataset file
+        """
+        return {
+            'athletes': self.athletes_dataset_path,
+            'student': self.student_dataset_path,
+            'coaches': self.coaches_dataset_path,
+            'entries_gender': self.entries_gender_dataset_path,
+            'medals': self.medals_dataset_path,
+            'teams': self.teams_dataset_path,
+        }
+    
+    @property
+    def dtype_compaction_enabled(self):
+        """Whether parsed datasets get categoricals and downcast numeric columns"""
+        return self._dtype_compaction_enabled
+    
+    @property
+    def category_max_ratio(self):
+        """Largest share of distinct values for which a string column becomes categorical"""
+        return min(max(self._category_max_percent, 0), 100) / 100.0
+    
+    def schema_overrides_for(self, dataset_path):
+        """
+        Get the column dtype overrides of the dataset stored at dataset_path
+        
+        Returns:
+            dict: Mapping of column name to dtype, or "keep" to leave the column as parsed
+        """
+        target = os.path.abspath(dataset_path)
+        for name, path in self.get_all_dataset_paths().items():
+            if os.path.abspath(path) == target:
+                return dict(self._schema_overrides.get(name, {}))
+        return {}
+    
     def get_dataset_path(self, dataset_name):
         """
         Get the full path for any dataset by name
@@ -93,14 +157,7 @@ class DatasetConfig:
         Raises:
             ValueError: If dataset_name is not recognized
         """
-        dataset_mapping = {
-            'athletes': self.athletes_dataset_path,
-            'student': self.student_dataset_path,
-            'coaches': self.coaches_dataset_path,
-            'entries_gender': self.entries_gender_dataset_path,
-            'medals': self.medals_dataset_path,
-            'teams': self.teams_dataset_path,
-        }
+        dataset_mapping = self.get_all_dataset_paths()
         
         if dataset_name not in dataset_mapping:
             raise ValueError(f"Unknown dataset: {dataset_name}. Available datasets: {list(dataset_mapping.keys())}")
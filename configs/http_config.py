@@ -0,0 +1,105 @@
+import json
+import os
+
+from configs.cache_config import _env_flag, _env_int
+
+# Endpoints whose responses must never be reused (random samples, live counters)
+DEFAULT_ROUTE_CACHE_CONTROL = {
+    'dataset.getDatasetSample': 'no-store',
+    'datasets.getNamedDatasetSample': 'no-store',
+    'dataset.getDatasetCacheStats': 'no-store',
+    'general.startup': 'no-store',
+    'general.ready': 'no-store',
+    'general.prometheusMetrics': 'no-store',
+    'admin.listProfiles': 'no-store',
+    'admin.downloadProfile': 'no-store',
+}
+
+
+class HttpConfig:
+    """Centralized configuration for HTTP caching: validators and Cache-Control policies"""
+
+    def __init__(self):
+        self._conditional_enabled = _env_flag('CONDITIONAL_REQUESTS_ENABLED', True)
+        self._conditional_max_entries = _env_int('CONDITIONAL_MAX_ENTRIES', 4096)
+        # no-cache lets clients keep responses but revalidate them with ETag/Last-Modified
+        self._default_cache_control = os.environ.get('HTTP_CACHE_CONTROL', 'no-cache')
+        self._route_cache_control = dict(DEFAULT_ROUTE_CACHE_CONTROL)
+        self._route_cache_control.update(self._load_route_overrides())
+        self._compression_enabled = _env_flag('COMPRESSION_ENABLED', True)
+        self._compression_min_bytes = _env_int('COMPRESSION_MIN_BYTES', 1024)
+        self._compression_level = _env_int('COMPRESSION_LEVEL', None)
+        self._compression_encodings = os.environ.get('COMPRESSION_ENCODINGS', 'br,zstd,gzip')
+        self._server_timing_enabled = _env_flag('SERVER_TIMING_ENABLED', True)
+        self._server_timing_log = _env_flag('SERVER_TIMING_LOG', True)
+
+    @staticmethod
+    def _load_route_overrides():
+        """HTTP_CACHE_CONTROL_ROUTES is a JSON object mapping endpoint names to policies"""
+        value = os.environ.get('HTTP_CACHE_CONTROL_ROUTES')
+        if not value:
+            return {}
+        try:
+            overrides = json.loads(value)
+        except ValueError:
+            print(f"Error: HTTP_CACHE_CONTROL_ROUTES is not valid JSON: {value}")
+            return {}
+        if not isinstance(overrides, dict):
+            print("Error: HTTP_CACHE_CONTROL_ROUTES must be a JSON object")
+            return {}
+        return {str(endpoint): str(policy) for endpoint, policy in overrides.items()}
+
+    @property
+    def conditional_enabled(self):
+        """Whether dataset endpoints send ETag/Last-Modified and answer conditional requests with 304"""
+        return self._conditional_enabled
+
+    @property
+    def conditional_max_entries(self):
+        """How many ETags of 200 responses are remembered for answering 304 without running the view"""
+        return max(self._conditional_max_entries, 0)
+
+    @property
+    def default_cache_control(self):
+        return self._default_cache_control
+
+    @property
+    def compression_enabled(self):
+        """Whether JSON/HTML responses are compressed for clients that accept it"""
+        return self._compression_enabled
+
+    @property
+    def compression_min_bytes(self):
+        """Buffered bodies smaller than this are sent uncompressed"""
+        return max(self._compression_min_bytes, 0)
+
+    @property
+    def compression_level(self):
+        """Compression level of on-the-fly compression (None uses each codec's default)"""
+        return self._compression_level
+
+    @property
+    def compression_encodings(self):
+        """Encodings offered to clients, in order of server preference"""
+        return [encoding.strip() for encoding in self._compression_encodings.split(',') if encoding.strip()]
+
+    @property
+    def server_timing_enabled(self):
+        """Whether requests are timed per phase and answered with a Server-Timing header"""
+        return self._server_timing_enabled
+
+    @property
+    def server_timing_log(self):
+        """Whether every timed request is also logged as one JSON line"""
+        return self._server_timing_log
+
+    def cache_control_for(self, endpoint):
+        """Cache-Control policy of a Flask endpoint (blueprint.function), or the default"""
+        return self._route_cache_control.get(endpoint, self._default_cache_control)
+
+    def set_cache_control(self, endpoint, policy):
+        """Override the Cache-Control policy of one endpoint"""
+        self._route_cache_control[endpoint] = policy
+
+# Create a global instance for use throughout the application
+http_config = HttpConfig()
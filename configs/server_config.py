@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+from configs.cache_config import _env_flag, _env_float, _env_int
+
+PROFILING_MODES = ('sample', 'cprofile')
+
+
+class ServerConfig:
+    """Centralized configuration for serving: the ASGI entry point, batches, startup warmup, metrics and profiling"""
+
+    def __init__(self):
+        self._request_workers = _env_int('ASGI_THREADS', 16)
+        self._batch_workers = _env_int('BATCH_WORKERS', 4)
+        self._batch_max_operations = _env_int('BATCH_MAX_OPERATIONS', 50)
+        self._warmup_enabled = _env_flag('WARMUP_ENABLED', False)
+        self._warmup_workers = _env_int('WARMUP_WORKERS', 4)
+        self._warmup_paths = os.environ.get('WARMUP_PATHS', '')
+        self._metrics_enabled = _env_flag('METRICS_ENABLED', True)
+        self._profiling_enabled = _env_flag('PROFILING_ENABLED', False)
+        self._profiling_token = os.environ.get('PROFILING_TOKEN', '')
+        self._profiling_sample_rate = _env_float('PROFILING_SAMPLE_RATE', 0.0)
+        self._profiling_mode = os.environ.get('PROFILING_MODE', 'sample').strip().lower()
+        if self._profiling_mode not in PROFILING_MODES:
+            print(f"Error: unknown PROFILING_MODE {self._profiling_mode!r}, using 'sample'")
+            self._profiling_mode = 'sample'
+        self._profiling_interval_ms = _env_int('PROFILING_INTERVAL_MS', 5)
+        self._profiling_dir = os.environ.get('PROFILING_DIR') or os.path.join(tempfile.gettempdir(), 'flask-api-profiles')
+        self._profiling_max_profiles = _env_int('PROFILING_MAX_PROFILES', 50)
+
+    @property
+    def request_workers(self):
+        """Threads running Flask views under the ASGI server; further requests queue up"""
+        return max(self._request_workers, 1)
+
+    @property
+    def batch_workers(self):
+        """Threads running the operations of /api/batch requests, shared by all requests"""
+        return max(self._batch_workers, 1)
+
+    @property
+    def batch_max_operations(self):
+        """Largest number of operations accepted in one /api/batch request"""
+        return max(self._batch_max_operations, 1)
+
+    @property
+    def warmup_enabled(self):
+        """Whether create_app() preloads every dataset and its hot responses before reporting ready"""
+        return self._warmup_enabled
+
+    @property
+    def warmup_workers(self):
+        """Number of datasets warmed up in parallel"""
+        return max(self._warmup_workers, 1)
+
+    @property
+    def warmup_paths(self):
+        """Extra request paths (WARMUP_PATHS, comma-separated) pre-serialized during warmup"""
+        return [path.strip() for path in self._warmup_paths.split(',') if path.strip()]
+
+    @property
+    def metrics_enabled(self):
+        """Whether create_app() installs the request metric hooks and /metrics serves them"""
+        return self._metrics_enabled
+
+    @property
+    def profiling_enabled(self):
+        """Whether create_app() installs the profiling hooks"""
+        return self._profiling_enabled
+
+    @property
+    def profiling_token(self):
+        """Secret a request must present to be profiled or to read profiles; empty disables both"""
+        return self._profiling_token
+
+    @property
+    def profiling_sample_rate(self):
+        """Fraction of all requests (0-1) profiled at random, without a token"""
+        return min(max(self._profiling_sample_rate, 0.0), 1.0)
+
+    @property
+    def profiling_mode(self):
+        """'sample' (stack sampler, flamegraph output) or 'cprofile' (deterministic, pstats output)"""
+        return self._profiling_mode
+
+    @property
+    def profiling_interval(self):
+        """Seconds between two stack samples"""
+        return max(self._profiling_interval_ms, 1) / 1000
+
+    @property
+    def profiling_dir(self):
+        """Directory of the profile ring buffer"""
+        return self._profiling_dir
+
+    @property
+    def profiling_max_profiles(self):
+        """Number of profiles kept; the oldest are deleted first"""
+        return max(self._profiling_max_profiles, 1)
+
+# Create a global instance for use throughout the application
+server_config = ServerConfig()
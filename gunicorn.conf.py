@@ -0,0 +1,48 @@
+# Gunicorn configuration for multi-worker deployments
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# The master process builds the columnar sidecar of every dataset once before
+# forking; each worker then memory-maps those files read-only instead of parsing
+# its own copy, so memory stays roughly flat as workers are added. When a data
+# file changes, the first worker to notice rebuilds its sidecar under a file
+# lock and the others attach to the new version.
+#
+# Metrics are written by every worker to PROMETHEUS_MULTIPROC_DIR (a fresh
+# directory per server start) so /metrics reports the totals of all workers.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Must be set before prometheus_client is imported, in the master and the workers
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'flask-api-metrics'))
+
+
+def on_starting(server):
+    """Act as the loader process: write every dataset's sidecar before workers start"""
+    # Values left over from a previous run would be added to this one's
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    from configs.dataset_config import dataset_config
+    from ServiceFunctions import readSourceData
+    from utils.sidecar import build_all_sidecars, sidecar_available
+
+    if not sidecar_available():
+        server.log.info("Sidecars disabled, every worker parses its own datasets")
+        return
+    for name, result in build_all_sidecars(dataset_config, readSourceData).items():
+        server.log.info(f"Sidecar {name}: {result['status']} ({result.get('seconds', 0)}s)")
+
+
+def child_exit(server, worker):
+    """Stop counting an exited worker's in-flight requests; its counters are kept"""
+    from utils.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
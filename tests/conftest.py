@@ -0,0 +1,39 @@
+"""Shared fixtures: the app serving a private copy of the data directory"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix='flask-api-tests-')
+shutil.copytree(os.path.join(ROOT, 'data'), DATA_DIR, dirs_exist_ok=True)
+
+# The configs read the environment when they are imported, so it is set first;
+# sidecars are written next to the copied files, never into the repository
+os.environ.update({
+    'DATA_DIR': DATA_DIR,
+    'WARMUP_ENABLED': '0',
+    'DATASET_WATCH_ENABLED': '0',
+    'SERVER_TIMING_LOG': '0',
+    'PROFILING_DIR': os.path.join(DATA_DIR, '.profiles'),
+})
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app(warmup=False, watch=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def response_cache():
+    from utils.response_cache import response_cache
+    response_cache.invalidate()
+    yield response_cache
+    response_cache.invalidate()
@@ -0,0 +1,51 @@
+"""Group-by aggregation must agree with pandas, exactly for integer and boolean columns"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.aggregation import AGGREGATIONS, AggregationError, compute_aggregation
+from utils.dataset_cache import DatasetEntry
+
+BIG = 2 ** 53
+
+
+def make_entry():
+    frame = pd.DataFrame({
+        'NOC': ['Japan', 'France', 'Japan', 'Spain', 'France', 'Japan'],
+        'Medal': ['Gold', 'Gold', 'Silver', 'Gold', 'Gold', 'Gold'],
+        'Total': np.array([BIG, 1, BIG + 1, 3, 5, 1], dtype=np.int64),
+        'Score': [1.5, 2.0, np.nan, 4.0, 0.5, 3.0],
+        'Podium': [True, False, True, True, False, False],
+    })
+    return DatasetEntry('/medals.csv', frame, 1, 1, 0.0)
+
+
+@pytest.mark.parametrize('column', ['Total', 'Score', 'Podium'])
+@pytest.mark.parametrize('function', [function for function in AGGREGATIONS if function != 'count'])
+def test_matches_pandas(column, function):
+    entry = make_entry()
+    result = compute_aggregation(entry, ['NOC'], [f"{column}:{function}"]).set_index('NOC')[f"{column}_{function}"]
+    expected = getattr(entry.frame.groupby('NOC')[column], function)()
+    assert result.tolist() == expected.tolist()
+
+
+def test_integer_sum_is_exact_beyond_float_precision():
+    result = compute_aggregation(make_entry(), ['NOC'], ['Total:sum']).set_index('NOC')['Total_sum']
+    assert result['Japan'] == 2 * BIG + 2
+    assert result.dtype == np.int64
+
+
+def test_boolean_sum_and_mean():
+    result = compute_aggregation(make_entry(), ['Medal'], ['Podium:sum', 'Podium:mean']).set_index('Medal')
+    assert result.loc['Gold', 'Podium_sum'] == 2
+    assert result.loc['Silver', 'Podium_mean'] == 1.0
+
+
+def test_repeated_group_key_is_rejected():
+    with pytest.raises(AggregationError):
+        compute_aggregation(make_entry(), ['NOC', 'NOC'], ['count'])
+
+
+def test_grouped_chart_of_one_column_is_a_bad_request(client):
+    response = client.get('/api/datasets/athletes/charts/grouped/NOC/NOC')
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+"""Batch endpoint: one pinned version per dataset, load failures reported per operation"""
+from apis import batch_routes
+from utils.pagination import decode_cursor
+
+
+def run(client, body):
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_unloadable_dataset_is_loaded_once_and_fails_its_operations(client, monkeypatch):
+    calls = []
+
+    def failing(dataSetPath):
+        calls.append(dataSetPath)
+        raise ValueError('corrupt file')
+
+    monkeypatch.setattr(batch_routes, 'getDatasetEntry', failing)
+    body = run(client, {'dataset': 'student', 'operations': [
+        {'op': 'shape'},
+        {'op': 'columns'},
+        {'op': 'column-counts', 'column': 'Gender'},
+    ]})
+    assert len(calls) == 1
+    assert [result['status'] for result in body['results']] == [500, 500, 500]
+    assert all('corrupt file' in result['result']['error'] for result in body['results'])
+    assert body['versions'] == {'student': None}
+
+
+def test_operations_share_the_pinned_version(client):
+    body = run(client, {'dataset': 'student', 'operations': [
+        {'op': 'shape'},
+        {'op': 'page', 'per_page': 5},
+    ]})
+    assert [result['status'] for result in body['results']] == [200, 200]
+    page = body['results'][1]['result']
+    # The page's cursor is bound to the same entry version the batch reports
+    assert decode_cursor(page['pagination']['next_cursor'], body['versions']['student']).offset == 5
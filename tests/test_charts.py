@@ -0,0 +1,86 @@
+"""Chart endpoints: rendered once per dataset version and parameters, revalidated by ETag"""
+import importlib.util
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.charts import ChartRenderer, chart_etag, chart_renderer
+from utils.dataset_cache import DatasetEntry
+
+pytestmark = pytest.mark.skipif(importlib.util.find_spec('matplotlib') is None, reason='matplotlib is not installed')
+
+URL = '/api/datasets/student/charts/histogram/GPA'
+
+
+@pytest.fixture
+def charts():
+    chart_renderer.invalidate()
+    yield chart_renderer
+    chart_renderer.invalidate()
+
+
+def test_chart_is_rendered_once_and_revalidated(client, charts):
+    renders = charts.stats()['renders']
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.mimetype == 'image/png'
+    assert first.data.startswith(b'\x89PNG')
+    etag = first.headers['ETag']
+
+    again = client.get(URL)
+    assert again.data == first.data
+    assert again.headers['ETag'] == etag
+
+    not_modified = client.get(URL, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert charts.stats()['renders'] == renders + 1
+
+
+def test_parameters_and_format_have_their_own_etag(client, charts):
+    etags = {
+        client.get(url).headers['ETag']
+        for url in (URL, f'{URL}?bins=10', f'{URL}?format=svg')
+    }
+    assert len(etags) == 3
+    assert client.get(f'{URL}?format=svg').mimetype == 'image/svg+xml'
+
+
+def test_unknown_column_and_format_are_rejected(client, charts):
+    assert client.get('/api/datasets/student/charts/histogram/NoSuchColumn').status_code == 404
+    assert client.get(f'{URL}?format=gif').status_code == 400
+
+
+def test_etag_follows_the_dataset_version():
+    frame = pd.DataFrame({'GPA': [1.0, 2.0]})
+    old = DatasetEntry('/student.csv', frame, 1, 10, 0.0)
+    new = DatasetEntry('/student.csv', frame, 2, 10, 0.0)
+    assert chart_etag(old, 'histogram', ('GPA', 20), 'png') != chart_etag(new, 'histogram', ('GPA', 20), 'png')
+
+
+def test_concurrent_requests_share_one_render():
+    from utils.plotting import figure
+
+    renderer = ChartRenderer(workers=2)
+    entry = DatasetEntry('/student.csv', pd.DataFrame({'GPA': [1.0]}), 1, 10, 0.0)
+    gate, draws = threading.Event(), []
+
+    def draw():
+        draws.append(1)
+        gate.wait(5)
+        fig = figure()
+        fig.add_subplot().plot([0, 1])
+        return fig
+
+    bodies = []
+    threads = [
+        threading.Thread(target=lambda: bodies.append(renderer.render(entry, 'line', (), 'png', draw)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert len(draws) == 1
+    assert len(bodies) == 4 and len(set(bodies)) == 1
@@ -0,0 +1,79 @@
+"""Column statistics index: one index per dataset version, built without blocking other readers, reused only for unchanged columns"""
+import threading
+
+import pandas as pd
+
+from utils.column_stats import ColumnStatsIndex, column_fingerprint
+from utils.dataset_cache import DatasetEntry
+
+
+def entry(path, mtime_ns, values):
+    frame = pd.DataFrame({'NOC': values, 'Age': range(len(values))})
+    return DatasetEntry(path, frame, mtime_ns, len(values), 0.0)
+
+
+def test_versions_of_one_path_keep_their_own_index():
+    index = ColumnStatsIndex()
+    old = entry('/athletes.csv', 1, ['Japan', 'France'])
+    new = entry('/athletes.csv', 2, ['Japan', 'Spain'])
+    # A stale reader and the prepared version alternating must not rebuild each other
+    for _ in range(3):
+        assert index.column(old, 'NOC').distinct.tolist() == ['Japan', 'France']
+        assert index.column(new, 'NOC').distinct.tolist() == ['Japan', 'Spain']
+    assert index.stats()['builds'] == 2
+    # Age did not change between the versions and is taken over
+    assert index.column(new, 'Age') is index.column(old, 'Age')
+
+
+def test_versions_per_path_are_bounded():
+    index = ColumnStatsIndex(versions_per_path=2)
+    for version in range(5):
+        index.for_entry(entry('/athletes.csv', version, ['Japan']))
+    index.for_entry(entry('/medals.csv', 1, ['Japan']))
+    assert index.stats()['versions'] == 3
+    assert index.stats()['datasets'] == 2
+
+
+def test_build_blocks_neither_other_datasets_nor_duplicates_work():
+    index = ColumnStatsIndex()
+    ready = entry('/medals.csv', 1, ['Japan'])
+    index.for_entry(ready)
+    started, release = threading.Event(), threading.Event()
+    build = ColumnStatsIndex._build
+
+    def slow_build(entry, previous):
+        started.set()
+        release.wait(5)
+        return build(entry, previous)
+
+    index._build = slow_build
+    reloading = entry('/athletes.csv', 2, ['Japan', 'Spain'])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.for_entry(reloading))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    # Another dataset is answered while the build is still running
+    assert index.column(ready, 'NOC') is not None
+    assert index.stats()['building'] == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(results) == 3 and all(result is results[0] for result in results)
+    assert index.stats()['builds'] == 2
+
+
+def test_fingerprint_depends_on_row_order():
+    values = pd.Series(['Japan', 'France', 'Spain'])
+    assert column_fingerprint(values) == column_fingerprint(values.copy())
+    assert column_fingerprint(values) != column_fingerprint(values.iloc[::-1].reset_index(drop=True))
+
+
+def test_reordered_column_is_rebuilt_with_its_new_positions():
+    index = ColumnStatsIndex()
+    old = entry('/athletes.csv', 1, ['Japan', 'France', 'Japan'])
+    new = entry('/athletes.csv', 2, ['France', 'Japan', 'Japan'])
+    assert index.row_positions(old, 'NOC')['France'].tolist() == [1]
+    # Same values and counts in another order: the row positions must follow
+    assert index.row_positions(new, 'NOC')['France'].tolist() == [0]
+    assert index.row_positions(new, 'NOC')['Japan'].tolist() == [1, 2]
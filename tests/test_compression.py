@@ -0,0 +1,54 @@
+"""Cached and compressed representations: Content-Encoding, Vary and one ETag per encoding"""
+import gzip
+
+import pytest
+
+from configs.http_config import http_config
+
+URL = '/api/datasets/student/paginated?per_page=50'
+
+
+def identity(client):
+    return client.get(URL, headers={'Accept-Encoding': 'identity'})
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br', 'zstd'])
+def test_cached_variant_has_its_own_etag(client, response_cache, encoding):
+    plain = identity(client)
+    # Miss, then a hit served from the cached variant
+    for _ in range(2):
+        response = client.get(URL, headers={'Accept-Encoding': encoding})
+        assert response.headers['Content-Encoding'] == encoding
+        assert response.headers['ETag'] == f'"{plain.get_etag()[0]}-{encoding}"'
+        assert 'Accept-Encoding' in response.headers['Vary']
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_cached_gzip_variant_decodes_to_identity(client, response_cache):
+    plain = identity(client)
+    response = client.get(URL, headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+
+
+def test_compression_disabled_serves_identity_from_cache(client, response_cache, monkeypatch):
+    monkeypatch.setattr(http_config, '_compression_enabled', False)
+    responses = [client.get(URL, headers={'Accept-Encoding': 'br, zstd, gzip'}) for _ in range(2)]
+    assert response_cache.stats()['entries'] == 1
+    for response in responses:
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_etag()[0] == responses[0].get_etag()[0]
+    # Turned back on, the compressed representation does not reuse the identity validator
+    monkeypatch.setattr(http_config, '_compression_enabled', True)
+    compressed = client.get(URL, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.get_etag()[0] != responses[0].get_etag()[0]
+
+
+def test_encoded_response_is_tagged_with_compression_disabled(app, monkeypatch):
+    from utils.compression import compress_response
+    monkeypatch.setattr(http_config, '_compression_enabled', False)
+    with app.test_request_context('/'):
+        response = app.response_class(b'{}', mimetype='application/json')
+        response.set_etag('abc')
+        response.headers['Content-Encoding'] = 'br'
+        assert compress_response(response).get_etag() == ('abc-br', False)
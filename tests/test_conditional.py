@@ -0,0 +1,52 @@
+"""Conditional requests: 304 only where the view would answer 200"""
+import pytest
+
+from utils.conditional import validated_responses
+
+URL = '/api/dataset/paginated?per_page=50'
+FUTURE = 'Fri, 01 Jan 2100 00:00:00 GMT'
+
+
+@pytest.fixture(autouse=True)
+def fresh_validators(response_cache):
+    validated_responses.clear()
+    yield
+    validated_responses.clear()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/dataset/column-counts/NoSuchColumn',
+    '/api/dataset/column-stats/NoSuchColumn',
+    '/api/dataset/paginated?cursor=not-a-cursor',
+])
+@pytest.mark.parametrize('headers', [{'If-None-Match': '*'}, {'If-Modified-Since': FUTURE}])
+def test_errors_are_not_answered_with_304(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code in (400, 404)
+    assert 'ETag' not in response.headers
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip'])
+def test_etag_of_each_encoding_revalidates(client, encoding):
+    first = client.get(URL, headers={'Accept-Encoding': encoding})
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.endswith('-gzip"') == (encoding == 'gzip')
+
+    again = client.get(URL, headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_unknown_etag_gets_the_body(client):
+    response = client.get(URL, headers={'If-None-Match': '"0123456789abcdef"'})
+    assert response.status_code == 200
+    assert response.headers['ETag']
+
+
+def test_first_conditional_request_runs_the_view(client):
+    # Nothing remembered yet (another worker served the 200): the view decides
+    etag = client.get(URL).headers['ETag']
+    validated_responses.clear()
+    assert client.get(URL, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(URL, headers={'If-Modified-Since': FUTURE}).status_code == 304
@@ -0,0 +1,130 @@
+"""Dataset cache: single-flight loads, invalidation by file signature, background reloads with serve_stale"""
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from utils.dataset_cache import DatasetCache
+
+
+def write_csv(path, values, mtime_ns):
+    pd.DataFrame({'value': values}).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class Loader:
+    """Counts the loads; each one can be held back with a gate or made to fail"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.gate = None
+
+    def __call__(self, path):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ValueError('corrupt file')
+        return pd.read_csv(path)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = str(tmp_path / 'values.csv')
+    write_csv(path, [1, 2, 3], 1_000_000_000_000_000_000)
+    return path
+
+
+def test_concurrent_misses_share_one_load(dataset):
+    cache, loader = DatasetCache(load_workers=2), Loader()
+    loader.gate = threading.Event()
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(cache.get_entry(dataset, loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    loader.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert len(entries) == 8 and all(entry is entries[0] for entry in entries)
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['coalesced'] + stats['hits'] == 7
+
+
+def test_changed_file_is_loaded_again(dataset):
+    cache, loader = DatasetCache(load_workers=1), Loader()
+    first = cache.get_entry(dataset, loader)
+    assert cache.get_entry(dataset, loader) is first
+
+    # Same size, new mtime: without serve_stale the reader waits for the new version
+    write_csv(dataset, [1, 2, 4], 1_000_000_001_000_000_000)
+    second = cache.get_entry(dataset, loader)
+    assert second is not first
+    assert second.version != first.version
+    assert second.frame['value'].tolist() == [1, 2, 4]
+    assert loader.calls == 2
+
+
+def test_stale_version_is_served_until_the_reload_is_swapped_in(dataset):
+    cache, loader = DatasetCache(load_workers=1, serve_stale=True), Loader()
+    first = cache.get_entry(dataset, loader)
+
+    write_csv(dataset, [1, 2, 3, 4], 1_000_000_001_000_000_000)
+    loader.gate = threading.Event()
+    # The reload is held back: readers keep the previous version meanwhile
+    assert cache.get_entry(dataset, loader) is first
+    assert cache.get_entry(dataset, loader) is first
+    assert cache.is_serving_stale(dataset)
+
+    swapped = []
+    cache.add_swap_hook(lambda previous, entry: swapped.append((previous, entry)))
+    future = cache.refresh(dataset, loader)
+    loader.gate.set()
+    reloaded = future.result()
+
+    assert loader.calls == 2
+    assert swapped == [(first, reloaded)]
+    assert cache.get_entry(dataset, loader) is reloaded
+    assert reloaded.frame['value'].tolist() == [1, 2, 3, 4]
+    assert not cache.is_serving_stale(dataset)
+    assert cache.stats()['swaps'] == 1
+
+
+def test_failed_reload_is_retried_after_the_backoff_or_a_new_write(dataset):
+    cache, loader = DatasetCache(load_workers=1, serve_stale=True, reload_retry=3600), Loader()
+    first = cache.get_entry(dataset, loader)
+
+    write_csv(dataset, [1, 2, 3, 4], 1_000_000_001_000_000_000)
+    loader.fail = True
+    with pytest.raises(ValueError):
+        cache.refresh(dataset, loader).result()
+    assert cache.stats()['failed_reloads'] == 1
+
+    # The same broken version is not parsed again by every request
+    for _ in range(5):
+        assert cache.get_entry(dataset, loader) is first
+    assert cache.refresh(dataset, loader) is None
+    assert loader.calls == 2
+
+    # A new write is tried at once
+    loader.fail = False
+    write_csv(dataset, [1, 2, 3, 4, 5], 1_000_000_002_000_000_000)
+    reloaded = cache.refresh(dataset, loader).result()
+    assert reloaded.frame['value'].tolist() == [1, 2, 3, 4, 5]
+    assert loader.calls == 3
+
+
+def test_failed_reload_is_retried_once_the_backoff_expired(dataset):
+    cache, loader = DatasetCache(load_workers=1, serve_stale=True, reload_retry=0), Loader()
+    cache.get_entry(dataset, loader)
+
+    write_csv(dataset, [1, 2, 3, 4], 1_000_000_001_000_000_000)
+    loader.fail = True
+    with pytest.raises(ValueError):
+        cache.refresh(dataset, loader).result()
+    loader.fail = False
+    assert cache.refresh(dataset, loader).result().frame['value'].tolist() == [1, 2, 3, 4]
@@ -0,0 +1,50 @@
+"""Request metrics: streamed responses leave the in-flight gauge when the server closes them"""
+import pytest
+
+from utils.metrics import metrics_available
+
+pytestmark = pytest.mark.skipif(not metrics_available(), reason='prometheus_client is not installed')
+
+URL = '/api/students/all'
+ENDPOINT = 'student.studentsDataAll'
+
+
+def in_flight():
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value('flask_api_http_requests_in_flight', {'endpoint': ENDPOINT}) or 0
+
+
+def requests_total(method):
+    from prometheus_client import REGISTRY
+    labels = {'endpoint': ENDPOINT, 'method': method, 'status': '200'}
+    return REGISTRY.get_sample_value('flask_api_http_requests_total', labels) or 0
+
+
+def test_streamed_body_never_iterated_leaves_in_flight(client, response_cache):
+    before, served = in_flight(), requests_total('GET')
+    response = client.get(URL, buffered=False)
+    assert response.is_streamed
+    assert in_flight() == before + 1
+    # A client that goes away before the first chunk: the server only closes the response
+    response.close()
+    assert in_flight() == before
+    assert requests_total('GET') == served + 1
+
+
+def test_head_of_streamed_route_leaves_in_flight(client, response_cache):
+    before, served = in_flight(), requests_total('HEAD')
+    response = client.head(URL)
+    assert response.status_code == 200
+    assert response.data == b''
+    response.close()
+    assert in_flight() == before
+    assert requests_total('HEAD') == served + 1
+
+
+def test_streamed_body_is_measured_as_sent(client, response_cache):
+    from prometheus_client import REGISTRY
+    labels = {'endpoint': ENDPOINT}
+    sizes = REGISTRY.get_sample_value('flask_api_http_response_size_bytes_sum', labels) or 0
+    response = client.get(URL)
+    response.close()
+    assert REGISTRY.get_sample_value('flask_api_http_response_size_bytes_sum', labels) == sizes + len(response.data)
@@ -0,0 +1,97 @@
+"""Pagination cursors: offsets for unsorted pages, keyset cursors for sorted ones"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, encode_keyset_cursor, keyset_position,
+)
+
+VERSION = '18a2b3c4d5e6f7a8-1f40'
+
+
+def sort_order(frame, sort, ascending):
+    # Same permutation as ServiceFunctions.getSortOrder
+    return frame[sort].reset_index(drop=True).sort_values(by=sort, ascending=ascending, kind='stable').index.to_numpy()
+
+
+def walk(frame, sort, order, per_page):
+    """Row positions of every page, following next cursors like a client"""
+    ascending = order == 'asc'
+    permutation = sort_order(frame, sort, ascending)
+    seen, start = [], 0
+    while start < len(permutation):
+        rows = permutation[start:start + per_page]
+        seen.extend(rows.tolist())
+        cursor = decode_cursor(encode_keyset_cursor(frame, rows[-1], sort, order), VERSION, sort, order)
+        start = keyset_position(frame, permutation, sort, ascending, cursor)
+    return seen, permutation.tolist()
+
+
+FRAME = pd.DataFrame({
+    'NOC': pd.Categorical(['Japan', 'France', None, 'Spain', 'Japan', 'Brazil', 'France', 'Japan']),
+    'Name': ['b', 'a', 'c', 'a', 'a', 'd', 'a', 'b'],
+    'Age': [21.0, 34.0, 19.0, np.nan, 21.0, 25.0, 30.0, 21.0],
+})
+
+
+def test_unsorted_cursor_round_trip():
+    assert decode_cursor(encode_cursor(40, VERSION), VERSION).offset == 40
+
+
+def test_unsorted_cursor_rejects_another_version():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(40, VERSION), '18a2b3c4d5e6f7a9-1f40')
+
+
+@pytest.mark.parametrize('sort', [['NOC'], ['Age'], ['Name'], ['NOC', 'Name'], ['Age', 'Name']])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('per_page', [1, 3])
+def test_keyset_cursor_walks_every_row_once(sort, order, per_page):
+    seen, expected = walk(FRAME, sort, order, per_page)
+    assert seen == expected
+
+
+def test_keyset_cursor_keeps_its_place_in_a_new_version():
+    frame = pd.DataFrame({'Age': [10, 20, 30, 40]})
+    cursor = decode_cursor(encode_keyset_cursor(frame, 1, ['Age'], 'asc'), VERSION, ['Age'], 'asc')
+    # Appended rows sorting before the last row sent do not shift the next page
+    changed = pd.DataFrame({'Age': [10, 20, 30, 40, 5, 25]})
+    permutation = sort_order(changed, ['Age'], True)
+    start = keyset_position(changed, permutation, ['Age'], True, cursor)
+    assert changed['Age'].iloc[permutation[start:]].tolist() == [25, 30, 40]
+
+
+@pytest.mark.parametrize('sort, order', [
+    ([], 'asc'),
+    (['Name'], 'asc'),
+    (['NOC'], 'desc'),
+    (['Name', 'NOC'], 'desc'),
+])
+def test_cursor_rejects_another_ordering(sort, order):
+    cursor = encode_keyset_cursor(FRAME, 0, ['Name'], 'desc')
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, VERSION, sort, order)
+
+
+def test_unsorted_cursor_rejects_sorted_request():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(40, VERSION), VERSION, ['Name'], 'asc')
+
+
+def test_keyset_cursor_of_another_type_is_rejected():
+    cursor = decode_cursor(encode_keyset_cursor(FRAME, 0, ['Name'], 'asc'), VERSION, ['Name'], 'asc')
+    permutation = sort_order(FRAME, ['Age'], True)
+    with pytest.raises(InvalidCursorError):
+        keyset_position(FRAME, permutation, ['Age'], True, cursor)
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_sorted_pages_follow_cursors_through_the_dataset(client, order):
+    url = f'/api/datasets/student/paginated?sort=Age,GPA&order={order}&per_page=500'
+    body = client.get(url).get_json()
+    ids = [record['StudentID'] for record in body['data']]
+    while body['pagination']['next_cursor']:
+        body = client.get(f"{url}&cursor={body['pagination']['next_cursor']}").get_json()
+        ids.extend(record['StudentID'] for record in body['data'])
+    assert len(ids) == len(set(ids)) == body['pagination']['total']
@@ -0,0 +1,27 @@
+"""The profiling token is only accepted from its header"""
+import pytest
+
+from configs.server_config import server_config
+from utils import profiling
+
+TOKEN = 'secret-token'
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(server_config, '_profiling_token', TOKEN)
+
+
+def test_token_is_read_from_the_header(app, token):
+    with app.test_request_context('/', headers={'X-Profile-Token': TOKEN}):
+        assert profiling.is_authorized(profiling.request_token())
+
+
+def test_token_in_the_query_string_is_ignored(app, token):
+    with app.test_request_context(f'/?profile={TOKEN}'):
+        assert not profiling.is_authorized(profiling.request_token())
+
+
+def test_admin_routes_refuse_a_query_string_token(client, token):
+    assert client.get(f'/api/admin/profiles?profile={TOKEN}').status_code == 403
+    assert client.get('/api/admin/profiles', headers={'X-Profile-Token': TOKEN}).status_code == 200
@@ -0,0 +1,60 @@
+"""Query filters must match the same rows whether or not dtypes were compacted"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset_cache import DatasetEntry
+from utils.dtypes import compact_frame
+from utils.query import OPERATORS, QueryError, build_predicates, matching_positions
+
+
+def make_entries():
+    frame = pd.DataFrame({
+        'NOC': ['Japan', 'France', None, 'Spain', 'Japan', 'Brazil', 'France', 'Norway'],
+        'Discipline': ['Archery', 'Judo', 'Judo', 'Rowing', 'Archery', 'Diving', 'Judo', 'Archery'],
+        'Age': [21, 34, 19, 28, 21, 25, 30, 22],
+    })
+    compacted, _ = compact_frame(frame, category_max_ratio=0.9)
+    assert isinstance(compacted['NOC'].dtype, pd.CategoricalDtype)
+    assert isinstance(compacted['Discipline'].dtype, pd.CategoricalDtype)
+    return (
+        DatasetEntry('/plain.csv', frame, 1, 1, 0.0),
+        DatasetEntry('/compacted.csv', compacted, 1, 1, 0.0),
+    )
+
+
+def positions(entry, text):
+    rows = matching_positions(entry, build_predicates(entry.frame, [text]))
+    return rows.tolist()
+
+
+@pytest.mark.parametrize('op', OPERATORS)
+@pytest.mark.parametrize('column, value', [
+    ('NOC', 'Japan'),
+    ('NOC', 'Italy'),
+    ('Discipline', 'Archery'),
+    ('Discipline', 'Judo|Rowing'),
+    ('Age', '22'),
+])
+def test_filters_match_with_compaction(op, column, value):
+    plain, compacted = make_entries()
+    if op != 'in':
+        value = value.split('|')[0]
+    assert positions(compacted, f'{column}:{op}:{value}') == positions(plain, f'{column}:{op}:{value}')
+
+
+def test_range_filter_on_categorical_column():
+    _, compacted = make_entries()
+    rows = positions(compacted, 'NOC:gt:Japan')
+    assert np.array_equal(compacted.frame['NOC'].iloc[rows].astype(str), ['Spain', 'Norway'])
+
+
+@pytest.mark.parametrize('op', ['gt', 'gte', 'lt', 'lte'])
+@pytest.mark.parametrize('compact', [False, True])
+def test_range_filter_on_mixed_column_is_a_query_error(op, compact):
+    frame = pd.DataFrame({'Code': pd.Series([1, 'A', 2.5, 'B', 1], dtype=object)})
+    if compact:
+        frame, _ = compact_frame(frame, category_max_ratio=0.9)
+    entry = DatasetEntry('/mixed.csv', frame, 1, 1, 0.0)
+    with pytest.raises(QueryError):
+        positions(entry, f'Code:{op}:A')
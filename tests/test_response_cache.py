@@ -0,0 +1,72 @@
+"""Response cache: view headers kept, compressed variants built on demand, keys by negotiated format"""
+import gzip
+import os
+
+from flask import Response
+
+from utils.response_cache import ResponseCache
+
+BODY = b'{"data": [' + b', '.join(b'{"Name": "athlete %d"}' % i for i in range(200)) + b']}'
+KEY = ('athletes.athletesHead', '/athletes.xlsx', (1, 1), (), (), 'json')
+
+
+def test_view_headers_are_kept_and_transfer_headers_dropped(app):
+    cache = ResponseCache(encodings=['gzip'])
+    response = Response(BODY, mimetype='application/json')
+    response.headers['X-Total-Count'] = '200'
+    cached = cache.put(KEY, response)
+    with app.test_request_context() as context:
+        served = cache.respond(KEY, cached, context.request.accept_encodings)
+    assert served.headers['X-Total-Count'] == '200'
+    assert served.headers['Content-Length'] == str(len(BODY))
+    assert served.get_data() == BODY
+
+
+def test_variants_are_built_on_first_request_only(app):
+    cache = ResponseCache(encodings=['gzip', 'br', 'zstd'])
+    cached = cache.store(KEY, 200, 'application/json', BODY)
+    assert cached.variants == {}
+    bytes_before = cache.stats()['bytes']
+
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}) as context:
+        served = cache.respond(KEY, cached, context.request.accept_encodings)
+    assert served.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(served.get_data()) == BODY
+    assert list(cached.variants) == ['gzip']
+    assert cache.stats()['bytes'] == bytes_before + len(cached.variants['gzip'])
+
+
+def test_incompressible_body_is_sent_as_identity(app):
+    cache = ResponseCache(encodings=['gzip'])
+    body = os.urandom(4096)
+    cached = cache.store(KEY, 200, 'application/octet-stream', body)
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}) as context:
+        served = cache.respond(KEY, cached, context.request.accept_encodings)
+    assert 'Content-Encoding' not in served.headers
+    assert cached.variants == {'gzip': None}
+
+
+def test_accept_headers_of_one_format_share_an_entry(client, response_cache):
+    url = '/api/datasets/student/paginated?per_page=20'
+    client.get(url, headers={'Accept': 'application/json'})
+    hits = response_cache.stats()['hits']
+    client.get(url, headers={'Accept': 'application/json, text/plain, */*'})
+    client.get(url, headers={'Accept': '*/*'})
+    assert response_cache.stats()['hits'] == hits + 2
+
+
+def test_partially_sent_stream_is_not_cached(client, response_cache):
+    url = '/api/students/all'
+    response = client.get(url, buffered=False)
+    assert response.is_streamed
+    next(response.response)
+    response.close()
+    assert response_cache.stats()['entries'] == 0
+
+    response = client.get(url)
+    response.get_data()
+    response.close()
+    assert response_cache.stats()['entries'] == 1
+    hits = response_cache.stats()['hits']
+    assert client.get(url).get_data() == response.get_data()
+    assert response_cache.stats()['hits'] == hits + 1
@@ -0,0 +1,77 @@
+"""Sidecars only vouch for the source content they were parsed from"""
+import os
+
+import pandas as pd
+import pytest
+
+from utils.sidecar import is_fresh, load_with_sidecar, read_manifest, sidecar_available
+
+pytestmark = pytest.mark.skipif(not sidecar_available(), reason="pyarrow is not installed")
+
+
+def write_csv(path, ages, mtime_ns):
+    pd.DataFrame({'Age': ages}).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'students.csv')
+    write_csv(path, [15, 16], 1_000_000_000_000)
+    return path
+
+
+def test_sidecar_is_attached_once_built(source):
+    assert load_with_sidecar(source, pd.read_csv)['Age'].tolist() == [15, 16]
+    assert is_fresh(source)
+    calls = []
+    frame = load_with_sidecar(source, lambda path: calls.append(path))
+    assert frame['Age'].tolist() == [15, 16] and not calls
+
+
+def test_edit_during_parse_leaves_no_sidecar(source):
+    def edited_while_parsing(path):
+        frame = pd.read_csv(path)
+        write_csv(path, [17, 18, 19], 2_000_000_000_000)
+        return frame
+
+    # The rows parsed before the edit are served once, but never stored as fresh
+    assert load_with_sidecar(source, edited_while_parsing)['Age'].tolist() == [15, 16]
+    assert read_manifest(source) is None
+    assert not is_fresh(source)
+    assert load_with_sidecar(source, pd.read_csv)['Age'].tolist() == [17, 18, 19]
+    assert is_fresh(source)
+
+
+def test_edit_after_build_makes_sidecar_stale(source):
+    load_with_sidecar(source, pd.read_csv)
+    write_csv(source, [20], 3_000_000_000_000)
+    assert not is_fresh(source)
+    assert load_with_sidecar(source, pd.read_csv)['Age'].tolist() == [20]
+
+
+@pytest.mark.parametrize('compaction', [True, False])
+def test_parsed_and_attached_frames_have_the_same_dtypes(tmp_path, monkeypatch, compaction):
+    from configs.dataset_config import dataset_config
+    from utils.dtypes import compact_dataset
+
+    monkeypatch.setattr(dataset_config, '_dtype_compaction_enabled', compaction)
+    path = str(tmp_path / 'athletes.csv')
+    pd.DataFrame({
+        'Name': ['AALERUD Katrine', 'ABAD Nestor', None, 'ABALDE Tamara'],
+        'NOC': ['Norway', 'Spain', 'Spain', 'Spain'],
+        'Age': [24, 31, 27, 29],
+    }).to_csv(path, index=False)
+
+    def reader(dataSetPath):
+        return compact_dataset(dataSetPath, pd.read_csv(dataSetPath))
+
+    parsed = reader(path)
+    load_with_sidecar(path, reader)
+    attached = load_with_sidecar(path, reader)
+    assert is_fresh(path)
+    assert attached.dtypes.astype(str).to_dict() == parsed.dtypes.astype(str).to_dict()
+    for column in parsed.columns:
+        if isinstance(parsed[column].dtype, pd.CategoricalDtype):
+            assert attached[column].cat.categories.dtype == parsed[column].cat.categories.dtype
+    assert attached.to_dict('list') == parsed.to_dict('list')
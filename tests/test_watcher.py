@@ -0,0 +1,82 @@
+"""Hot reload: settled file changes are dispatched once, requests keep the version they pinned"""
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from ServiceFunctions import getDatasetEntry, refreshDataset
+from utils.dataset_cache import dataset_cache
+from utils.watcher import DatasetWatcher
+
+
+def write_csv(path, values, mtime_ns):
+    pd.DataFrame({'value': values}).to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = str(tmp_path / 'values.csv')
+    write_csv(path, [1, 2, 3], 1_000_000_000_000_000_000)
+    yield path
+    dataset_cache.invalidate(path)
+
+
+def test_watcher_reports_a_settled_change_once(dataset):
+    changes, changed = [], threading.Event()
+
+    def on_change(path):
+        changes.append(path)
+        changed.set()
+
+    watcher = DatasetWatcher([dataset], interval=0.05, debounce=0.2).start(on_change)
+    try:
+        # A burst of writes is one change once the file has been quiet for the debounce period
+        for step in range(3):
+            write_csv(dataset, [1, 2, 3, step], 1_000_000_001_000_000_000 + step)
+            time.sleep(0.02)
+        assert changed.wait(5)
+        time.sleep(0.4)
+    finally:
+        watcher.stop()
+    assert changes == [os.path.abspath(dataset)]
+    assert watcher.stats()['changes'] == 1
+
+
+def test_request_keeps_its_pinned_version_across_a_swap(app, dataset, monkeypatch):
+    monkeypatch.setattr(dataset_cache, 'serve_stale', True)
+    with app.test_request_context():
+        pinned = getDatasetEntry(dataset)
+
+        write_csv(dataset, [1, 2, 3, 4], 1_000_000_001_000_000_000)
+        swapped = refreshDataset(dataset).result()
+        assert swapped is not pinned
+
+        # The running request still reads the version it started with
+        assert getDatasetEntry(dataset) is pinned
+        assert getDatasetEntry(dataset).frame['value'].tolist() == [1, 2, 3]
+
+    # The next request gets the swapped-in version
+    with app.test_request_context():
+        assert getDatasetEntry(dataset) is swapped
+        assert getDatasetEntry(dataset).frame['value'].tolist() == [1, 2, 3, 4]
+
+
+def test_readers_get_the_previous_version_until_the_swap(app, dataset, monkeypatch):
+    monkeypatch.setattr(dataset_cache, 'serve_stale', True)
+    with app.test_request_context():
+        previous = getDatasetEntry(dataset)
+
+    write_csv(dataset, [1, 2, 3, 4], 1_000_000_001_000_000_000)
+    with app.test_request_context():
+        # Triggers the background reload without waiting for it
+        assert getDatasetEntry(dataset) is previous
+    # The reload started above, or None once it has been swapped in
+    future = refreshDataset(dataset)
+    if future is not None:
+        future.result()
+
+    with app.test_request_context():
+        assert getDatasetEntry(dataset).frame['value'].tolist() == [1, 2, 3, 4]
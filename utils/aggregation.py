@@ -0,0 +1,200 @@
+"""
+Group-by aggregation engine.
+
+Group keys are encoded once per column content as sorted integer codes
+(pd.factorize), the codes of several keys are combined into one group id per
+row, and count/sum/mean are computed with np.bincount over the group ids
+(integer and boolean sums with an exact int64 np.add.at); min/max use the
+matching ufunc reductions. Results are memoized per
+(dataset version, keys, aggregations).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from configs.cache_config import cache_config
+from utils.column_stats import column_stats_index
+from utils.metrics import record_cache_lookup
+
+AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max')
+ROW_COUNT = 'count'
+
+
+class AggregationError(ValueError):
+    """Raised when a group key or aggregation is invalid"""
+
+
+def parse_aggregation(text):
+    """Parse ``count`` (rows per group) or ``column:function`` into (column, function)"""
+    if text == ROW_COUNT:
+        return None, ROW_COUNT
+    column, separator, function = text.rpartition(':')
+    if not separator or not column:
+        raise AggregationError(f"Invalid aggregation '{text}', expected count or column:function")
+    function = function.lower()
+    if function not in AGGREGATIONS:
+        raise AggregationError(f"Unknown aggregation '{function}'. Available aggregations: {list(AGGREGATIONS)}")
+    return column, function
+
+
+def aggregation_name(column, function):
+    return ROW_COUNT if column is None else f"{column}_{function}"
+
+
+def _group_ids(entry, keys):
+    # Combine the per-key codes into a single id per row; rows with a missing key are dropped (-1)
+    all_codes = []
+    sizes = []
+    for key in keys:
+        codes, uniques = column_stats_index.codes(entry, key)
+        all_codes.append(codes)
+        sizes.append(max(len(uniques), 1))
+
+    valid = np.ones(len(entry.frame), dtype=bool)
+    for codes in all_codes:
+        valid &= codes >= 0
+    if float(np.prod(sizes, dtype=np.float64)) >= 2 ** 62:
+        raise AggregationError(f"Too many key combinations to group by {keys}")
+
+    combined = np.ravel_multi_index([codes[valid] for codes in all_codes], sizes)
+    # Dense ids in key order: np.unique sorts, which matches groupby(sort=True)
+    observed, group_ids = np.unique(combined, return_inverse=True)
+    key_positions = np.unravel_index(observed, sizes)
+    return valid, group_ids.ravel(), len(observed), key_positions
+
+
+def _reduce(values, group_ids, group_count, function):
+    """Reduce values per group; int64 values are summed and compared exactly, without a float detour"""
+    counts = np.bincount(group_ids, minlength=group_count)
+    integral = values.dtype == np.int64
+    if function in ('sum', 'mean'):
+        if integral:
+            # bincount weights are float64, exact only up to 2**53
+            sums = np.zeros(group_count, dtype=np.int64)
+            np.add.at(sums, group_ids, values)
+        else:
+            sums = np.bincount(group_ids, weights=values, minlength=group_count)
+        if function == 'sum':
+            return sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    ufunc = np.minimum if function == 'min' else np.maximum
+    if integral:
+        bounds = np.iinfo(np.int64)
+        result = np.full(group_count, bounds.max if function == 'min' else bounds.min, dtype=np.int64)
+    else:
+        result = np.full(group_count, np.inf if function == 'min' else -np.inf)
+    ufunc.at(result, group_ids, values)
+    if (counts == 0).any():
+        # Groups without values have no minimum or maximum
+        result = np.where(counts > 0, result, np.nan)
+    return result
+
+
+def compute_aggregation(entry, keys, aggregations):
+    """Group entry.frame by keys and return one row per group with the requested aggregations"""
+    frame = entry.frame
+    if not keys:
+        raise AggregationError("At least one group key is required")
+    if len(set(keys)) != len(keys):
+        raise AggregationError(f"Group keys must be distinct, got {list(keys)}")
+    for key in keys:
+        if key not in frame.columns:
+            raise AggregationError(f"Column '{key}' not found in dataset. Available columns: {list(frame.columns)}")
+    parsed = [parse_aggregation(text) for text in (aggregations or [ROW_COUNT])]
+    for column, _ in parsed:
+        if column is not None and column not in frame.columns:
+            raise AggregationError(f"Column '{column}' not found in dataset. Available columns: {list(frame.columns)}")
+
+    valid, group_ids, group_count, key_positions = _group_ids(entry, keys)
+
+    result = {}
+    for key, positions in zip(keys, key_positions):
+        _, uniques = column_stats_index.codes(entry, key)
+        result[key] = uniques.take(positions)
+
+    for column, function in parsed:
+        name = aggregation_name(column, function)
+        if column is None:
+            result[name] = np.bincount(group_ids, minlength=group_count)
+            continue
+
+        series = frame[column][valid]
+        present = series.notna().to_numpy()
+        ids = group_ids[present]
+        boolean = pd.api.types.is_bool_dtype(series.dtype)
+        if function == 'count':
+            result[name] = np.bincount(ids, minlength=group_count)
+        elif boolean and function in ('sum', 'mean'):
+            # Like pandas: the number and the share of True values
+            result[name] = _reduce(series[present].to_numpy(dtype=np.int64), ids, group_count, function)
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not boolean:
+            # Integer columns stay integral unless a group had no values at all
+            dtype = np.int64 if pd.api.types.is_integer_dtype(series.dtype) else np.float64
+            result[name] = _reduce(series[present].to_numpy(dtype=dtype), ids, group_count, function)
+        elif function in ('min', 'max'):
+            # Non-numeric columns (e.g. strings) still have an order
+            grouped = pd.Series(series[present].to_numpy(), index=ids).groupby(level=0)
+            reduced = grouped.min() if function == 'min' else grouped.max()
+            result[name] = reduced.reindex(range(group_count)).to_numpy()
+        else:
+            raise AggregationError(f"Cannot compute {function} of non-numeric column '{column}'")
+
+    return pd.DataFrame(result)
+
+
+class AggregationEngine:
+    """Memoizes aggregation results per dataset version, keys and aggregations"""
+
+    def __init__(self, max_entries=128):
+        self._max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def aggregate(self, entry, keys, aggregations=None):
+        """Return the aggregation result of entry as a DataFrame (shared, treat as read-only)"""
+        aggregations = list(aggregations or [ROW_COUNT])
+        key = (entry.path, entry.version, tuple(keys), tuple(aggregations))
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self._hits += 1
+                record_cache_lookup('aggregation', 'hit')
+                return result
+            self._misses += 1
+            record_cache_lookup('aggregation', 'miss')
+
+        result = compute_aggregation(entry, keys, aggregations)
+
+        with self._lock:
+            if self._max_entries:
+                self._results[key] = result
+                while len(self._results) > self._max_entries:
+                    self._results.popitem(last=False)
+        return result
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._results.clear()
+            else:
+                for key in [key for key in self._results if key[0] == path]:
+                    del self._results[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': len(self._results),
+                'max_entries': self._max_entries,
+            }
+
+# Create a global instance for use throughout the application
+aggregation_engine = AggregationEngine(max_entries=cache_config.aggregation_cache_entries)
@@ -0,0 +1,189 @@
+"""
+Server-side chart rendering.
+
+Charts are drawn with matplotlib's object-oriented API on an Agg canvas (no
+pyplot state, no display) in a small thread pool, so the request thread only
+waits on a future. Rendered PNG/SVG bytes are cached per (dataset version,
+chart, parameters, format) in a size-bounded LRU; concurrent requests for the
+same chart share a single render.
+"""
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from configs.chart_config import chart_config
+from utils.metrics import record_cache_lookup
+from utils.plotting import figure
+
+CHART_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+FIGURE_SIZE = (10, 6)
+FIGURE_DPI = 100
+BAR_COLOR = '#4C72B0'
+
+
+class ChartError(ValueError):
+    """Raised when a chart cannot be drawn from the requested column or parameters"""
+
+
+def _figure(title):
+    fig = figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI, layout='tight')
+    axes = fig.add_subplot()
+    axes.set_title(title)
+    return fig, axes
+
+
+def _label(value):
+    text = str(value)
+    return text if len(text) <= 24 else text[:23] + '…'
+
+
+def bar_chart(counts, column):
+    """Vertical bars of a value-counts Series (index: values, values: counts)"""
+    fig, axes = _figure(f"Count of records by {column}")
+    positions = np.arange(len(counts))
+    axes.bar(positions, counts.to_numpy(), color=BAR_COLOR)
+    axes.set_xticks(positions, [_label(value) for value in counts.index], rotation=60, ha='right')
+    axes.set_xlabel(column)
+    axes.set_ylabel('Count')
+    return fig
+
+
+def histogram_chart(series, column, bins):
+    """Histogram of a numeric column"""
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        raise ChartError(f"Cannot draw a histogram of non-numeric column '{column}'")
+    values = series.dropna().to_numpy(dtype=np.float64)
+    fig, axes = _figure(f"Distribution of {column}")
+    axes.hist(values, bins=bins, color=BAR_COLOR, edgecolor='white')
+    axes.set_xlabel(column)
+    axes.set_ylabel('Count')
+    return fig
+
+
+def grouped_bar_chart(table, column1, column2):
+    """Grouped bars of a count table (rows: column1 values, columns: column2 values)"""
+    fig, axes = _figure(f"Count of records by {column1} and {column2}")
+    positions = np.arange(len(table.index))
+    width = 0.8 / max(len(table.columns), 1)
+    for i, value in enumerate(table.columns):
+        axes.bar(positions + (i - (len(table.columns) - 1) / 2) * width,
+                 table[value].to_numpy(), width=width, label=_label(value))
+    axes.set_xticks(positions, [_label(value) for value in table.index], rotation=60, ha='right')
+    axes.set_xlabel(column1)
+    axes.set_ylabel('Count')
+    axes.legend(title=column2, fontsize='small')
+    return fig
+
+
+def figure_bytes(fig, fmt):
+    """Encode a figure as PNG or SVG"""
+    buffer = io.BytesIO()
+    # Drop the creation date so identical charts produce identical bytes
+    metadata = {'Date': None} if fmt == 'svg' else None
+    fig.savefig(buffer, format=fmt, metadata=metadata)
+    return buffer.getvalue()
+
+
+def chart_etag(entry, kind, params, fmt):
+    """Strong validator of a chart: same dataset version and parameters, same bytes"""
+    key = repr((entry.path, entry.version, kind, params, fmt)).encode('utf-8')
+    return hashlib.sha256(key).hexdigest()[:32]
+
+
+class ChartRenderer:
+    """Renders charts on a thread pool and caches the encoded bytes"""
+
+    def __init__(self, workers=2, max_bytes=32 * 1024 * 1024):
+        self._workers = workers
+        self._max_bytes = max_bytes
+        self._executor = None
+        self._charts = OrderedDict()
+        self._pending = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._renders = 0
+        self._render_seconds = 0.0
+
+    def _pool(self):
+        # Created on first use so importing the module starts no threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='chart')
+        return self._executor
+
+    def _render(self, key, draw, fmt):
+        started = time.perf_counter()
+        try:
+            fig = draw()
+            try:
+                body = figure_bytes(fig, fmt)
+            finally:
+                fig.clear()
+        except Exception:
+            # A failed render must not stay pending, the next request retries it
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        with self._lock:
+            self._renders += 1
+            self._render_seconds += time.perf_counter() - started
+            self._pending.pop(key, None)
+            if self._max_bytes and len(body) <= self._max_bytes:
+                self._charts[key] = body
+                self._bytes += len(body)
+                while self._bytes > self._max_bytes:
+                    _, evicted = self._charts.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return body
+
+    def render(self, entry, kind, params, fmt, draw, timeout=None):
+        """
+        Return the encoded chart for (entry version, kind, params, fmt), calling
+        draw() -> Figure on a worker thread when it is not cached yet.
+        """
+        key = (entry.path, entry.version, kind, params, fmt)
+        with self._lock:
+            body = self._charts.get(key)
+            if body is not None:
+                self._charts.move_to_end(key)
+                self._hits += 1
+                record_cache_lookup('chart', 'hit')
+                return body
+            self._misses += 1
+            record_cache_lookup('chart', 'miss')
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool().submit(self._render, key, draw, fmt)
+                self._pending[key] = future
+        return future.result(timeout=timeout)
+
+    def invalidate(self, path=None):
+        with self._lock:
+            for key in [key for key in self._charts if path is None or key[0] == path]:
+                self._bytes -= len(self._charts.pop(key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'renders': self._renders,
+                'render_seconds': round(self._render_seconds, 4),
+                'entries': len(self._charts),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'workers': self._workers,
+            }
+
+# Create a global instance for use throughout the application
+chart_renderer = ChartRenderer(workers=chart_config.workers, max_bytes=chart_config.cache_max_bytes)
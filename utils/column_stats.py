@@ -0,0 +1,208 @@
+"""
+Per-dataset column statistics index.
+
+For every column of a loaded dataset the index keeps the distinct values,
+value counts, null count and min/max, so the unique-values and column-counts
+lookups become dictionary reads. The index is built once per dataset version;
+when the file changes, only columns whose content fingerprint changed are
+recomputed, without holding up readers of the other versions and datasets.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnStats:
+    """Precomputed statistics of a single column"""
+
+    __slots__ = ('fingerprint', 'distinct', 'value_counts', 'null_count', 'minimum', 'maximum', 'positions', 'codes')
+
+    def __init__(self, series, fingerprint):
+        self.fingerprint = fingerprint
+        # Inverted index (value -> row positions), built on first use by a query
+        self.positions = None
+        # Sorted integer encoding (codes, uniques), built on first use by a group-by
+        self.codes = None
+        self.distinct = series.unique()
+        counts = series.value_counts()
+        # Categorical columns report unused categories with a zero count
+        self.value_counts = counts[counts > 0] if isinstance(series.dtype, pd.CategoricalDtype) else counts
+        self.null_count = int(series.isna().sum())
+        self.minimum, self.maximum = self._bounds(series)
+
+    @staticmethod
+    def _bounds(series):
+        values = series.dropna()
+        if values.empty:
+            return None, None
+        try:
+            if isinstance(series.dtype, pd.CategoricalDtype) and not series.cat.ordered:
+                values = values.astype(series.cat.categories.dtype)
+            return values.min(), values.max()
+        except (TypeError, ValueError):
+            # Mixed-type object columns have no total order
+            return None, None
+
+    def to_dict(self):
+        return {
+            'distinct_count': int(len(self.value_counts)),
+            'null_count': self.null_count,
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+
+def column_fingerprint(series):
+    """
+    Cheap content hash of a column used to detect which columns changed between versions.
+
+    It depends on the row order: the cached row positions and codes of a column
+    are only valid for the same values in the same rows.
+    """
+    hashed = pd.util.hash_pandas_object(series, index=False)
+    digest = hashlib.blake2b(hashed.to_numpy().tobytes(), digest_size=16).hexdigest()
+    return (str(series.dtype), len(series), digest)
+
+
+def build_inverted_index(series):
+    """Map every distinct non-null value of series to the sorted positions of its rows"""
+    codes, uniques = pd.factorize(series)
+    present = codes >= 0
+    order = np.argsort(codes[present], kind='stable')
+    positions = np.flatnonzero(present)[order]
+    counts = np.bincount(codes[present], minlength=len(uniques))
+    boundaries = np.concatenate(([0], np.cumsum(counts)))
+    return {
+        value: positions[boundaries[code]:boundaries[code + 1]]
+        for code, value in enumerate(uniques.tolist())
+    }
+
+
+class ColumnStatsIndex:
+    """
+    Statistics of every column of every loaded dataset, keyed by path and version.
+
+    A few versions of each path are kept, so readers still on the previous
+    version (stale reads during a reload, pinned batch snapshots) and the
+    version being prepared do not evict each other's index. Builds run outside
+    the lock and concurrent requests for the same version share one build.
+    """
+
+    def __init__(self, versions_per_path=2):
+        self._versions_per_path = max(versions_per_path, 1)
+        self._indexes = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._columns_rebuilt = 0
+        self._columns_reused = 0
+
+    @staticmethod
+    def _build(entry, previous):
+        columns = {}
+        reused = 0
+        for column in entry.frame.columns:
+            series = entry.frame[column]
+            fingerprint = column_fingerprint(series)
+            cached = previous.get(column) if previous else None
+            if cached is not None and cached.fingerprint == fingerprint:
+                columns[column] = cached
+                reused += 1
+            else:
+                columns[column] = ColumnStats(series, fingerprint)
+        return columns, reused
+
+    def _latest(self, path):
+        # Called with the lock held: the most recently used index of path, whatever its version
+        for (indexed_path, _), columns in reversed(self._indexes.items()):
+            if indexed_path == path:
+                return columns
+        return None
+
+    def _evict(self, path):
+        # Called with the lock held
+        keys = [key for key in self._indexes if key[0] == path]
+        for key in keys[:max(len(keys) - self._versions_per_path, 0)]:
+            del self._indexes[key]
+
+    def for_entry(self, entry):
+        """Return {column: ColumnStats} for a DatasetEntry, building or refreshing it if needed"""
+        key = (entry.path, entry.version)
+        with self._lock:
+            columns = self._indexes.get(key)
+            if columns is not None:
+                self._indexes.move_to_end(key)
+                return columns
+            pending = self._building.get(key)
+            if pending is None:
+                # Unchanged columns are taken over from the newest known version
+                previous = self._latest(entry.path)
+                pending = self._building[key] = Future()
+                building = True
+            else:
+                building = False
+        if not building:
+            return pending.result()
+
+        try:
+            columns, reused = self._build(entry, previous)
+        except Exception as e:
+            with self._lock:
+                del self._building[key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._building[key]
+            self._indexes[key] = columns
+            self._evict(entry.path)
+            self._builds += 1
+            self._columns_reused += reused
+            self._columns_rebuilt += len(columns) - reused
+        pending.set_result(columns)
+        return columns
+
+    def column(self, entry, columnName):
+        """Return the ColumnStats of one column, or None if the dataset has no such column"""
+        return self.for_entry(entry).get(columnName)
+
+    def row_positions(self, entry, columnName):
+        """Return the inverted index {value: sorted row positions} of one column"""
+        stats = self.column(entry, columnName)
+        if stats.positions is None:
+            stats.positions = build_inverted_index(entry.frame[columnName])
+        return stats.positions
+
+    def codes(self, entry, columnName):
+        """Return (codes, uniques) of one column: uniques sorted, codes -1 for missing values"""
+        stats = self.column(entry, columnName)
+        if stats.codes is None:
+            stats.codes = pd.factorize(entry.frame[columnName], sort=True)
+        return stats.codes
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._indexes.clear()
+            else:
+                path = os.path.abspath(path)
+                for key in [key for key in self._indexes if key[0] == path]:
+                    del self._indexes[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'datasets': len({path for path, _ in self._indexes}),
+                'versions': len(self._indexes),
+                'building': len(self._building),
+                'builds': self._builds,
+                'columns_rebuilt': self._columns_rebuilt,
+                'columns_reused': self._columns_reused,
+            }
+
+# Create a global instance for use throughout the application
+column_stats_index = ColumnStatsIndex()
@@ -0,0 +1,154 @@
+"""
+Content encodings for HTTP responses.
+
+gzip is always available; brotli and zstd are used when their packages
+(``brotli``, ``zstandard``) are installed. ``init_app`` installs an
+after_request hook that negotiates Accept-Encoding for JSON, NDJSON and HTML
+responses: buffered bodies above the size threshold are compressed in one
+piece, streamed bodies chunk by chunk (flushing after every chunk so the
+client still receives rows as they are produced). Responses that already carry
+a Content-Encoding, e.g. compressed variants from the response cache, are
+passed through with their ETag tagged by the encoding.
+"""
+import gzip
+import zlib
+
+from flask import request
+
+from configs.http_config import http_config
+from utils.timing import phase
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('br', 'zstd', 'gzip')
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'application/ndjson', 'text/html')
+
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference"""
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    return [encoding for encoding in ENCODING_PREFERENCE if installed[encoding]]
+
+
+def compress(body, encoding, level=None):
+    """Compress bytes with one of the available encodings (level None uses the codec default)"""
+    with phase('compress'):
+        if encoding == 'gzip':
+            return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+        if encoding == 'br' and brotli is not None:
+            return brotli.compress(body, quality=5 if level is None else level)
+        if encoding == 'zstd' and zstandard is not None:
+            return zstandard.ZstdCompressor(level=3 if level is None else level).compress(body)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def negotiate(accept_encodings, offered):
+    """
+    Pick the encoding to send from a werkzeug Accept-Encoding header and the
+    encodings on offer, or None for the identity encoding.
+    """
+    best = None
+    best_quality = 0
+    for encoding in offered:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamCompressor:
+    """Incremental compressor with a common compress()/flush()/finish() interface"""
+
+    def __init__(self, encoding, level=None):
+        self._encoding = encoding
+        if encoding == 'gzip':
+            self._codec = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+        elif encoding == 'br' and brotli is not None:
+            self._codec = brotli.Compressor(quality=5 if level is None else level)
+        elif encoding == 'zstd' and zstandard is not None:
+            self._codec = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def compress(self, chunk):
+        if self._encoding == 'br':
+            return self._codec.process(chunk)
+        return self._codec.compress(chunk)
+
+    def flush(self):
+        if self._encoding == 'gzip':
+            return self._codec.flush(zlib.Z_SYNC_FLUSH)
+        if self._encoding == 'br':
+            return self._codec.flush()
+        return self._codec.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        if self._encoding == 'br':
+            return self._codec.finish()
+        return self._codec.flush()
+
+
+def iter_compressed(chunks, encoding, level=None):
+    """Compress an iterable of byte chunks, emitting output after every chunk"""
+    compressor = _StreamCompressor(encoding, level)
+    for chunk in chunks:
+        with phase('compress'):
+            output = compressor.compress(chunk) + compressor.flush()
+        if output:
+            yield output
+    yield compressor.finish()
+
+
+def _compressible(response):
+    if response.status_code != 200 or response.direct_passthrough:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    return 'no-transform' not in response.headers.get('Cache-Control', '')
+
+
+def _tag_etag(response, encoding):
+    # Each encoding is a different representation, so it gets its own strong validator
+    etag, weak = response.get_etag()
+    if etag and not weak and not etag.endswith(f"-{encoding}"):
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def compress_response(response):
+    """after_request hook: compress JSON/HTML responses the client accepts compressed"""
+    encoding = response.headers.get('Content-Encoding')
+    if encoding is None:
+        if not http_config.compression_enabled or not _compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        offered = [encoding for encoding in http_config.compression_encodings if encoding in available_encodings()]
+        encoding = negotiate(request.accept_encodings, offered)
+        if encoding is None:
+            return response
+        level = http_config.compression_level
+        if response.is_streamed:
+            response.response = iter_compressed(response.iter_encoded(), encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < http_config.compression_min_bytes:
+                return response
+            response.set_data(compress(body, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+    # Also tags bodies encoded before this hook, e.g. by the response cache
+    _tag_etag(response, encoding)
+    return response
+
+
+def init_app(app):
+    """Install response compression on an app"""
+    app.after_request(compress_response)
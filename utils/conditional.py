@@ -0,0 +1,144 @@
+"""
+HTTP validators and conditional responses for dataset endpoints.
+
+Every response derived from a dataset file gets a strong ETag built from the
+file's content hash plus the request path, query parameters and negotiated
+format (JSON or NDJSON), and a Last-Modified header from the file's mtime.
+Both validators come from the file alone (the hash is memoized per mtime/size),
+but a URL naming an unknown column or an invalid parameter has the same
+validators as a good one, so a 304 is only sent where the view answers 200.
+The ETags of 200 responses are remembered: a matching If-None-Match or
+If-Modified-Since on one of those is answered with 304 before the dataset is
+loaded or anything is serialized; any other conditional request runs the view
+and gets 304 only if the view succeeds.
+"""
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import Response, make_response, request
+
+from configs.http_config import http_config
+from utils.compression import ENCODING_PREFERENCE
+from utils.dataset_cache import dataset_cache
+from utils.fingerprint import content_hash
+from utils.streaming import wants_ndjson
+
+
+def dataset_validators(path):
+    """(strong ETag, Last-Modified datetime) of the current request against a dataset file"""
+    digest = hashlib.sha256(content_hash(path).encode('ascii'))
+    digest.update(request.path.encode('utf-8'))
+    for key, value in sorted(request.args.items(multi=True)):
+        digest.update(f"\0{key}={value}".encode('utf-8'))
+    # Content negotiation (JSON vs NDJSON) changes the body for the same URL
+    digest.update(f"\0format={'ndjson' if wants_ndjson(request) else 'json'}".encode('utf-8'))
+    last_modified = datetime.fromtimestamp(int(os.stat(path).st_mtime), tz=timezone.utc)
+    return digest.hexdigest()[:32], last_modified
+
+
+def is_not_modified(etag, last_modified):
+    """Evaluate If-None-Match, then (only without it) If-Modified-Since, as RFC 9110 orders them"""
+    if request.if_none_match:
+        # The compressed representations carry the encoding as an ETag suffix
+        candidates = [etag] + [f"{etag}-{encoding}" for encoding in ENCODING_PREFERENCE]
+        return any(request.if_none_match.contains(candidate) for candidate in candidates)
+    if request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+class ValidatedResponses:
+    """Bounded LRU set of the ETags the views have answered with 200"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._etags = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, etag):
+        with self._lock:
+            if etag not in self._etags:
+                return False
+            self._etags.move_to_end(etag)
+            return True
+
+    def add(self, etag):
+        with self._lock:
+            self._etags[etag] = True
+            self._etags.move_to_end(etag)
+            while len(self._etags) > self.max_entries:
+                self._etags.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._etags.clear()
+
+
+validated_responses = ValidatedResponses(http_config.conditional_max_entries)
+
+
+def _not_modified(etag, last_modified):
+    return _set_validators(Response(status=304), etag, last_modified)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.vary.add('Accept')
+    return response
+
+
+def conditional(dataset):
+    """
+    Decorate a view serving data of one dataset with ETag/Last-Modified handling.
+
+    dataset is the dataset file path, or a callable receiving the view arguments
+    and returning the path (None when the view should answer on its own, e.g. 404).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not http_config.conditional_enabled or request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            path = dataset(**kwargs) if callable(dataset) else dataset
+            if path is None or not os.path.exists(path):
+                return view(*args, **kwargs)
+            # While a reload is in flight the body comes from the previous version,
+            # which the file-based validators would mislabel
+            if dataset_cache.is_serving_stale(path):
+                return view(*args, **kwargs)
+
+            etag, last_modified = dataset_validators(path)
+            not_modified = is_not_modified(etag, last_modified)
+            if not_modified and etag in validated_responses:
+                return _not_modified(etag, last_modified)
+
+            # Unknown columns, bad parameters and the like must keep their 4xx
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            validated_responses.add(etag)
+            if not_modified:
+                response.close()
+                return _not_modified(etag, last_modified)
+            return _set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def apply_cache_control(response):
+    """after_request hook: add the configured Cache-Control policy of the endpoint"""
+    if 'Cache-Control' not in response.headers and request.endpoint:
+        policy = http_config.cache_control_for(request.endpoint)
+        if policy:
+            response.headers['Cache-Control'] = policy
+    return response
+
+
+def init_app(app):
+    """Install the Cache-Control policies on an app"""
+    app.after_request(apply_cache_control)
@@ -0,0 +1,300 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from configs.cache_config import cache_config
+from utils.fingerprint import version_token
+from utils.metrics import record_cache_lookup, record_dataset_load
+
+
+class DatasetEntry:
+    """A parsed dataset together with the file signature it was loaded from"""
+
+    __slots__ = ('path', 'frame', 'mtime_ns', 'size', 'nbytes', 'loaded_at', 'load_seconds')
+
+    def __init__(self, path, frame, mtime_ns, size, load_seconds):
+        self.path = path
+        self.frame = frame
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+    @property
+    def version(self):
+        """Token that changes whenever the underlying file changes"""
+        return version_token(self.mtime_ns, self.size)
+
+    def matches(self, stat_result):
+        return self.mtime_ns == stat_result.st_mtime_ns and self.size == stat_result.st_size
+
+
+class DatasetCache:
+    """
+    LRU cache of parsed datasets keyed by absolute file path.
+
+    A cached DataFrame is handed out as long as the file's mtime and size are
+    unchanged; otherwise the file is parsed again. The frames are shared
+    between requests, so callers must treat them as read-only.
+
+    Loads run on a bounded thread pool, and concurrent misses for the same file
+    are coalesced: the first one starts the load, the others wait for its
+    result instead of parsing the file again (single-flight).
+
+    With serve_stale enabled (set while the file watcher runs), a changed file
+    no longer blocks readers: they keep getting the cached version while the new
+    one is loaded in the background, its prepare hooks (e.g. index builds) run,
+    and it is then swapped in with a single dictionary assignment. A reload that
+    fails (e.g. a half-written or corrupt file) is not retried for the same file
+    signature until reload_retry seconds have passed; readers stay on the
+    previous version meanwhile, and a new write to the file is tried at once.
+    Only a dataset that was never loaded has no version to serve: requests for
+    it wait on its (single-flight) first load, whether serve_stale is set or not.
+    """
+
+    def __init__(self, max_bytes=0, enabled=True, load_workers=2, serve_stale=False, reload_retry=30.0):
+        self._max_bytes = max_bytes
+        self._enabled = enabled
+        self._load_workers = load_workers
+        self.serve_stale = serve_stale
+        self._reload_retry = reload_retry
+        self._executor = None
+        self._entries = OrderedDict()
+        self._loading = {}
+        # path -> (signature, monotonic time) of the last background reload that failed
+        self._failed = {}
+        self._prepare_hooks = []
+        self._swap_hooks = []
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._coalesced = 0
+        self._stale_hits = 0
+        self._swaps = 0
+        self._failed_reloads = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+
+    def get(self, path, loader):
+        """Return the DataFrame for path, parsing it with loader on a miss"""
+        return self.get_entry(path, loader).frame
+
+    def get_entry(self, path, loader):
+        """Return the DatasetEntry for path, parsing it with loader on a miss"""
+        key = self._key(path)
+        stat_result = os.stat(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.matches(stat_result):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                record_cache_lookup('dataset', 'hit')
+                return entry
+            pending = self._loading.get(key)
+            loading_this_version = pending is not None and pending[0] == (stat_result.st_mtime_ns, stat_result.st_size)
+            if entry is not None and self.serve_stale:
+                # Keep answering from the current version; the new one is swapped in when ready
+                self._stale_hits += 1
+                record_cache_lookup('dataset', 'stale')
+                if not loading_this_version and not self._backing_off(key, stat_result):
+                    self._start_load(key, path, loader, stat_result, entry)
+                return entry
+            if loading_this_version:
+                # The same version is already being loaded: wait for it
+                self._coalesced += 1
+                record_cache_lookup('dataset', 'coalesced')
+                future = pending[1]
+            else:
+                future = self._start_load(key, path, loader, stat_result, entry)
+        return future.result()
+
+    def refresh(self, path, loader):
+        """
+        Reload a cached dataset in the background if its file changed.
+
+        Returns the Future of the load, or None when the dataset is not cached
+        (it is loaded on its next request), already up to date, or a reload of
+        this file version failed less than reload_retry seconds ago.
+        """
+        key = self._key(path)
+        stat_result = os.stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.matches(stat_result):
+                return None
+            pending = self._loading.get(key)
+            if pending is not None and pending[0] == (stat_result.st_mtime_ns, stat_result.st_size):
+                return pending[1]
+            if self._backing_off(key, stat_result):
+                return None
+            return self._start_load(key, path, loader, stat_result, entry)
+
+    def add_prepare_hook(self, hook):
+        """Call hook(entry) on a reloaded entry before it replaces the cached version"""
+        self._prepare_hooks.append(hook)
+
+    def add_swap_hook(self, hook):
+        """Call hook(previous, entry) after a reloaded entry replaced the cached version"""
+        self._swap_hooks.append(hook)
+
+    def is_serving_stale(self, path):
+        """Whether requests for path are currently answered from an outdated version"""
+        if not self.serve_stale:
+            return False
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and not entry.matches(os.stat(key))
+
+    def _backing_off(self, key, stat_result):
+        # Called with the lock held
+        failed = self._failed.get(key)
+        if failed is None:
+            return False
+        signature, failed_at = failed
+        return (signature == (stat_result.st_mtime_ns, stat_result.st_size)
+                and time.monotonic() - failed_at < self._reload_retry)
+
+    def _start_load(self, key, path, loader, stat_result, previous):
+        # Called with the lock held
+        self._misses += 1
+        record_cache_lookup('dataset', 'miss')
+        if previous is not None:
+            self._reloads += 1
+        future = self._pool().submit(self._load, key, path, loader, stat_result, previous)
+        self._loading[key] = ((stat_result.st_mtime_ns, stat_result.st_size), future)
+        return future
+
+    def _pool(self):
+        # Created on first use so importing the module starts no threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._load_workers, thread_name_prefix='dataset-load')
+        return self._executor
+
+    def _load(self, key, path, loader, stat_result, previous=None):
+        try:
+            started = time.perf_counter()
+            frame = loader(path)
+            elapsed = time.perf_counter() - started
+            record_dataset_load(key, elapsed, reload=previous is not None)
+            entry = DatasetEntry(key, frame, stat_result.st_mtime_ns, stat_result.st_size, elapsed)
+            if previous is not None:
+                # Readers may still be on the previous version, so the new one is
+                # made ready before it becomes visible
+                for hook in self._prepare_hooks:
+                    try:
+                        hook(entry)
+                    except Exception as e:
+                        print(f"Error preparing reloaded dataset {key}: {e}")
+            with self._lock:
+                self._load_seconds += elapsed
+                self._failed.pop(key, None)
+                if self._enabled:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    self._evict()
+                    if previous is not None:
+                        self._swaps += 1
+            if previous is not None:
+                for hook in self._swap_hooks:
+                    try:
+                        hook(previous, entry)
+                    except Exception as e:
+                        print(f"Error after swapping reloaded dataset {key}: {e}")
+            return entry
+        except Exception as e:
+            # A background reload has nobody waiting on it to report the failure
+            if previous is not None:
+                print(f"Error reloading dataset {key}: {e}")
+                with self._lock:
+                    self._failed[key] = ((stat_result.st_mtime_ns, stat_result.st_size), time.monotonic())
+                    self._failed_reloads += 1
+            raise
+        finally:
+            with self._lock:
+                pending = self._loading.get(key)
+                if pending is not None and pending[0] == (stat_result.st_mtime_ns, stat_result.st_size):
+                    del self._loading[key]
+
+    def peek(self, path):
+        """Return the cached entry for path if it is still fresh, without loading or counting a lookup"""
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not entry.matches(os.stat(key)):
+            return None
+        return entry
+
+    def _evict(self):
+        if not self._max_bytes:
+            return
+        # The most recently used entry is always kept, even if it alone exceeds the bound
+        while len(self._entries) > 1 and self._total_bytes() > self._max_bytes:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _total_bytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def invalidate(self, path=None):
+        """Drop one cached dataset, or all of them when path is None"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._failed.clear()
+            else:
+                self._entries.pop(self._key(path), None)
+                self._failed.pop(self._key(path), None)
+
+    def stats(self):
+        """Return hit/miss counters, load timings and the current cache contents"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self._enabled,
+                'hits': self._hits,
+                'misses': self._misses,
+                'reloads': self._reloads,
+                'coalesced': self._coalesced,
+                'serve_stale': self.serve_stale,
+                'stale_hits': self._stale_hits,
+                'swaps': self._swaps,
+                'failed_reloads': self._failed_reloads,
+                'reload_retry_seconds': self._reload_retry,
+                'loading': len(self._loading),
+                'load_workers': self._load_workers,
+                'evictions': self._evictions,
+                'hit_ratio': (self._hits / lookups) if lookups else 0.0,
+                'total_load_seconds': round(self._load_seconds, 6),
+                'average_load_seconds': round(self._load_seconds / self._misses, 6) if self._misses else 0.0,
+                'max_bytes': self._max_bytes,
+                'total_bytes': self._total_bytes(),
+                'entries': [
+                    {
+                        'path': entry.path,
+                        'version': entry.version,
+                        'rows': len(entry.frame),
+                        'bytes': entry.nbytes,
+                        'load_seconds': round(entry.load_seconds, 6),
+                        'loaded_at': entry.loaded_at,
+                    }
+                    for entry in self._entries.values()
+                ],
+            }
+
+# Create a global instance for use throughout the application
+dataset_cache = DatasetCache(
+    max_bytes=cache_config.max_bytes,
+    enabled=cache_config.enabled,
+    load_workers=cache_config.load_workers,
+    reload_retry=cache_config.reload_retry
+)
@@ -0,0 +1,157 @@
+"""
+Memory-compact dtypes for parsed datasets.
+
+Right after a source file is parsed (and before its sidecar is written), every
+column is narrowed to the smallest dtype that holds its values exactly:
+
+- string columns whose distinct values are at most DTYPE_CATEGORY_MAX_PERCENT
+  of the rows become categoricals with sorted categories, so sorting and
+  grouping give the same order as on the strings;
+- integer columns are downcast to the smallest signed integer type covering
+  their minimum and maximum;
+- float columns become float32 only when every value survives the round trip
+  unchanged, so no served number changes.
+
+Per-dataset overrides (see DatasetConfig.schema_overrides_for) pin a column to
+an explicit dtype, or to 'keep' to leave it as parsed. The before/after memory
+of every column is recorded per file and stored in the sidecar manifest.
+
+pandas 3 parses strings into Arrow-backed columns; older versions parse them
+into Python objects. There, remaining string columns are given the pyarrow
+string dtype, whether or not compaction is enabled: it is the dtype sidecars
+are read back with, so a dataset gets the same dtypes whichever way it loads.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from configs.dataset_config import dataset_config
+from utils.fingerprint import stat_signature
+
+KEEP = 'keep'
+OBJECT_STRINGS = int(pd.__version__.split('.')[0]) < 3
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_STRING = pd.StringDtype('pyarrow') if OBJECT_STRINGS else None
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    ARROW_STRING = None
+
+_reports = {}
+_reports_lock = threading.Lock()
+
+
+def _is_string_column(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    if pd.api.types.is_string_dtype(series.dtype):
+        return pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+    return False
+
+
+def arrow_strings(series):
+    """Return an object column holding only strings in the pyarrow string dtype (pandas<3 only)"""
+    if ARROW_STRING is None or series.dtype != object or not _is_string_column(series):
+        return series
+    return series.astype(ARROW_STRING)
+
+
+def _compact_series(series, category_max_ratio):
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if _is_string_column(series):
+        distinct = series.nunique(dropna=True)
+        if len(series) and distinct <= category_max_ratio * len(series):
+            return series.astype('category')
+        return series
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        if not len(series):
+            return series
+        for candidate in (np.int8, np.int16, np.int32):
+            bounds = np.iinfo(candidate)
+            if bounds.min <= series.min() and series.max() <= bounds.max:
+                return series.astype(candidate) if np.dtype(candidate).itemsize < dtype.itemsize else series
+        return series
+    if isinstance(dtype, np.dtype) and dtype == np.float64:
+        values = series.to_numpy()
+        narrowed = values.astype(np.float32)
+        # Only lossless: values such as 0.1 stay float64
+        if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return series.astype(np.float32)
+    return series
+
+
+def compact_frame(frame, overrides=None, category_max_ratio=0.5):
+    """
+    Return (compacted DataFrame, report) for a freshly parsed frame.
+
+    overrides maps column names to a dtype accepted by Series.astype, or 'keep'.
+    The report lists dtype and bytes of every column before and after.
+    """
+    overrides = overrides or {}
+    columns = {}
+    report = {'columns': columns}
+    compacted = {}
+    for column in frame.columns:
+        series = frame[column]
+        override = overrides.get(str(column))
+        if override == KEEP:
+            result = series
+        elif override:
+            result = series.astype(override)
+        else:
+            result = _compact_series(series, category_max_ratio)
+        result = arrow_strings(result)
+        compacted[column] = result
+        columns[str(column)] = {
+            'dtype_before': str(series.dtype),
+            'dtype_after': str(result.dtype),
+            'bytes_before': int(series.memory_usage(index=False, deep=True)),
+            'bytes_after': int(result.memory_usage(index=False, deep=True)),
+        }
+    result = pd.DataFrame(compacted, index=frame.index)
+    report['bytes_before'] = sum(column['bytes_before'] for column in columns.values())
+    report['bytes_after'] = sum(column['bytes_after'] for column in columns.values())
+    return result, report
+
+
+def schema_token(dataSetPath):
+    """Digest of the compaction settings of a dataset; a sidecar built with other settings is stale"""
+    settings = {
+        'enabled': dataset_config.dtype_compaction_enabled,
+        'category_max_ratio': dataset_config.category_max_ratio,
+        'overrides': dataset_config.schema_overrides_for(dataSetPath),
+    }
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def compact_dataset(dataSetPath, frame):
+    """Compact a frame parsed from dataSetPath with its configured settings and record the report"""
+    if not dataset_config.dtype_compaction_enabled:
+        if ARROW_STRING is None:
+            return frame
+        return pd.DataFrame({column: arrow_strings(frame[column]) for column in frame.columns}, index=frame.index)
+    frame, report = compact_frame(
+        frame,
+        overrides=dataset_config.schema_overrides_for(dataSetPath),
+        category_max_ratio=dataset_config.category_max_ratio,
+    )
+    key = os.path.abspath(dataSetPath)
+    with _reports_lock:
+        _reports[key] = (stat_signature(key), report)
+    return frame
+
+
+def compaction_report(dataSetPath):
+    """The report of the last compaction of dataSetPath in this process, if the file is unchanged since"""
+    key = os.path.abspath(dataSetPath)
+    with _reports_lock:
+        recorded = _reports.get(key)
+    if recorded is None or recorded[0] != stat_signature(key):
+        return None
+    return recorded[1]
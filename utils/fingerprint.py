@@ -0,0 +1,44 @@
+import hashlib
+import os
+import threading
+
+_CHUNK_SIZE = 1024 * 1024
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def stat_signature(path):
+    """Return (mtime_ns, size) for path, the cheap change detector used across the caches"""
+    stat_result = os.stat(path)
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def version_token(mtime_ns, size):
+    """Version of a file as reported to clients and used in cache keys: its signature in hex"""
+    return f"{mtime_ns:x}-{size:x}"
+
+
+def content_hash(path):
+    """
+    Return the SHA-256 hex digest of a file's contents.
+
+    The digest is memoized per file signature, so the file is only read again
+    after its mtime or size changes.
+    """
+    key = os.path.abspath(path)
+    signature = stat_signature(key)
+    with _hash_lock:
+        memo = _hash_memo.get(key)
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+
+    digest = hashlib.sha256()
+    with open(key, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _hash_lock:
+        _hash_memo[key] = (signature, value)
+    return value
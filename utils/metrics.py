@@ -0,0 +1,177 @@
+"""
+Prometheus metrics.
+
+create_app() installs request hooks (see init_app) that count requests per
+route, method and status, and observe their latency and response size; an
+in-flight gauge follows the requests being served. The dataset cache and the
+derived caches report every lookup outcome through record_cache_lookup() and
+every dataset load through record_dataset_load(), so cache hit ratios can be
+computed with e.g.
+
+    sum(rate(flask_api_cache_lookups_total{cache="dataset",result="hit"}[5m]))
+      / sum(rate(flask_api_cache_lookups_total{cache="dataset"}[5m]))
+
+Everything is exposed on /metrics in the Prometheus text format.
+
+Under several worker processes (gunicorn) each worker only sees its own
+requests, so a scrape that lands on one worker would report a fraction of the
+traffic. When PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py sets it), every
+process writes its values to memory-mapped files in that directory and
+/metrics aggregates the files of all workers, including those that exited.
+
+prometheus_client is optional: without it the hooks are not installed, the
+record functions do nothing and /metrics answers 503.
+"""
+import os
+import time
+
+from flask import g, request
+
+from configs.server_config import server_config
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    )
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    generate_latest = None
+
+NAMESPACE = 'flask_api'
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** exponent for exponent in range(10))  # 256 B .. 64 MiB
+LOAD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Requests that matched no route share one label, so stray paths cannot grow the series
+UNMATCHED = '<unmatched>'
+
+
+def metrics_available():
+    return generate_latest is not None
+
+
+def multiprocess_dir():
+    """Directory shared by the worker processes, or None in single-process mode"""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir')
+
+
+if metrics_available():
+    REQUESTS = Counter(
+        'http_requests_total', 'HTTP requests served',
+        ['endpoint', 'method', 'status'], namespace=NAMESPACE,
+    )
+    LATENCY = Histogram(
+        'http_request_duration_seconds', 'Time from the start of a request until its body was sent',
+        ['endpoint', 'method'], namespace=NAMESPACE, buckets=LATENCY_BUCKETS,
+    )
+    RESPONSE_SIZE = Histogram(
+        'http_response_size_bytes', 'Size of the response bodies as sent (after compression)',
+        ['endpoint'], namespace=NAMESPACE, buckets=SIZE_BUCKETS,
+    )
+    IN_FLIGHT = Gauge(
+        'http_requests_in_flight', 'Requests being served',
+        ['endpoint'], namespace=NAMESPACE, multiprocess_mode='livesum',
+    )
+    CACHE_LOOKUPS = Counter(
+        'cache_lookups_total', 'Cache lookups by cache and result (hit, miss, stale, coalesced)',
+        ['cache', 'result'], namespace=NAMESPACE,
+    )
+    DATASET_LOADS = Histogram(
+        'dataset_load_seconds', 'Time spent loading a dataset (sidecar attach or parse)',
+        ['dataset', 'kind'], namespace=NAMESPACE, buckets=LOAD_BUCKETS,
+    )
+
+
+def record_cache_lookup(cache, result):
+    """Count one lookup of cache ('dataset', 'response', ...) with its result"""
+    if generate_latest is not None:
+        CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+def record_dataset_load(path, seconds, reload=False):
+    """Observe the duration of a dataset load; kind is 'reload' when it replaced a cached version"""
+    if generate_latest is not None:
+        DATASET_LOADS.labels(os.path.basename(path), 'reload' if reload else 'load').observe(seconds)
+
+
+def _endpoint():
+    return request.endpoint or UNMATCHED
+
+
+def start_request():
+    """before_request hook: start the clock and count the request as in flight"""
+    endpoint = _endpoint()
+    IN_FLIGHT.labels(endpoint).inc()
+    g.metrics_request = (endpoint, time.perf_counter())
+
+
+def _finish(endpoint, started, method, status, size):
+    IN_FLIGHT.labels(endpoint).dec()
+    REQUESTS.labels(endpoint, method, status).inc()
+    LATENCY.labels(endpoint, method).observe(time.perf_counter() - started)
+    RESPONSE_SIZE.labels(endpoint).observe(size)
+
+
+def _counting(chunks, sent):
+    # Only measures the body; the request is finished when the server closes the response
+    try:
+        for chunk in chunks:
+            sent[0] += len(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def finish_request(response):
+    """after_request hook: count the response; streamed ones once the server closed them"""
+    state = g.pop('metrics_request', None)
+    if state is None:
+        return response
+    endpoint, started = state
+    method, status = request.method, str(response.status_code)
+    if response.is_streamed:
+        # The request context is gone before the body is sent. The server closes
+        # the response even when the body is never iterated (HEAD, a client gone
+        # before the first chunk), so that is where the in-flight slot is released.
+        sent = [0]
+        response.response = _counting(response.response, sent)
+        response.call_on_close(lambda: _finish(endpoint, started, method, status, sent[0]))
+    else:
+        _finish(endpoint, started, method, status, response.calculate_content_length() or 0)
+    return response
+
+
+def abandon_request(exc):
+    """teardown_request hook: release the in-flight slot of a request that produced no response"""
+    state = g.pop('metrics_request', None)
+    if state is not None:
+        IN_FLIGHT.labels(state[0]).dec()
+
+
+def exposition():
+    """(body, content type) of the current metrics, aggregated over all workers in multiprocess mode"""
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop the live gauges of an exited worker (gunicorn child_exit hook)"""
+    if metrics_available() and multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+
+def init_app(app):
+    """
+    Install the request metric hooks on an app. Call it before the other
+    after_request hooks are registered, so that sizes are taken after compression.
+    """
+    if not server_config.metrics_enabled or not metrics_available():
+        return
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.teardown_request(abandon_request)
@@ -0,0 +1,141 @@
+"""
+Opaque pagination cursors.
+
+Unsorted pages are addressed by row offset, which only means something in the
+dataset version it was issued for. Sorted pages use a keyset cursor: the sort
+key of the last row sent plus its row position as a tiebreaker (the sort is
+stable, so equal keys stay in row order). The next page starts at the first row
+after that key, found by a binary search over the cached sort permutation, so a
+cursor keeps its place when rows are added or removed in a new version.
+"""
+import base64
+import json
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or belongs to another dataset version or ordering"""
+
+
+# offset for unsorted cursors; key and row (last row sent) for keyset cursors
+Cursor = namedtuple('Cursor', ['offset', 'key', 'row'])
+
+
+def _value(value):
+    # Comparable form of a cell value; missing values become None
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _plain(value):
+    # JSON-friendly form of a cell value
+    value = _value(value)
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def _encode(payload):
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def encode_cursor(offset, version):
+    """Encode the row offset of the next unsorted page and the dataset version into an opaque token"""
+    return _encode({'o': int(offset), 'v': version})
+
+
+def encode_keyset_cursor(frame, row, sort, order):
+    """Encode the sort key and position of the last row sent, for a page sorted by sort/order"""
+    key = [_plain(frame[column].iloc[row]) for column in sort]
+    return _encode({'k': key, 'r': int(row), 's': list(sort), 'd': order})
+
+
+def decode_cursor(cursor, version, sort=(), order='asc'):
+    """
+    Decode a cursor issued for the same sort and order as the request.
+
+    Returns a Cursor: the offset of an unsorted cursor (checked against the
+    dataset version), or the key and row of a keyset cursor.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if 'k' in payload:
+            parsed = Cursor(None, list(payload['k']), int(payload['r']))
+        else:
+            parsed = Cursor(int(payload['o']), None, None)
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if payload.get('s', []) != list(sort) or (sort and payload.get('d') != order):
+        raise InvalidCursorError("Cursor was issued for another sort or order, restart pagination")
+    if sort:
+        if len(parsed.key) != len(sort) or parsed.row < 0:
+            raise InvalidCursorError(f"Invalid cursor: {cursor}")
+        return parsed
+    if payload.get('v') != version:
+        raise InvalidCursorError("Cursor refers to an older version of the dataset, restart pagination")
+    if parsed.offset < 0:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return parsed
+
+
+class _Descending:
+    """Inverts the order of a value inside a sort key tuple"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _sort_key(values, row, ascending):
+    # Same order as the cached permutation: missing values last in both
+    # directions, ties by row position
+    key = []
+    for value in values:
+        if value is None:
+            key.append((True, 0))
+        else:
+            key.append((False, value if ascending else _Descending(value)))
+    key.append(row)
+    return tuple(key)
+
+
+def _coerce(value, series):
+    # Cursor keys travel as JSON; datetimes come back as ISO strings
+    if value is not None and pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return pd.Timestamp(value)
+    return value
+
+
+def keyset_position(frame, order, sort, ascending, cursor):
+    """Position in the sort permutation order of the first row after the keyset cursor"""
+    columns = [frame[column] for column in sort]
+    target = _sort_key([_coerce(value, series) for value, series in zip(cursor.key, columns)], cursor.row, ascending)
+
+    # bisect over the permutation, comparing the sort key of each probed row
+    low, high = 0, len(order)
+    try:
+        while low < high:
+            middle = (low + high) // 2
+            position = int(order[middle])
+            if target < _sort_key([_value(series.iloc[position]) for series in columns], position, ascending):
+                high = middle
+            else:
+                low = middle + 1
+    except TypeError as e:
+        raise InvalidCursorError("Cursor key does not match the sort columns, restart pagination") from e
+    return low
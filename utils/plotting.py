@@ -0,0 +1,50 @@
+"""
+Lazy access to the plotting stack.
+
+matplotlib, seaborn and plotly take seconds and tens of MB to import, and most
+workers never draw anything. None of them is imported at module level: charts
+get matplotlib here on first use, switched to the headless Agg backend before
+pyplot is loaded so rendering works without a display. PLOTTING_MODULES lists
+the packages the startup report checks stay unimported.
+"""
+import importlib
+import sys
+import threading
+
+PLOTTING_MODULES = ('matplotlib', 'seaborn', 'plotly')
+
+_lock = threading.Lock()
+
+
+def _load(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        if name == 'matplotlib.pyplot' and 'matplotlib.pyplot' not in sys.modules:
+            importlib.import_module('matplotlib').use('Agg')
+        return importlib.import_module(name)
+
+
+def pyplot():
+    """Return matplotlib.pyplot, importing it on first use"""
+    return _load('matplotlib.pyplot')
+
+
+def loaded_plotting_modules():
+    """Names of the plotting packages imported in this process so far"""
+    return [name for name in PLOTTING_MODULES if name in sys.modules]
+
+
+def figure(**kwargs):
+    """
+    Return a new matplotlib Figure attached to an Agg canvas.
+
+    Unlike pyplot.figure() it touches no global state, so figures can be drawn
+    concurrently from worker threads.
+    """
+    Figure = _load('matplotlib.figure').Figure
+    FigureCanvasAgg = _load('matplotlib.backends.backend_agg').FigureCanvasAgg
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
@@ -0,0 +1,372 @@
+"""
+On-demand request profiling.
+
+With PROFILING_ENABLED=1, a request is profiled when it presents the
+PROFILING_TOKEN secret in an ``X-Profile-Token: <token>`` header, or at random
+for a PROFILING_SAMPLE_RATE fraction of all requests. The token is never read
+from the query string, where it would end up in request logs, proxy logs and
+cache keys. The view
+runs under one of two profilers:
+
+- sample (default): a background thread records the stack of the request's
+  thread every PROFILING_INTERVAL_MS. Overhead is low and independent of how
+  many calls the view makes; the result is written as collapsed stacks
+  (flamegraph.pl, speedscope, inferno) and as a speedscope JSON file.
+- cprofile: deterministic cProfile, written as a pstats file (snakeviz,
+  ``python -m pstats``). Only one request can be under cProfile at a time, so
+  concurrent ones fall back to the sampler.
+
+Profiles go to a ring buffer directory that keeps the newest
+PROFILING_MAX_PROFILES, shared by all worker processes; the response carries
+the id and download path in X-Profile-Id and X-Profile-Url. The admin routes
+list and download them. Streamed bodies are encoded after the view returned,
+so their profile covers building the response but not sending it.
+"""
+import cProfile
+import glob
+import hmac
+import json
+import marshal
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+from configs.server_config import server_config
+
+TOKEN_HEADER = 'X-Profile-Token'
+# name: (file suffix, mimetype)
+FORMATS = {
+    'collapsed': ('collapsed.txt', 'text/plain'),
+    'speedscope': ('speedscope.json', 'application/json'),
+    'pstats': ('prof', 'application/octet-stream'),
+}
+_ID_PATTERN = re.compile(r'^[0-9a-f]+-[0-9]+-[0-9a-f]+$')
+
+_cprofile_lock = threading.Lock()
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    try:
+        # Repository files relative to it; library files keep their full path
+        relative = os.path.relpath(filename)
+        if not relative.startswith('..'):
+            filename = relative
+    except ValueError:
+        pass
+    # ';' separates frames in collapsed stacks
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval from a background thread.
+
+    Dataset loads, chart renders and batch operations run on shared pools while
+    the request thread waits for them, so busy threads of those pools are
+    sampled as well, under a root frame naming the thread (their work may
+    belong to other requests).
+    """
+
+    HELPER_THREAD_PREFIXES = ('dataset-load', 'chart', 'batch')
+
+    def __init__(self, thread_id, interval):
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def _stack(frame):
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _helpers(self):
+        return {
+            thread.ident: thread.name for thread in threading.enumerate()
+            if thread.name.startswith(self.HELPER_THREAD_PREFIXES)
+        }
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            # Pool threads are started lazily, possibly by this very request
+            helpers = self._helpers()
+            frames = sys._current_frames()
+            frame = frames.get(self._thread_id)
+            if frame is not None:
+                self._stacks[tuple(self._stack(frame))] += 1
+            for ident, name in helpers.items():
+                frame = frames.get(ident)
+                # An idle pool thread waits for work in concurrent.futures' _worker
+                if frame is None or frame.f_code.co_name == '_worker':
+                    continue
+                self._stacks[tuple([f"thread {name}"] + self._stack(frame))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    @property
+    def samples(self):
+        return sum(self._stacks.values())
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed stack format: 'outer;...;inner count' per line"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self._stacks.most_common())
+
+    def speedscope(self, name):
+        """A speedscope 'sampled' profile, weighted in seconds"""
+        frames = {}
+        samples = []
+        weights = []
+        # Samples come less often than the interval under load: spread the measured time
+        total = sum(self._stacks[stack] for stack in self._stacks if not stack[0].startswith('thread '))
+        weight = self.elapsed / total if total else self._interval
+        for stack, count in self._stacks.items():
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+            weights.append(round(count * weight, 6))
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'flask-api',
+            'activeProfileIndex': 0,
+            'shared': {'frames': [{'name': label} for label in frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': round(sum(weights), 6),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+class DeterministicProfiler:
+    """cProfile of the current thread; holds the process-wide cProfile slot while running"""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def stop(self):
+        try:
+            self._profile.disable()
+        finally:
+            _cprofile_lock.release()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def pstats(self):
+        # Profile.dump_stats only writes to a path; marshal the same data in memory
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of profiles: <id>.meta.json plus one file per format"""
+
+    def __init__(self, directory, max_profiles):
+        self._directory = directory
+        self._max_profiles = max_profiles
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def _path(self, profile_id, suffix):
+        return os.path.join(self._directory, f"{profile_id}.{suffix}")
+
+    def save(self, meta, files):
+        """Write a profile (files maps format names to bytes) and drop the oldest beyond the limit"""
+        os.makedirs(self._directory, exist_ok=True)
+        # Ids start with the time, so they sort in creation order across workers
+        profile_id = f"{time.time_ns():x}-{os.getpid()}-{secrets.token_hex(3)}"
+        meta = dict(meta, id=profile_id, formats=sorted(files))
+        for name, data in files.items():
+            self._write(self._path(profile_id, FORMATS[name][0]), data)
+        # The metadata is written last: a profile is listed once it is complete
+        self._write(self._path(profile_id, 'meta.json'), json.dumps(meta).encode('utf-8'))
+        self._prune()
+        return profile_id
+
+    @staticmethod
+    def _write(path, data):
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+
+    def _ids(self):
+        suffix = '.meta.json'
+        names = glob.glob(os.path.join(self._directory, f"*{suffix}"))
+        return sorted(os.path.basename(name)[:-len(suffix)] for name in names)
+
+    def _prune(self):
+        ids = self._ids()
+        for profile_id in ids[:max(len(ids) - self._max_profiles, 0)]:
+            for suffix in [FORMATS[name][0] for name in FORMATS] + ['meta.json']:
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    # Another worker pruned it first
+                    pass
+
+    def list(self):
+        """Metadata of the stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            meta = self.meta(profile_id)
+            if meta is not None:
+                profiles.append(meta)
+        return profiles
+
+    def meta(self, profile_id):
+        if not _ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, 'meta.json'), 'rb') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def file(self, profile_id, name):
+        """(path, mimetype) of one format of a profile, or None"""
+        if name not in FORMATS or not _ID_PATTERN.match(profile_id):
+            return None
+        suffix, mimetype = FORMATS[name]
+        path = self._path(profile_id, suffix)
+        return (path, mimetype) if os.path.exists(path) else None
+
+# Create a global instance for use throughout the application
+profile_store = ProfileStore(server_config.profiling_dir, server_config.profiling_max_profiles)
+
+
+def is_authorized(token):
+    """Constant-time check of a presented token; always False when no token is configured"""
+    expected = server_config.profiling_token
+    return bool(expected) and bool(token) and hmac.compare_digest(token.encode('utf-8'), expected.encode('utf-8'))
+
+
+def request_token():
+    return request.headers.get(TOKEN_HEADER)
+
+
+def _trigger():
+    # Reading profiles with the token must not create new ones
+    if request.blueprint == 'admin':
+        return None
+    if is_authorized(request_token()):
+        return 'token'
+    rate = server_config.profiling_sample_rate
+    if rate and random.random() < rate:
+        return 'sampled'
+    return None
+
+
+def start_profile():
+    """before_request hook (installed to run last): start profiling a triggered request"""
+    trigger = _trigger()
+    if trigger is None:
+        return
+    if server_config.profiling_mode == 'cprofile' and _cprofile_lock.acquire(blocking=False):
+        profiler = DeterministicProfiler()
+    else:
+        profiler = StackSampler(threading.get_ident(), server_config.profiling_interval)
+    g.profiler = (trigger, profiler.start())
+
+
+def _stop_profile():
+    state = g.pop('profiler', None)
+    if state is None:
+        return None
+    trigger, profiler = state
+    return trigger, profiler.stop()
+
+
+def finish_profile(response):
+    """after_request hook (installed to run first): store the profile and point the response at it"""
+    stopped = _stop_profile()
+    if stopped is None:
+        return response
+    trigger, profiler = stopped
+    name = f"{request.method} {request.path}"
+    meta = {
+        'created': time.time(),
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'trigger': trigger,
+        'seconds': round(profiler.elapsed, 6),
+    }
+    if isinstance(profiler, DeterministicProfiler):
+        meta['mode'] = 'cprofile'
+        files = {'pstats': profiler.pstats()}
+    else:
+        meta.update(mode='sample', samples=profiler.samples, interval=server_config.profiling_interval)
+        files = {
+            'collapsed': profiler.collapsed().encode('utf-8'),
+            'speedscope': json.dumps(profiler.speedscope(name)).encode('utf-8'),
+        }
+    try:
+        profile_id = profile_store.save(meta, files)
+    except OSError as e:
+        print(f"Error storing profile of {name}: {e}")
+        return response
+    response.headers['X-Profile-Id'] = profile_id
+    response.headers['X-Profile-Url'] = f"/api/admin/profiles/{profile_id}"
+    return response
+
+
+def abandon_profile(exc):
+    """teardown_request hook: stop a profiler whose request produced no response"""
+    _stop_profile()
+
+
+def profile_summary(meta):
+    """Listing entry of a profile with the download path of each format"""
+    return dict(meta, downloads={
+        name: f"/api/admin/profiles/{meta['id']}?format={name}" for name in meta.get('formats', [])
+    })
+
+
+def init_app(app):
+    """
+    Install the profiling hooks on an app. Call it after the other hooks are
+    registered, so that the profile wraps the view as closely as possible.
+    """
+    if not server_config.profiling_enabled:
+        return
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(abandon_profile)
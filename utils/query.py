@@ -0,0 +1,162 @@
+"""
+Filter/projection query engine over a loaded dataset.
+
+Filters are written as ``column:operator:value`` (``in`` takes ``|``-separated
+values). Equality and IN predicates are answered from the per-column inverted
+index of the column statistics index, so they only touch matching rows; range
+predicates are evaluated vectorized, and only on rows that survived the
+indexed predicates.
+"""
+import operator
+
+import numpy as np
+import pandas as pd
+
+from utils.column_stats import column_stats_index
+
+INDEXED_OPERATORS = ('eq', 'in')
+COMPARISON_OPERATORS = {
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+OPERATORS = INDEXED_OPERATORS + tuple(COMPARISON_OPERATORS)
+IN_SEPARATOR = '|'
+
+
+class QueryError(ValueError):
+    """Raised when a query references unknown columns or has malformed parameters"""
+
+
+class Predicate:
+    __slots__ = ('column', 'op', 'values')
+
+    def __init__(self, column, op, values):
+        self.column = column
+        self.op = op
+        self.values = values
+
+    def to_dict(self):
+        return {'column': self.column, 'op': self.op, 'values': list(self.values)}
+
+
+def parse_filter(text):
+    """Split ``column:op:value`` into its parts"""
+    parts = text.split(':', 2)
+    if len(parts) != 3 or not parts[0]:
+        raise QueryError(f"Invalid filter '{text}', expected column:operator:value")
+    column, op, raw_value = parts
+    op = op.lower()
+    if op not in OPERATORS:
+        raise QueryError(f"Unknown filter operator '{op}'. Available operators: {list(OPERATORS)}")
+    raw_values = raw_value.split(IN_SEPARATOR) if op == 'in' else [raw_value]
+    return column, op, raw_values
+
+
+def coerce_value(dtype, raw):
+    """Convert a query-string value to the type of the column it is compared with"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            lowered = raw.lower()
+            if lowered not in ('true', 'false', '1', '0'):
+                raise ValueError(raw)
+            return lowered in ('true', '1')
+        if pd.api.types.is_integer_dtype(dtype):
+            number = float(raw)
+            return int(number) if number.is_integer() else number
+        if pd.api.types.is_float_dtype(dtype):
+            return float(raw)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return pd.Timestamp(raw)
+    except ValueError:
+        raise QueryError(f"Value '{raw}' is not valid for a column of type {dtype}")
+    return raw
+
+
+def build_predicates(frame, filters):
+    """Parse filter strings into Predicates, validating columns and coercing values"""
+    predicates = []
+    for text in filters:
+        column, op, raw_values = parse_filter(text)
+        if column not in frame.columns:
+            raise QueryError(f"Column '{column}' not found in dataset. Available columns: {list(frame.columns)}")
+        dtype = frame[column].dtype
+        predicates.append(Predicate(column, op, [coerce_value(dtype, raw) for raw in raw_values]))
+    return predicates
+
+
+def _indexed_positions(entry, predicate):
+    positions = column_stats_index.row_positions(entry, predicate.column)
+    matches = [positions[value] for value in predicate.values if value in positions]
+    if not matches:
+        return np.empty(0, dtype=np.intp)
+    if len(matches) == 1:
+        return matches[0]
+    return np.unique(np.concatenate(matches))
+
+
+def compare(series, op, value):
+    """
+    Boolean mask of op(series, value) with missing values as False.
+
+    Categorical columns (from dtype compaction) have unordered categories, so
+    the comparison is evaluated once per category and mapped onto the rows
+    through their codes; rows match exactly as they would on the plain column.
+    Raises QueryError when the column's values cannot be ordered against value.
+    """
+    compare_op = COMPARISON_OPERATORS[op]
+    try:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            per_category = np.asarray(compare_op(series.cat.categories, value), dtype=bool)
+            codes = series.cat.codes.to_numpy()
+            # A missing value is different from anything, and never greater or smaller
+            keep = np.full(len(codes), op == 'ne', dtype=bool)
+            present = codes >= 0
+            keep[present] = per_category[codes[present]]
+            return keep
+        keep = compare_op(series, value)
+    except TypeError:
+        # Ordering a column that mixes types (numbers and strings in one object column)
+        raise QueryError(f"Operator '{op}' cannot order the mixed values of column '{series.name}'")
+    return np.asarray(pd.array(keep, dtype='boolean').to_numpy(dtype=bool, na_value=False))
+
+
+def matching_positions(entry, predicates):
+    """
+    Return the sorted row positions of entry.frame that satisfy every predicate,
+    or None when there are no predicates (every row matches).
+    """
+    rows = None
+    # Indexed predicates first: they are cheap and shrink the candidate set
+    for predicate in predicates:
+        if predicate.op not in INDEXED_OPERATORS:
+            continue
+        positions = _indexed_positions(entry, predicate)
+        rows = positions if rows is None else np.intersect1d(rows, positions, assume_unique=True)
+        if len(rows) == 0:
+            return rows
+
+    for predicate in predicates:
+        if predicate.op in INDEXED_OPERATORS:
+            continue
+        series = entry.frame[predicate.column]
+        candidates = series if rows is None else series.iloc[rows]
+        keep = compare(candidates, predicate.op, predicate.values[0])
+        rows = np.flatnonzero(keep) if rows is None else rows[keep]
+        if len(rows) == 0:
+            return rows
+    return rows
+
+
+def parse_fields(frame, fields):
+    """Return the projected column names, or every column when fields is empty"""
+    if not fields:
+        return list(frame.columns)
+    missing = [field for field in fields if field not in frame.columns]
+    if missing:
+        raise QueryError(f"Columns {missing} not found in dataset. Available columns: {list(frame.columns)}")
+    return fields
@@ -0,0 +1,239 @@
+"""
+Cache of fully encoded responses.
+
+Views opt in with the ``@cached_response(dataset)`` decorator. The first
+request for a (route, arguments, dataset version) stores the final response
+bytes and the headers set by the view; a compressed copy per encoding is built
+by the first request asking for it. Later requests are answered from those
+bytes without touching the DataFrame, the JSON encoder or the compressor.
+The cache is bounded by the total size of the stored bytes, least recently
+used first out.
+"""
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, make_response, request
+
+from configs.cache_config import cache_config
+from configs.http_config import http_config
+from utils.compression import available_encodings, compress, negotiate
+from utils.dataset_cache import dataset_cache
+from utils.fingerprint import stat_signature
+from utils.metrics import record_cache_lookup
+from utils.streaming import wants_ndjson
+from utils.timing import annotate
+
+
+# Headers describing the transfer of a body rather than the response itself
+TRANSFER_HEADERS = frozenset(('content-length', 'content-type', 'content-encoding', 'transfer-encoding'))
+
+
+class CachedResponse:
+    """Encoded body and headers of one response, with its compressed variants"""
+
+    __slots__ = ('status', 'mimetype', 'body', 'headers', 'encodings', 'variants')
+
+    def __init__(self, status, mimetype, body, headers=(), encodings=()):
+        self.status = status
+        self.mimetype = mimetype
+        self.body = body
+        # Headers set by the view, such as X-Total-Count
+        self.headers = [(name, value) for name, value in headers if name.lower() not in TRANSFER_HEADERS]
+        # Encodings a variant may be built for, and those built so far
+        # (None for an encoding that did not make the body smaller)
+        self.encodings = list(encodings)
+        self.variants = {}
+
+    @property
+    def nbytes(self):
+        return len(self.body) + sum(len(variant) for variant in self.variants.values() if variant is not None)
+
+
+class ResponseCache:
+    """Size-bounded LRU of CachedResponses keyed by route, arguments and dataset version"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, encodings=()):
+        self._max_bytes = max_bytes
+        self._encodings = [encoding for encoding in encodings if encoding in available_encodings()]
+        self._responses = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._route_counts = {}
+
+    @property
+    def enabled(self):
+        return self._max_bytes > 0
+
+    def _count(self, endpoint, outcome):
+        counts = self._route_counts.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def get(self, key):
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is None:
+                self._misses += 1
+                record_cache_lookup('response', 'miss')
+                self._count(key[0], 'misses')
+                return None
+            self._responses.move_to_end(key)
+            self._hits += 1
+            record_cache_lookup('response', 'hit')
+            self._count(key[0], 'hits')
+            return cached
+
+    def put(self, key, response):
+        """Store a buffered 200 response; returns the CachedResponse, or None if it is not cacheable"""
+        if response.status_code != 200 or response.is_streamed or 'Content-Encoding' in response.headers:
+            return None
+        return self.store(key, response.status_code, response.mimetype, response.get_data(), response.headers)
+
+    def tee(self, key, response):
+        """
+        Wrap a streamed 200 response so its chunks are collected while they are
+        sent, and stored once the stream has been delivered completely.
+        """
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        source = response.iter_encoded()
+        status, mimetype, headers = response.status_code, response.mimetype, list(response.headers)
+
+        def collect():
+            chunks = []
+            for chunk in source:
+                chunks.append(chunk)
+                yield chunk
+            # Reached only when the client received every chunk
+            self.store(key, status, mimetype, b''.join(chunks), headers)
+
+        response.response = collect()
+        return response
+
+    def store(self, key, status, mimetype, body, headers=()):
+        """
+        Keep the body of a response. Compressed variants are only built when a
+        request asks for them, so one-off URLs never pay for encodings nobody uses.
+        """
+        encodings = self._encodings if len(body) >= http_config.compression_min_bytes else ()
+        cached = CachedResponse(status, mimetype, body, headers, encodings)
+        if cached.nbytes > self._max_bytes:
+            return cached
+        with self._lock:
+            previous = self._responses.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._responses[key] = cached
+            self._bytes += cached.nbytes
+            self._evict()
+        return cached
+
+    def _evict(self):
+        # Called with the lock held
+        while self._bytes > self._max_bytes and self._responses:
+            _, evicted = self._responses.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._evictions += 1
+
+    def _variant(self, key, cached, encoding):
+        """The body of cached compressed with encoding, built on its first request; None if that does not shrink it"""
+        if encoding in cached.variants:
+            return cached.variants[encoding]
+        compressed = compress(cached.body, encoding, cache_config.response_cache_level)
+        # Poorly compressible bodies are only kept as identity
+        variant = compressed if len(compressed) < len(cached.body) else None
+        with self._lock:
+            if encoding not in cached.variants:
+                cached.variants[encoding] = variant
+                if self._responses.get(key) is cached and variant is not None:
+                    self._bytes += len(variant)
+                    self._evict()
+        return cached.variants[encoding]
+
+    def respond(self, key, cached, accept_encodings):
+        """Build the response of a cached entry in the best encoding the client accepts"""
+        # With compression turned off every client gets the identity body
+        offered = cached.encodings if http_config.compression_enabled else ()
+        encoding = negotiate(accept_encodings, offered)
+        body = self._variant(key, cached, encoding) if encoding else None
+        if body is None:
+            encoding, body = None, cached.body
+        response = Response(body, status=cached.status, mimetype=cached.mimetype)
+        for name, value in cached.headers:
+            response.headers.add(name, value)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if offered:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    def invalidate(self, path=None):
+        with self._lock:
+            for key in [key for key in self._responses if path is None or key[1] == path]:
+                self._bytes -= self._responses.pop(key).nbytes
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else None,
+                'evictions': self._evictions,
+                'entries': len(self._responses),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'encodings': list(self._encodings),
+                'routes': {endpoint: dict(counts) for endpoint, counts in self._route_counts.items()},
+            }
+
+# Create a global instance for use throughout the application
+response_cache = ResponseCache(max_bytes=cache_config.response_cache_max_bytes,
+                               encodings=cache_config.response_cache_encodings)
+
+
+def cached_response(dataset, streamed=False):
+    """
+    Serve a view from the response cache.
+
+    dataset is the dataset file path the response is derived from, or a callable
+    receiving the view arguments and returning it (None skips the cache, e.g. for
+    a 404). The key includes the dataset's mtime/size, so a changed file is never
+    answered from the cache; while a changed file is being reloaded in the
+    background the view's responses are not cached at all. With streamed=True a streamed response is still sent
+    as a stream the first time and cached once it has been delivered, which suits the full-dataset endpoints.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+            path = dataset(**kwargs) if callable(dataset) else dataset
+            if path is None or not os.path.exists(path) or dataset_cache.is_serving_stale(path):
+                return view(*args, **kwargs)
+
+            path = os.path.abspath(path)
+            key = (
+                request.endpoint,
+                path,
+                stat_signature(path),
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                'ndjson' if wants_ndjson(request) else 'json',
+            )
+            cached = response_cache.get(key)
+            annotate('cache', 'miss' if cached is None else 'hit')
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                if response.is_streamed:
+                    return response_cache.tee(key, response) if streamed else response
+                cached = response_cache.put(key, response)
+                if cached is None:
+                    return response
+            return response_cache.respond(key, cached, request.accept_encodings)
+        return wrapper
+    return decorator
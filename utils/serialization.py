@@ -0,0 +1,135 @@
+"""
+DataFrame-aware JSON serialization for the Flask app.
+
+DataFrames are converted to records column by column: every column is turned
+into a Python list in one vectorized call and missing values are masked to
+None, instead of inspecting each cell through to_dict('records'). The encoded
+output uses orjson when it is installed and falls back to the standard library
+otherwise. NaN/NaT become null, numpy scalars become plain numbers and
+datetimes are written in ISO 8601.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+from utils.timing import phase
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _column_to_list(series):
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = [None if missing else value.isoformat() for value, missing in zip(series.tolist(), mask)]
+        return values
+    values = series.tolist()
+    if mask.any():
+        for position in np.flatnonzero(mask):
+            values[position] = None
+    return values
+
+
+def frame_to_records(frame):
+    """Convert a DataFrame to a list of JSON-ready dicts, one per row"""
+    with phase('serialize'):
+        columns = [str(column) for column in frame.columns]
+        if len(columns) == 0:
+            return [{} for _ in range(len(frame))]
+        column_values = [_column_to_list(frame.iloc[:, position]) for position in range(len(columns))]
+        return [dict(zip(columns, row)) for row in zip(*column_values)]
+
+
+def series_to_dict(series):
+    """Convert a Series to a JSON-ready dict keyed by its index"""
+    return dict(zip(_column_to_list(series.index.to_series()), _column_to_list(series)))
+
+
+def to_jsonable(o):
+    """Convert pandas/numpy objects to JSON-ready Python values, raising TypeError otherwise"""
+    if isinstance(o, pd.DataFrame):
+        return frame_to_records(o)
+    if isinstance(o, pd.Series):
+        return series_to_dict(o)
+    if isinstance(o, pd.Index):
+        return _column_to_list(o.to_series())
+    if isinstance(o, (pd.Categorical, pd.api.extensions.ExtensionArray)):
+        return _column_to_list(pd.Series(o))
+    if isinstance(o, np.ndarray):
+        return _column_to_list(pd.Series(o.ravel())) if o.ndim == 1 else o.tolist()
+    if o is pd.NaT or o is pd.NA:
+        return None
+    if isinstance(o, np.floating):
+        return None if np.isnan(o) else float(o)
+    if isinstance(o, np.integer):
+        return int(o)
+    if isinstance(o, np.bool_):
+        return bool(o)
+    if isinstance(o, (pd.Timestamp, datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (pd.Timedelta, datetime.timedelta)):
+        return str(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _replace_nan(value):
+    # The stdlib encoder writes NaN/Infinity literals, which are not valid JSON
+    if isinstance(value, float):
+        return None if value != value or value in (float('inf'), float('-inf')) else value
+    if isinstance(value, dict):
+        return {key: _replace_nan(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_nan(item) for item in value]
+    return value
+
+
+class DataFrameJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that understands DataFrames and prefers orjson"""
+
+    @staticmethod
+    def default(o):
+        if hasattr(o, '__html__'):
+            return str(o.__html__())
+        try:
+            return to_jsonable(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        with phase('serialize'):
+            return self._dumps(obj, **kwargs)
+
+    def _dumps(self, obj, **kwargs):
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        if isinstance(obj, pd.DataFrame):
+            obj = frame_to_records(obj)
+        try:
+            return json.dumps(obj, allow_nan=False, **kwargs)
+        except ValueError:
+            return json.dumps(_replace_nan(obj), **kwargs)
+
+
+def json_backend():
+    """Name of the JSON encoder in use"""
+    return 'orjson' if orjson is not None else 'json'
@@ -0,0 +1,313 @@
+"""
+Columnar sidecar files for the configured datasets.
+
+Each source file (CSV/Excel) is converted once into an uncompressed Arrow IPC
+(Feather v2) file stored next to a small JSON manifest with the source's
+content hash. Loading a fresh sidecar memory-maps it instead of re-parsing the
+source: numeric columns without missing values and Arrow-backed string columns
+are views on the mapped file rather than copies, so worker processes reading
+the same sidecar share one copy of the data through the OS page cache (or
+through shared memory when the sidecars live in /dev/shm). Sidecars are written
+under an exclusive file lock, so when a source changes only one process parses
+it and every other worker attaches to the result.
+
+Run ``python -m utils.sidecar`` to (re)build the sidecars of every dataset in
+DatasetConfig ahead of time, or ``python -m utils.sidecar --watch`` to keep a
+loader process rebuilding them whenever a source file changes.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+from configs.cache_config import cache_config
+from utils.dtypes import ARROW_STRING, compaction_report, schema_token
+from utils.fingerprint import content_hash, stat_signature
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is listed in requirements.txt
+    pa = None
+    feather = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+SIDECAR_FORMAT_VERSION = 1
+
+
+def sidecar_available():
+    """Whether sidecars can be read and written in this environment"""
+    return feather is not None and cache_config.sidecar_enabled
+
+
+def sidecar_paths(dataSetPath):
+    """Return (data_path, manifest_path) of the sidecar belonging to dataSetPath"""
+    directory = cache_config.sidecar_dir_for(dataSetPath)
+    base_name = os.path.basename(dataSetPath)
+    return (
+        os.path.join(directory, base_name + '.feather'),
+        os.path.join(directory, base_name + '.meta.json'),
+    )
+
+
+def read_manifest(dataSetPath):
+    """Return the sidecar manifest of dataSetPath, or None when there is none"""
+    _, manifest_path = sidecar_paths(dataSetPath)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format_version') != SIDECAR_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _write_json_atomic(path, payload):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as handle:
+        json.dump(payload, handle, indent=2)
+    os.replace(temp_path, path)
+
+
+def is_fresh(dataSetPath, manifest=None):
+    """
+    Check whether the sidecar of dataSetPath reflects the current source file.
+
+    A matching mtime/size is trusted directly. When only the signature moved
+    (e.g. the file was touched or copied) the content hash decides, and the
+    manifest is updated so the next check is cheap again. A sidecar written with
+    other dtype compaction settings is never fresh.
+    """
+    manifest = manifest if manifest is not None else read_manifest(dataSetPath)
+    data_path, manifest_path = sidecar_paths(dataSetPath)
+    if manifest is None or not os.path.exists(data_path):
+        return False
+    if manifest.get('schema') != schema_token(dataSetPath):
+        return False
+
+    mtime_ns, size = stat_signature(dataSetPath)
+    if manifest.get('source_mtime_ns') == mtime_ns and manifest.get('source_size') == size:
+        return True
+
+    if manifest.get('content_hash') != content_hash(dataSetPath):
+        return False
+
+    manifest['source_mtime_ns'] = mtime_ns
+    manifest['source_size'] = size
+    try:
+        _write_json_atomic(manifest_path, manifest)
+    except OSError as e:
+        print(f"Error refreshing sidecar manifest for {dataSetPath}: {e}")
+    return True
+
+
+def source_state(dataSetPath):
+    """(mtime_ns, size, content hash) of a source file, taken before it is parsed"""
+    mtime_ns, size = stat_signature(dataSetPath)
+    return mtime_ns, size, content_hash(dataSetPath)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_sidecar(dataSetPath, frame, source):
+    """
+    Persist frame, parsed from the source in state source (see source_state),
+    as the sidecar of dataSetPath and return the new manifest.
+
+    Returns None and leaves no sidecar behind when the source changed while it
+    was parsed or written: its rows may belong to either version.
+    """
+    data_path, manifest_path = sidecar_paths(dataSetPath)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    mtime_ns, size, digest = source
+    temp_path = f"{data_path}.{os.getpid()}.tmp"
+    # Uncompressed so the file can be memory-mapped without a decode step
+    feather.write_feather(frame, temp_path, compression='uncompressed')
+    # The old manifest must not vouch for the new data, even for a moment
+    _remove(manifest_path)
+    os.replace(temp_path, data_path)
+
+    if stat_signature(dataSetPath) != (mtime_ns, size):
+        print(f"Source changed while its sidecar was written, discarding it: {dataSetPath}")
+        _remove(data_path)
+        return None
+
+    manifest = {
+        'format_version': SIDECAR_FORMAT_VERSION,
+        'source': os.path.abspath(dataSetPath),
+        'source_mtime_ns': mtime_ns,
+        'source_size': size,
+        'content_hash': digest,
+        'rows': int(len(frame)),
+        'columns': [str(column) for column in frame.columns],
+        'schema': schema_token(dataSetPath),
+        'dtypes': compaction_report(dataSetPath),
+        'created_at': time.time(),
+    }
+    _write_json_atomic(manifest_path, manifest)
+    return manifest
+
+
+@contextmanager
+def writer_lock(dataSetPath):
+    """Exclusive cross-process lock held while the sidecar of dataSetPath is (re)built"""
+    data_path, _ = sidecar_paths(dataSetPath)
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    with open(data_path + '.lock', 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _types_mapper():
+    # pandas 3 keeps strings Arrow-backed by default; older versions would copy
+    # them into Python objects unless asked for the pyarrow string dtype, which
+    # parsed frames are given as well (see utils.dtypes.arrow_strings)
+    if ARROW_STRING is None:
+        return None
+    return {pa.string(): ARROW_STRING, pa.large_string(): ARROW_STRING}.get
+
+
+def read_sidecar(dataSetPath):
+    """Memory-map the sidecar of dataSetPath and return it as a DataFrame"""
+    data_path, _ = sidecar_paths(dataSetPath)
+    table = feather.read_table(data_path, memory_map=True)
+    # split_blocks lets numeric columns keep pointing at the mapped buffers
+    return table.to_pandas(split_blocks=True, types_mapper=_types_mapper())
+
+
+_mapped_tables = {}
+_mapped_tables_lock = threading.Lock()
+
+
+def _mapped_table(dataSetPath, manifest):
+    # Memory-mapping is lazy, so holding the table keeps only touched pages resident
+    data_path, _ = sidecar_paths(dataSetPath)
+    signature = (manifest['content_hash'], os.stat(data_path).st_mtime_ns)
+    with _mapped_tables_lock:
+        cached = _mapped_tables.get(data_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    table = feather.read_table(data_path, memory_map=True)
+    with _mapped_tables_lock:
+        _mapped_tables[data_path] = (signature, table)
+    return table
+
+
+def read_sidecar_rows(dataSetPath, start, stop):
+    """
+    Return rows [start, stop) of dataSetPath from its memory-mapped sidecar,
+    or None when no fresh sidecar is available. Only the requested rows are
+    converted to pandas.
+    """
+    if not sidecar_available():
+        return None
+    manifest = read_manifest(dataSetPath)
+    if not is_fresh(dataSetPath, manifest):
+        return None
+    table = _mapped_table(dataSetPath, manifest)
+    start = max(0, min(start, table.num_rows))
+    stop = max(start, min(stop, table.num_rows))
+    frame = table.slice(start, stop - start).to_pandas()
+    frame.index = range(start, stop)
+    return frame
+
+
+def load_with_sidecar(dataSetPath, reader):
+    """
+    Load dataSetPath through its sidecar, parsing the source with reader only
+    when the sidecar is missing or stale. Sidecar failures never fail the load.
+    """
+    if not sidecar_available():
+        return reader(dataSetPath)
+
+    try:
+        if is_fresh(dataSetPath):
+            return read_sidecar(dataSetPath)
+    except Exception as e:
+        print(f"Error reading sidecar for {dataSetPath}: {e}")
+
+    frame = None
+    try:
+        with writer_lock(dataSetPath):
+            # Another worker may have rebuilt it while this one waited for the lock
+            if is_fresh(dataSetPath):
+                return read_sidecar(dataSetPath)
+            source = source_state(dataSetPath)
+            frame = reader(dataSetPath)
+            if write_sidecar(dataSetPath, frame, source) is None:
+                return frame
+        # Attach to the file just written, so this worker shares it like the others
+        return read_sidecar(dataSetPath)
+    except Exception as e:
+        print(f"Error writing sidecar for {dataSetPath}: {e}")
+    return frame if frame is not None else reader(dataSetPath)
+
+
+def build_all_sidecars(config, reader, force=False):
+    """
+    Build the sidecar of every dataset known to config.
+
+    Returns:
+        dict: Per-dataset result with status, rows and elapsed seconds
+    """
+    results = {}
+    for name, dataSetPath in config.get_all_dataset_paths().items():
+        if not os.path.exists(dataSetPath):
+            results[name] = {'status': 'missing', 'path': dataSetPath}
+            continue
+        started = time.perf_counter()
+        with writer_lock(dataSetPath):
+            if not force and is_fresh(dataSetPath):
+                results[name] = {'status': 'fresh', 'path': dataSetPath}
+            else:
+                source = source_state(dataSetPath)
+                manifest = write_sidecar(dataSetPath, reader(dataSetPath), source)
+                if manifest is None:
+                    # Picked up by the next build once the source settled
+                    results[name] = {'status': 'changed', 'path': dataSetPath}
+                else:
+                    results[name] = {'status': 'built', 'path': dataSetPath, 'rows': manifest['rows']}
+        results[name]['seconds'] = round(time.perf_counter() - started, 6)
+    return results
+
+
+if __name__ == '__main__':
+    from configs.dataset_config import dataset_config
+    from ServiceFunctions import readSourceData
+
+    if feather is None:
+        print("pyarrow is not installed; sidecars are unavailable")
+        sys.exit(1)
+
+    results = build_all_sidecars(dataset_config, readSourceData, force='--force' in sys.argv)
+    for name, result in results.items():
+        print(f"{name}: {result}")
+
+    # Loader mode: keep the sidecars in step with the sources for the workers
+    if '--watch' in sys.argv:
+        interval = float(os.environ.get('SIDECAR_WATCH_INTERVAL', '2'))
+        while True:
+            time.sleep(interval)
+            for name, result in build_all_sidecars(dataset_config, readSourceData).items():
+                if result['status'] == 'built':
+                    print(f"{name}: {result}")
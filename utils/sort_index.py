@@ -0,0 +1,75 @@
+"""
+Cache of sort permutations.
+
+A permutation is the array of row positions that puts a dataset in sorted
+order for one (dataset version, columns, ascending) combination. Once it is
+computed, a sorted view of the data is a take() on the permutation and a
+sorted page is a slice of it, without sorting again.
+"""
+import threading
+from collections import OrderedDict
+
+from configs.cache_config import cache_config
+from utils.metrics import record_cache_lookup
+
+
+class SortIndexCache:
+    """LRU cache of argsort permutations keyed by dataset version and sort key"""
+
+    def __init__(self, max_entries=64):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, entry, columns, ascending, compute):
+        """Return the permutation for entry sorted by columns, calling compute(frame) on a miss"""
+        key = (entry.path, entry.version, tuple(columns), bool(ascending))
+        with self._lock:
+            order = self._entries.get(key)
+            if order is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                record_cache_lookup('sort_index', 'hit')
+                return order
+            self._misses += 1
+            record_cache_lookup('sort_index', 'miss')
+
+        order = compute(entry.frame)
+        # Shared between requests, so guard against accidental in-place edits
+        order.flags.writeable = False
+
+        with self._lock:
+            if self._max_entries:
+                self._entries[key] = order
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return order
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == path]:
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'max_entries': self._max_entries,
+                'entries': [
+                    {'path': key[0], 'version': key[1], 'columns': list(key[2]), 'ascending': key[3]}
+                    for key in self._entries
+                ],
+            }
+
+# Create a global instance for use throughout the application
+sort_index_cache = SortIndexCache(max_entries=cache_config.sort_cache_entries)
@@ -0,0 +1,167 @@
+"""
+Startup-time reporting.
+
+Two views of how long a worker takes to come up:
+
+- ``startup_report()`` describes the running process: time spent in each
+  recorded startup phase (e.g. create_app), number of loaded modules, peak RSS,
+  and whether any heavy module that should be lazily imported got loaded.
+- ``import_time_breakdown()`` imports the app in a fresh interpreter with
+  ``-X importtime`` and aggregates the import cost per top-level package.
+
+Command line (also available as ``python app.py --import-report``)::
+
+    python -m utils.startup [--module app] [--top 15] [--json] [--max-seconds 2.0]
+
+The command exits with status 1 when a heavy module is imported at startup or
+the total import time exceeds ``--max-seconds``, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.plotting import PLOTTING_MODULES
+
+# Modules that must stay out of the startup path (loaded on first use only)
+HEAVY_MODULES = PLOTTING_MODULES
+
+_started = time.perf_counter()
+_phases = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def record_phase(name):
+    """Time a startup phase, e.g. ``with record_phase('create_app'): ...``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _phases[name] = time.perf_counter() - started
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """Resident memory of this process right now (Linux), or None"""
+    try:
+        with open('/proc/self/statm', 'r', encoding='ascii') as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+
+
+def startup_report():
+    """Startup measurements of the running process"""
+    with _lock:
+        phases = {name: round(seconds, 4) for name, seconds in _phases.items()}
+    return {
+        'phases_seconds': phases,
+        'uptime_seconds': round(time.perf_counter() - _started, 3),
+        'modules_loaded': len(sys.modules),
+        'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` stderr into (module, self_us, cumulative_us, depth) tuples"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+def import_time_breakdown(module='app', top=15):
+    """Import module in a fresh interpreter and report where the import time goes"""
+    # app.py creates its app on first access; build it as a server would
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}; getattr({module}, 'app', None)"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    rows = parse_importtime(completed.stderr)
+
+    # Self time summed per top-level package shows which dependency costs what
+    packages = {}
+    for name, self_us, _, _ in rows:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    by_package = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    loaded = {name for name, _, _, _ in rows}
+    return {
+        'module': module,
+        'total_seconds': round(total_us / 1e6, 3),
+        'modules_imported': len(rows),
+        'packages': [
+            {'package': package, 'seconds': round(self_us / 1e6, 4)}
+            for package, self_us in by_package[:top]
+        ],
+        'slowest_modules': [
+            {'module': name, 'cumulative_seconds': round(cumulative_us / 1e6, 4)}
+            for name, _, cumulative_us, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+        ],
+        'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report where startup import time goes")
+    parser.add_argument('--module', default='app', help="Module to import (default: app)")
+    parser.add_argument('--top', type=int, default=15, help="Number of packages/modules to list")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="Fail when the total import time exceeds this many seconds")
+    args = parser.parse_args(argv)
+
+    report = import_time_breakdown(args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {report['module']}: {report['total_seconds']:.3f}s, "
+              f"{report['modules_imported']} modules")
+        print("\nSelf time by package:")
+        for item in report['packages']:
+            print(f"  {item['seconds'] * 1000:9.1f} ms  {item['package']}")
+        print("\nSlowest modules (cumulative):")
+        for item in report['slowest_modules']:
+            print(f"  {item['cumulative_seconds'] * 1000:9.1f} ms  {item['module']}")
+
+    failed = False
+    if report['heavy_modules_loaded']:
+        print(f"\nError: heavy modules imported at startup: {report['heavy_modules_loaded']}", file=sys.stderr)
+        failed = True
+    if args.max_seconds is not None and report['total_seconds'] > args.max_seconds:
+        print(f"\nError: import time {report['total_seconds']:.3f}s exceeds {args.max_seconds:.3f}s", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
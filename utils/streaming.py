@@ -0,0 +1,61 @@
+"""
+Chunked JSON/NDJSON responses for whole-dataset endpoints.
+
+Rows are serialized a slice at a time from a generator, so only one chunk of
+encoded text exists at any moment and the first bytes leave the server before
+the last rows have been serialized.
+"""
+from flask import Response, current_app, stream_with_context
+
+from utils.serialization import frame_to_records
+
+STREAM_CHUNK_ROWS = 1000
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson')
+
+
+def wants_ndjson(request):
+    """Whether the client asked for NDJSON through ?format=ndjson or the Accept header"""
+    requested_format = request.args.get('format', '').lower()
+    if requested_format:
+        return requested_format == 'ndjson'
+    best = request.accept_mimetypes.best_match(('application/json',) + NDJSON_MIMETYPES)
+    return best in NDJSON_MIMETYPES
+
+
+def wants_stream(request):
+    """Streaming is the default; ?stream=false falls back to a buffered response"""
+    return request.args.get('stream', 'true').lower() not in ('0', 'false', 'no')
+
+
+def _dump_records(chunk):
+    return current_app.json.dumps(frame_to_records(chunk))
+
+
+def iter_json_envelope(frame, message, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield {"data": [...], "count": n, "message": ...} as a sequence of text chunks"""
+    yield '{"data":['
+    for start in range(0, len(frame), chunk_rows):
+        records = _dump_records(frame.iloc[start:start + chunk_rows])
+        if start:
+            yield ','
+        # Strip the surrounding [] of each chunk so the chunks join into one array
+        yield records[1:-1]
+    yield '],"count":' + str(len(frame)) + ',"message":' + current_app.json.dumps(message) + '}\n'
+
+
+def iter_ndjson(frame, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield one JSON record per line"""
+    dumps = current_app.json.dumps
+    for start in range(0, len(frame), chunk_rows):
+        records = frame_to_records(frame.iloc[start:start + chunk_rows])
+        yield ''.join(dumps(record) + '\n' for record in records)
+
+
+def stream_records_response(frame, message, ndjson=False, chunk_rows=STREAM_CHUNK_ROWS):
+    """Build a streamed Flask response for every row of frame"""
+    if ndjson:
+        response = Response(stream_with_context(iter_ndjson(frame, chunk_rows)), mimetype='application/x-ndjson')
+    else:
+        response = Response(stream_with_context(iter_json_envelope(frame, message, chunk_rows)), mimetype='application/json')
+    response.headers['X-Total-Count'] = str(len(frame))
+    return response
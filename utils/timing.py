@@ -0,0 +1,171 @@
+"""
+Per-request phase timings: Server-Timing headers and structured request logs.
+
+Hot paths wrap their work in ``with phase(name):`` for the phases
+
+- load: getting the dataset (cache lookup, sidecar attach or parse),
+- serialize: encoding JSON,
+- compress: gzip/brotli/zstd encoding of the body,
+
+and ``annotate(name, description)`` records a marker such as the response
+cache outcome. The time the request spent otherwise (the ServiceFunctions
+computation, views and framework) is reported as compute, next to the total.
+
+Buffered responses carry the timings in a Server-Timing header, which browser
+developer tools show per request. Streamed bodies are encoded after the
+headers are sent, so their header only covers the time until the first byte;
+the log line, written when the response is closed, covers everything.
+With SERVER_TIMING_ENABLED=0 phase() returns a shared no-op context and no
+hooks are installed.
+"""
+import json
+import logging
+import sys
+import time
+
+from flask import g, has_request_context, request
+
+from configs.http_config import http_config
+
+logger = logging.getLogger('flask_api.timing')
+
+PHASES = ('load', 'compute', 'serialize', 'compress')
+
+
+class RequestTimings:
+    """Phase durations and markers of one request"""
+
+    __slots__ = ('started', 'durations', 'notes', 'active')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.notes = {}
+        self.active = set()
+
+    def report(self):
+        """{phase: seconds} including compute (the unaccounted rest) and total"""
+        total = time.perf_counter() - self.started
+        durations = {name: self.durations.get(name, 0.0) for name in PHASES if name != 'compute'}
+        durations['compute'] = max(total - sum(durations.values()), 0.0)
+        durations['total'] = total
+        return durations
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    __slots__ = ('timings', 'name', 'started', 'nested')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        # A phase inside the same phase (e.g. records built while encoding) is counted once
+        self.nested = self.name in self.timings.active
+        if not self.nested:
+            self.timings.active.add(self.name)
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.nested:
+            durations = self.timings.durations
+            durations[self.name] = durations.get(self.name, 0.0) + time.perf_counter() - self.started
+            self.timings.active.discard(self.name)
+        return False
+
+
+def _current():
+    if not http_config.server_timing_enabled or not has_request_context():
+        return None
+    return g.get('server_timing')
+
+
+def phase(name):
+    """Context manager adding the time spent inside it to phase name of the current request"""
+    timings = _current()
+    if timings is None:
+        return _NO_PHASE
+    return _Phase(timings, name)
+
+
+def annotate(name, description):
+    """Attach a marker (e.g. cache;desc="hit") to the timings of the current request"""
+    timings = _current()
+    if timings is not None:
+        timings.notes[name] = description
+
+
+def server_timing_header(durations, notes):
+    metrics = [f"{name};dur={durations[name] * 1000:.2f}" for name in PHASES + ('total',)]
+    metrics.extend(f'{name};desc="{description}"' for name, description in notes.items())
+    return ', '.join(metrics)
+
+
+def start_timing():
+    """before_request hook: start the clock of the request"""
+    g.server_timing = RequestTimings()
+
+
+def finish_timing(response):
+    """after_request hook (installed to run last): add Server-Timing and log the request"""
+    timings = g.get('server_timing')
+    if timings is None:
+        return response
+    response.headers['Server-Timing'] = server_timing_header(timings.report(), timings.notes)
+
+    if http_config.server_timing_log:
+        record = {
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+        }
+        if response.is_streamed:
+            # Chunks are still to be encoded and sent: log once the response is closed
+            response.call_on_close(lambda: log_request(record, timings, None))
+        else:
+            log_request(record, timings, response.calculate_content_length())
+    return response
+
+
+def log_request(record, timings, size):
+    """Write one JSON line per request with its phase durations in milliseconds"""
+    record = dict(
+        record,
+        bytes=size,
+        streamed=size is None,
+        timings_ms={name: round(value * 1000, 3) for name, value in timings.report().items()},
+        **timings.notes,
+    )
+    logger.info(json.dumps(record))
+
+
+def init_app(app):
+    """
+    Install the timing hooks on an app. Call it before the other after_request
+    hooks are registered, so that it runs last and includes compression.
+    """
+    if not http_config.server_timing_enabled:
+        return
+    if http_config.server_timing_log and not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    app.before_request(start_timing)
+    app.after_request(finish_timing)
@@ -0,0 +1,164 @@
+"""
+Startup warmup.
+
+When enabled (WARMUP_ENABLED=1 or create_app(warmup=True)), a background
+thread started by create_app() takes every dataset that
+DatasetConfig.validate_data_directory() reports as available, loads them in
+parallel, builds their column statistics index and then requests the hot
+endpoints once through the app, so the response cache already holds their
+encoded bodies. Until that has finished, the readiness
+endpoint answers 503, so a load balancer keeps traffic away from cold workers.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from configs.dataset_config import dataset_config
+from configs.server_config import server_config
+from utils.column_stats import column_stats_index
+from utils.startup import current_rss_mb, record_phase
+
+# Responses requested once during warmup, in addition to shape/columns of every dataset
+HOT_PATHS = [
+    '/api/dataset/shape',
+    '/api/dataset/columns',
+    '/api/athletes/head/10',
+    '/api/athletes/tail/10',
+    '/api/athletes/all',
+    '/api/students/head',
+    '/api/students/all',
+]
+DATASET_HOT_PATHS = [
+    '/api/datasets/{name}/shape',
+    '/api/datasets/{name}/columns',
+]
+
+
+class WarmupState:
+    """Progress and results of the warmup, shared with the readiness endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = 'disabled'
+        self.started_at = None
+        self.finished_at = None
+        self.datasets = {}
+        self.responses = {}
+        self.missing_files = []
+        self.rss_mb = {}
+        self.error = None
+
+    @property
+    def ready(self):
+        # Warmup is opt-in: without it the worker is ready as soon as it serves
+        return self.status in ('disabled', 'ready')
+
+    def update(self, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, name, value)
+
+    def report(self):
+        with self._lock:
+            seconds = None
+            if self.started_at is not None:
+                seconds = round((self.finished_at or time.time()) - self.started_at, 4)
+            return {
+                'status': self.status,
+                'seconds': seconds,
+                'datasets': dict(self.datasets),
+                'responses': dict(self.responses),
+                'missing_files': list(self.missing_files),
+                'rss_mb': dict(self.rss_mb),
+                'error': self.error,
+            }
+
+# Create a global instance for use throughout the application
+warmup_state = WarmupState()
+
+
+def warm_dataset(name, dataSetPath):
+    """Load one dataset and build its indexes; returns its timing and memory figures"""
+    from ServiceFunctions import getDatasetEntry
+
+    started = time.perf_counter()
+    entry = getDatasetEntry(dataSetPath)
+    loaded = time.perf_counter()
+    column_stats_index.for_entry(entry)
+    indexed = time.perf_counter()
+    return {
+        'rows': int(len(entry.frame)),
+        'columns': int(len(entry.frame.columns)),
+        'version': entry.version,
+        'load_seconds': round(loaded - started, 4),
+        'index_seconds': round(indexed - loaded, 4),
+        'frame_bytes': entry.nbytes,
+    }
+
+
+def hot_paths(available):
+    """Request paths to pre-serialize, limited to datasets whose files exist"""
+    paths = list(HOT_PATHS)
+    for name in available:
+        paths.extend(path.format(name=name) for path in DATASET_HOT_PATHS)
+    paths.extend(server_config.warmup_paths)
+    return paths
+
+
+def run_warmup(app):
+    """Load every available dataset in parallel, then pre-serialize the hot responses"""
+    warmup_state.update(status='running', started_at=time.time(), rss_mb={'before': current_rss_mb()})
+    try:
+        with record_phase('warmup'):
+            validation = dataset_config.validate_data_directory()
+            available = {
+                name: path for name, path in dataset_config.get_all_dataset_paths().items()
+                if os.path.basename(path) in validation['available_files']
+            }
+            warmup_state.update(missing_files=validation['missing_files'])
+
+            datasets = {}
+            with ThreadPoolExecutor(max_workers=server_config.warmup_workers, thread_name_prefix='warmup') as pool:
+                futures = {name: pool.submit(warm_dataset, name, path) for name, path in available.items()}
+                for name, future in futures.items():
+                    try:
+                        datasets[name] = future.result()
+                    except Exception as e:
+                        print(f"Error warming up dataset {name}: {e}")
+                        datasets[name] = {'error': str(e)}
+            warmup_state.update(datasets=datasets)
+
+            # Going through the app fills the response cache exactly as real requests would
+            responses = {}
+            client = app.test_client()
+            for path in hot_paths(name for name, result in datasets.items() if 'error' not in result):
+                started = time.perf_counter()
+                response = client.get(path)
+                responses[path] = {
+                    'status': response.status_code,
+                    'bytes': len(response.get_data()),
+                    'seconds': round(time.perf_counter() - started, 4),
+                }
+                response.close()
+
+        warmup_state.update(
+            status='ready',
+            responses=responses,
+            finished_at=time.time(),
+            rss_mb={**warmup_state.rss_mb, 'after': current_rss_mb()},
+        )
+    except Exception as e:
+        print(f"Error during warmup: {e}")
+        warmup_state.update(status='failed', error=str(e), finished_at=time.time())
+
+
+def start_warmup(app, background=True):
+    """Start the warmup; readiness turns 200 once it has finished"""
+    warmup_state.update(status='pending')
+    if not background:
+        run_warmup(app)
+        return None
+    thread = threading.Thread(target=run_warmup, args=(app,), name='warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,193 @@
+"""
+Background reload of changed data files.
+
+When enabled (DATASET_WATCH_ENABLED=1 or create_app(watch=True)), a watcher
+follows the data directory: through inotify (via watchdog) when it is
+installed, otherwise by polling the files' mtime and size. Once a changed file
+has been quiet for the debounce period, the cached dataset is reloaded in the
+background, its column statistics are rebuilt, and the new version is swapped
+in. Until then requests keep being answered from the previous version, so a
+reload never makes a reader wait; the derived caches of the old version are
+dropped after the swap.
+"""
+import os
+import threading
+import time
+
+from configs.cache_config import cache_config
+from configs.dataset_config import dataset_config
+from utils.aggregation import aggregation_engine
+from utils.charts import chart_renderer
+from utils.column_stats import column_stats_index
+from utils.dataset_cache import dataset_cache
+from utils.fingerprint import stat_signature
+from utils.response_cache import response_cache
+from utils.sort_index import sort_index_cache
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def _signature(path):
+    try:
+        return stat_signature(path)
+    except OSError:
+        return None
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards filesystem events on watched files to the watcher"""
+
+    def __init__(self, watcher):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        # Editors and atomic writers replace files by renaming onto them
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path:
+                self._watcher.mark(path)
+
+
+class DatasetWatcher:
+    """Watches dataset files and calls on_change(path) once a change has settled"""
+
+    def __init__(self, paths, interval=1.0, debounce=0.5):
+        self._paths = {os.path.abspath(path) for path in paths}
+        self._interval = interval
+        self._debounce = debounce
+        self._signatures = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self._on_change = None
+        self._events = 0
+        self._changes = 0
+        self._errors = 0
+        self._last_change = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def mode(self):
+        if not self.running:
+            return 'stopped'
+        return 'inotify' if self._observer is not None else 'polling'
+
+    def start(self, on_change):
+        """Start watching in background threads; on_change(path) runs on the watcher thread"""
+        if self.running:
+            return self
+        self._on_change = on_change
+        self._stop.clear()
+        self._signatures = {path: _signature(path) for path in self._paths}
+        if Observer is not None:
+            try:
+                observer = Observer()
+                for directory in {os.path.dirname(path) for path in self._paths}:
+                    if os.path.isdir(directory):
+                        observer.schedule(_EventHandler(self), directory, recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                print(f"Error starting file observer, polling instead: {e}")
+                self._observer = None
+        self._thread = threading.Thread(target=self._run, name='dataset-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def mark(self, path):
+        """Record an event on path; it is handled once no further event arrived for the debounce period"""
+        path = os.path.abspath(path)
+        if path not in self._paths:
+            return
+        with self._lock:
+            self._events += 1
+            self._pending[path] = time.monotonic()
+
+    def _poll(self):
+        for path in self._paths:
+            signature = _signature(path)
+            if signature != self._signatures.get(path):
+                self._signatures[path] = signature
+                self.mark(path)
+
+    def _run(self):
+        # Events only mark files; settled changes are dispatched from this one thread
+        tick = min(self._interval, self._debounce) if self._debounce else self._interval
+        while not self._stop.wait(tick):
+            if self._observer is None:
+                self._poll()
+            now = time.monotonic()
+            with self._lock:
+                settled = [path for path, marked in self._pending.items() if now - marked >= self._debounce]
+                for path in settled:
+                    del self._pending[path]
+            for path in settled:
+                # A file in the middle of being replaced may briefly not exist
+                if not os.path.exists(path):
+                    continue
+                try:
+                    self._on_change(path)
+                    self._changes += 1
+                    self._last_change = {'path': path, 'at': time.time()}
+                except Exception as e:
+                    self._errors += 1
+                    print(f"Error reloading changed dataset {path}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'interval': self._interval,
+                'debounce': self._debounce,
+                'files': len(self._paths),
+                'events': self._events,
+                'changes': self._changes,
+                'errors': self._errors,
+                'pending': len(self._pending),
+                'last_change': self._last_change,
+            }
+
+# Create a global instance for use throughout the application
+dataset_watcher = DatasetWatcher(
+    dataset_config.get_all_dataset_paths().values(),
+    interval=cache_config.watch_interval,
+    debounce=cache_config.watch_debounce,
+)
+
+
+def drop_derived_caches(previous, entry):
+    """Swap hook: forget sort orders, aggregations, charts and responses of the replaced version"""
+    for cache in (sort_index_cache, aggregation_engine, chart_renderer, response_cache):
+        cache.invalidate(entry.path)
+
+
+def start_watcher():
+    """Serve stale versions during reloads and start watching the dataset files"""
+    from ServiceFunctions import refreshDataset
+
+    if not dataset_watcher.running:
+        dataset_cache.add_prepare_hook(column_stats_index.for_entry)
+        dataset_cache.add_swap_hook(drop_derived_caches)
+        dataset_cache.serve_stale = True
+    return dataset_watcher.start(refreshDataset)